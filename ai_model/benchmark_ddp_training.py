@@ -0,0 +1,74 @@
+"""
+Benchmark data-parallel CPU fine-tuning against the number of processes.
+
+Runs a short fine_tune_codet5.py training (a fixed number of optimizer steps)
+once per process count and reports training samples/sec and the scaling
+relative to one process. Every run gets the same core budget: one process
+uses all cores, N processes get cpu_count/N threads each, so the comparison is
+data parallelism against intra-op threading. Process counts must divide the
+global batch (GLOBAL_BATCH_SIZE in ai_model/data_parallel.py).
+
+Usage:
+    python ai_model/benchmark_ddp_training.py [--nproc 1 2 4] [--max-steps 10]
+        [--train-file src/data/test_case_training.jsonl] [--model-name Salesforce/codet5-base]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+FINE_TUNE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fine_tune_codet5.py")
+
+
+def train(nproc, args, tmp):
+    """Training metrics of one run with `nproc` processes, or None if it failed."""
+    metrics_file = os.path.join(tmp, f"metrics_{nproc}.json")
+    command = [sys.executable, FINE_TUNE_SCRIPT,
+               "--train_file", args.train_file,
+               "--model_name", args.model_name,
+               "--output_dir", os.path.join(tmp, f"model_{nproc}"),
+               "--max_steps", str(args.max_steps),
+               "--nproc", str(nproc),
+               "--metrics_file", metrics_file]
+    # Let fine_tune_codet5 split the cores evenly instead of inheriting a fixed thread count
+    env = {k: v for k, v in os.environ.items() if k != "OMP_NUM_THREADS"}
+    if subprocess.call(command, env=env) != 0 or not os.path.exists(metrics_file):
+        return None
+    with open(metrics_file, "r") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fine-tuning samples/sec against process count")
+    parser.add_argument("--nproc", type=int, nargs="+", default=[1, 2, 4], help="Process counts (divisors of 64)")
+    parser.add_argument("--max-steps", type=int, default=10, help="Optimizer steps per run")
+    parser.add_argument("--train-file", default="src/data/test_case_training.jsonl")
+    parser.add_argument("--model-name", default="Salesforce/codet5-base")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU cores")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for nproc in args.nproc:
+            print(f"\n=== {nproc} process(es) ===")
+            results[nproc] = train(nproc, args, tmp)
+
+    print(f"\n{'processes':>9} | {'threads each':>12} | {'samples/s':>9} | {'runtime (s)':>11} | scaling")
+    print("-" * 62)
+    baseline = None
+    for nproc, metrics in results.items():
+        if metrics is None:
+            print(f"{nproc:>9} | {'failed':>12}")
+            continue
+        rate = metrics["train_samples_per_second"]
+        baseline = baseline or rate
+        threads = max(1, (os.cpu_count() or 1) // nproc)
+        print(f"{nproc:>9} | {threads:>12} | {rate:>9.2f} | {metrics['train_runtime']:>11.1f} | {rate / baseline:.2f}x")
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmark assisted decoding with the distilled draft model.
+
+Generates the comprehensive test scenarios of the first N endpoints of a
+Swagger spec with greedy decoding, once by the generator alone and once
+assisted by the draft (ai_model/draft_model.py), and reports the time,
+generated tokens/sec, speedup and how many outputs are identical. Greedy
+assisted decoding should reproduce every output exactly.
+
+Usage:
+    python ai_model/benchmark_draft_model.py [--swagger data/raw/swagger_fixed.json] [--endpoints 5]
+        [--draft-model src/data/models/checkpoints/latest_english_draft]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.benchmark_shared_context import endpoint_scenarios
+from ai_model.draft_model import DEFAULT_DRAFT_PATH, load_draft_model
+from comprehensive_test_generator import GENERATION_KWARGS, ComprehensiveTestGenerator
+
+# Assisted generation is single-beam only
+GREEDY_KWARGS = {k: v for k, v in GENERATION_KWARGS.items() if k != "early_stopping"}
+GREEDY_KWARGS["num_beams"] = 1
+
+
+def run(generator, prompts, draft):
+    """(seconds, generated tokens, texts) for greedy generation of every prompt."""
+    seconds, tokens, texts = 0.0, 0, []
+    for prompt in prompts:
+        input_ids = generator.tokenizer(prompt, return_tensors="pt").input_ids.to(generator.device)
+        kwargs = dict(GREEDY_KWARGS, assistant_model=draft) if draft is not None else GREEDY_KWARGS
+        start = time.perf_counter()
+        generated_ids = generator.model.generate(input_ids, **kwargs)
+        seconds += time.perf_counter() - start
+        tokens += generator._count_generated(generator.tokenizer, generated_ids)
+        texts.append(generator.tokenizer.decode(generated_ids[0], skip_special_tokens=True))
+    return seconds, tokens, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plain and draft-assisted greedy generation")
+    parser.add_argument("--swagger", default="data/raw/swagger_fixed.json")
+    parser.add_argument("--model-path", default="src/data/models/checkpoints/latest_english_generator")
+    parser.add_argument("--draft-model", default=DEFAULT_DRAFT_PATH)
+    parser.add_argument("--endpoints", type=int, default=5, help="Endpoints to generate for")
+    args = parser.parse_args()
+
+    with open(args.swagger, "r") as f:
+        spec = json.load(f)
+
+    generator = ComprehensiveTestGenerator(args.model_path)
+    draft = load_draft_model(args.draft_model, generator.device, generator.model)
+    prompts = [generator._format_comprehensive_prompt(path, method_info, scenario)
+               for path, method_info, scenarios in endpoint_scenarios(generator, spec, args.endpoints)
+               for scenario in scenarios]
+    print(f"{len(prompts)} scenario prompts, greedy decoding\n")
+
+    base_seconds, base_tokens, base_texts = run(generator, prompts, None)
+    draft_seconds, draft_tokens, draft_texts = run(generator, prompts, draft)
+    identical = sum(a == b for a, b in zip(base_texts, draft_texts))
+
+    print(f"{'decoding':<10} {'time (s)':>9} {'generated':>10} {'gen tokens/s':>13} {'speedup':>8}")
+    print("-" * 54)
+    for name, seconds, tokens in (("plain", base_seconds, base_tokens), ("assisted", draft_seconds, draft_tokens)):
+        rate = tokens / seconds if seconds else 0
+        print(f"{name:<10} {seconds:>9.1f} {tokens:>10} {rate:>13.1f} {base_seconds / seconds if seconds else 0:>7.1f}x")
+    print(f"\nIdentical outputs: {identical}/{len(prompts)}")
+    return 0 if identical == len(prompts) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Check bf16 autocast against fp32 for loss parity and throughput.
+
+On a sample of training pairs, for each precision (ai_model/precision.py):
+
+    loss        mean eval loss; bf16 must stay within --tolerance of fp32
+    training    samples/sec of forward + backward + AdamW steps (fp32 weights)
+    inference   generated tokens/sec of greedy generation, and how many
+                outputs match fp32 exactly
+
+Usage:
+    python ai_model/benchmark_precision.py [--model-path src/data/models/checkpoints/latest_english_generator]
+        [--train-file src/data/test_case_training.jsonl] [--samples 64] [--train-steps 5] [--tolerance 0.02]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+import torch
+from transformers import T5ForConditionalGeneration
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.fine_tune_codet5 import load_jsonl
+from ai_model.precision import PRECISIONS, autocast, bf16_supported
+from ai_model.tokenizer_provider import encode_batch, get_tokenizer
+
+
+def batches(tokenizer, data, batch_size, max_length):
+    """Padded (input_ids, attention_mask, labels) batches of the training pairs."""
+    for start in range(0, len(data), batch_size):
+        chunk = data[start:start + batch_size]
+        inputs = encode_batch(tokenizer, [item["input"] for item in chunk], max_length=max_length,
+                              padding=True, return_tensors="pt")
+        labels = encode_batch(tokenizer, [item["output"] for item in chunk], max_length=max_length,
+                              padding=True, return_tensors="pt")["input_ids"]
+        labels[labels == tokenizer.pad_token_id] = -100
+        yield inputs["input_ids"], inputs["attention_mask"], labels
+
+
+def eval_loss(model, batch_list, precision):
+    model.eval()
+    total, count = 0.0, 0
+    with torch.no_grad(), autocast(precision):
+        for input_ids, attention_mask, labels in batch_list:
+            loss = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels).loss
+            total += float(loss) * input_ids.shape[0]
+            count += input_ids.shape[0]
+    return total / count
+
+
+def train_throughput(model, batch_list, precision, steps):
+    """Samples/sec of `steps` optimizer steps on a copy of the model."""
+    model = copy.deepcopy(model)
+    model.train()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-5)
+    samples = 0
+    start = time.perf_counter()
+    for step in range(steps):
+        input_ids, attention_mask, labels = batch_list[step % len(batch_list)]
+        with autocast(precision):
+            loss = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+        samples += input_ids.shape[0]
+    return samples / (time.perf_counter() - start)
+
+
+def generate_throughput(model, tokenizer, prompts, precision, max_length):
+    """(generated tokens/sec, texts) of greedy generation for each prompt."""
+    model.eval()
+    tokens, texts = 0, []
+    start = time.perf_counter()
+    with torch.no_grad(), autocast(precision):
+        for prompt in prompts:
+            input_ids = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512).input_ids
+            output = model.generate(input_ids, max_length=max_length, num_beams=1)
+            tokens += int((output != tokenizer.pad_token_id).sum())
+            texts.append(tokenizer.decode(output[0], skip_special_tokens=True))
+    return tokens / (time.perf_counter() - start), texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare bf16 autocast with fp32 for loss parity and throughput")
+    parser.add_argument("--model-path", default="src/data/models/checkpoints/latest_english_generator")
+    parser.add_argument("--train-file", default="src/data/test_case_training.jsonl")
+    parser.add_argument("--samples", type=int, default=64, help="Training pairs for the loss and training checks")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--train-steps", type=int, default=5)
+    parser.add_argument("--prompts", type=int, default=8, help="Prompts for the inference check")
+    parser.add_argument("--gen-length", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Allowed relative loss difference")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    print(f"Native bf16 support: {'yes' if bf16_supported() else 'no (emulated, expect a slowdown)'}")
+    tokenizer = get_tokenizer(args.model_path)
+    model = T5ForConditionalGeneration.from_pretrained(args.model_path)
+    data = load_jsonl(args.train_file)[:args.samples]
+    batch_list = list(batches(tokenizer, data, args.batch_size, args.max_length))
+    prompts = [item["input"] for item in data[:args.prompts]]
+    print(f"{len(data)} training pairs, {len(prompts)} prompts\n")
+
+    results = {}
+    for precision in PRECISIONS:
+        loss = eval_loss(model, batch_list, precision)
+        train_rate = train_throughput(model, batch_list, precision, args.train_steps)
+        gen_rate, texts = generate_throughput(model, tokenizer, prompts, precision, args.gen_length)
+        results[precision] = (loss, train_rate, gen_rate, texts)
+
+    base_loss, base_train, base_gen, base_texts = results["fp32"]
+    print(f"{'precision':<9} {'eval loss':>9} {'rel diff':>8} {'train samples/s':>15} {'speedup':>7} "
+          f"{'gen tokens/s':>12} {'speedup':>7} {'same output':>11}")
+    print("-" * 87)
+    for precision, (loss, train_rate, gen_rate, texts) in results.items():
+        same = sum(a == b for a, b in zip(base_texts, texts))
+        print(f"{precision:<9} {loss:>9.4f} {abs(loss - base_loss) / base_loss:>8.2%} {train_rate:>15.2f} "
+              f"{train_rate / base_train:>6.2f}x {gen_rate:>12.1f} {gen_rate / base_gen:>6.2f}x {same:>5}/{len(texts)}")
+
+    drift = abs(results["bf16"][0] - base_loss) / base_loss
+    if drift > args.tolerance:
+        print(f"\n[FAIL] bf16 loss differs from fp32 by {drift:.2%} (tolerance {args.tolerance:.2%})")
+        return 1
+    print(f"\n[OK] bf16 loss within {args.tolerance:.2%} of fp32")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmark full-prompt vs shared-context generation for comprehensive test cases.
+
+Runs the scenarios of the first N endpoints of a Swagger spec through
+ComprehensiveTestGenerator once per prompt mode and reports encoder tokens,
+generated tokens and generated tokens/sec for each. "full" encodes every
+scenario's whole prompt; "shared" encodes each endpoint's context once
+(ai_model/shared_context.py).
+
+Usage:
+    python ai_model/benchmark_shared_context.py [--swagger data/raw/swagger_fixed.json] [--endpoints 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comprehensive_test_generator import PROMPT_MODES, ComprehensiveTestGenerator
+
+
+def endpoint_scenarios(generator, spec, limit):
+    """(path, method_info, scenarios) for the first `limit` operations."""
+    endpoints = []
+    for path, methods in spec.get("paths", {}).items():
+        for method, method_info in methods.items():
+            if method.lower() not in ("get", "post", "put", "delete"):
+                continue
+            required, optional = generator._analyze_parameters(method_info)
+            scenarios = (generator._generate_parameter_test_scenarios(required, optional)
+                         + generator._generate_security_test_scenarios(method_info)
+                         + generator._generate_performance_test_scenarios(method_info))
+            endpoints.append((path, method_info, scenarios))
+            if len(endpoints) == limit:
+                return endpoints
+    return endpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and shared-context prompt generation throughput")
+    parser.add_argument("--swagger", default="data/raw/swagger_fixed.json")
+    parser.add_argument("--model-path", default="src/data/models/checkpoints/latest_english_generator")
+    parser.add_argument("--endpoints", type=int, default=5, help="Endpoints to generate for")
+    args = parser.parse_args()
+
+    with open(args.swagger, "r") as f:
+        spec = json.load(f)
+
+    generator = ComprehensiveTestGenerator(args.model_path)
+    endpoints = endpoint_scenarios(generator, spec, args.endpoints)
+    print(f"{sum(len(s) for _, _, s in endpoints)} scenarios across {len(endpoints)} endpoints\n")
+
+    from ai_model.shared_context import GenerationStats
+
+    results = {}
+    for mode in PROMPT_MODES:
+        # One loaded model, both modes; counters reset per mode
+        generator.prompt_mode = mode
+        generator.stats = generator.shared_generator.stats = GenerationStats()
+        generator.shared_generator._contexts.clear()
+        for path, method_info, scenarios in endpoints:
+            generator._generate_scenario_test_cases(path, method_info, scenarios)
+        results[mode] = generator.stats
+
+    print(f"{'mode':<8} {'encoder tokens':>14} {'generated':>10} {'time (s)':>9} {'gen tokens/s':>13} {'speedup':>8}")
+    print("-" * 68)
+    baseline = results["full"].seconds
+    for mode, stats in results.items():
+        rate = stats.generated_tokens / stats.seconds if stats.seconds else 0
+        print(f"{mode:<8} {stats.encoder_tokens:>14} {stats.generated_tokens:>10} {stats.seconds:>9.1f} "
+              f"{rate:>13.1f} {baseline / stats.seconds if stats.seconds else 0:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
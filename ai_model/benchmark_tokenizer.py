@@ -0,0 +1,93 @@
+"""
+Benchmark tokenizer encode throughput on the training JSONL files.
+
+For every input and output text of the given files, compares the slow
+RobertaTokenizer encoding one text at a time (what the scripts used to do)
+with the shared fast tokenizer, one text at a time and in batches through
+encode_batch. It also checks that the fast tokenizer produces the same ids.
+
+Usage:
+    python ai_model/benchmark_tokenizer.py [files ...] [--checkpoint Salesforce/codet5-base] [--batch-size 256]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.tokenizer_provider import DEFAULT_CHECKPOINT, encode_batch, get_tokenizer
+
+DEFAULT_FILES = ["src/data/*.jsonl", "src/data/processed/*.jsonl"]
+
+
+def load_texts(paths):
+    texts = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    texts.extend(str(obj[key]) for key in ("input", "output") if obj.get(key))
+    return texts
+
+
+def time_it(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare slow, fast and batched tokenizer encode throughput")
+    parser.add_argument("files", nargs="*", help="Training JSONL files (default: src/data and src/data/processed)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-length", type=int, default=512)
+    args = parser.parse_args()
+
+    from transformers import RobertaTokenizer
+
+    files = args.files or sorted(f for pattern in DEFAULT_FILES for f in glob.glob(pattern))
+    texts = load_texts(files)
+    if not texts:
+        print("No training texts found")
+        return 1
+    print(f"{len(texts)} texts from {len(files)} files")
+
+    load_slow, slow = time_it(lambda: RobertaTokenizer.from_pretrained(args.checkpoint))
+    load_fast, fast = time_it(lambda: get_tokenizer(args.checkpoint))
+    load_again, _ = time_it(lambda: get_tokenizer(args.checkpoint))
+    print(f"load: slow {load_slow:.2f}s, fast {load_fast:.2f}s, fast again (memoized) {load_again * 1000:.3f}ms\n")
+
+    def one_by_one(tokenizer):
+        return [tokenizer(text, truncation=True, max_length=args.max_length)["input_ids"] for text in texts]
+
+    def batched():
+        ids = []
+        for start in range(0, len(texts), args.batch_size):
+            ids.extend(encode_batch(fast, texts[start:start + args.batch_size], max_length=args.max_length)["input_ids"])
+        return ids
+
+    results = {}
+    for name, fn in (("slow, per text", lambda: one_by_one(slow)),
+                     ("fast, per text", lambda: one_by_one(fast)),
+                     (f"fast, batches of {args.batch_size}", batched)):
+        results[name] = time_it(fn)
+
+    baseline = results["slow, per text"][0]
+    reference = results["slow, per text"][1]
+    tokens = sum(len(ids) for ids in reference)
+    print(f"{'tokenizer':<24} {'time (s)':>9} {'texts/s':>10} {'tokens/s':>11} {'speedup':>8}  ids")
+    print("-" * 75)
+    for name, (seconds, ids) in results.items():
+        same = "same" if ids == reference else "DIFFERENT"
+        print(f"{name:<24} {seconds:>9.2f} {len(texts) / seconds:>10.0f} {tokens / seconds:>11.0f} "
+              f"{baseline / seconds:>7.1f}x  {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark prioritization model training time against history size.
+
+For each history size, compares a full retrain on the whole history with an
+incremental update that only boosts on one new day of runs.
+
+Usage:
+    python ai_model/benchmark_training.py [--sizes 10000 50000 200000] [--new-rows 5000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model import train_model
+
+
+def synthetic_history(num_rows, num_endpoints=200, start=None, seed=0):
+    """History rows spread over the days before `start`, with a per-endpoint error rate."""
+    rng = np.random.default_rng(seed)
+    start = start or pd.Timestamp.now()
+    endpoint = rng.integers(0, num_endpoints, num_rows)
+    latency = rng.gamma(2.0, 200.0, num_rows)
+    error_rate = np.linspace(0.02, 0.4, num_endpoints)[endpoint]
+    is_error = (rng.random(num_rows) < error_rate).astype(int)
+    days_back = rng.integers(0, 90, num_rows)
+    return pd.DataFrame({
+        "method": np.where(endpoint % 3 == 0, "POST", "GET"),
+        "url": [f"http://localhost:8502/v1.5/endpoint/{e}" for e in endpoint],
+        "status_code": np.where(is_error == 1, 500, 200),
+        "latency_ms": latency.round(2),
+        "is_error": is_error,
+        "latency_bucket": pd.cut(latency, [-1, 500, 2000, np.inf], labels=["fast", "medium", "slow"]).astype(str),
+        "timestamp": start - pd.to_timedelta(days_back, unit="D"),
+    })
+
+
+def time_it(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs incremental prioritization training")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--new-rows", type=int, default=5_000, help="Rows in the new partition")
+    args = parser.parse_args()
+
+    print(f"{'history rows':>12} | {'full (s)':>9} | {'incremental (s)':>15} | speedup")
+    print("-" * 55)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            history = synthetic_history(size, start=pd.Timestamp.now() - pd.Timedelta(days=1))
+            new_rows = synthetic_history(args.new_rows, seed=1)
+            new_rows["timestamp"] = pd.Timestamp.now()
+            model_path = os.path.join(tmp, "model.json")
+
+            full_s, (model, encoder) = time_it(lambda: train_model.train_full(
+                pd.concat([history, new_rows], ignore_index=True)))
+            model.save_model(model_path)
+            incremental_s, _ = time_it(lambda: train_model.train_incremental(new_rows, encoder, model_path))
+
+        print(f"{size:>12} | {full_s:>9.2f} | {incremental_s:>15.2f} | {full_s / incremental_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
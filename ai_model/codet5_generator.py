@@ -1,14 +1,15 @@
 # ai_model/codet5_generator.py
-from transformers import T5ForConditionalGeneration, RobertaTokenizer
+from transformers import T5ForConditionalGeneration
 import torch
 import json
 from typing import Dict, List, Any
 from swagger_parser import SwaggerParser
+from ai_model.tokenizer_provider import decode_batch, get_tokenizer
 
 class CodeT5TestGenerator:
     def __init__(self, model_name: str = "Salesforce/codet5-base"):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.tokenizer = RobertaTokenizer.from_pretrained(model_name)
+        self.tokenizer = get_tokenizer(model_name)
         self.model = T5ForConditionalGeneration.from_pretrained(model_name).to(self.device)
         
     def _prepare_swagger_prompt(self, swagger_spec: Dict[str, Any]) -> str:
@@ -54,10 +55,7 @@ class CodeT5TestGenerator:
         )
         
         # Decode the generated test cases
-        test_cases = []
-        for output in outputs:
-            test_case = self.tokenizer.decode(output, skip_special_tokens=True)
-            test_cases.append(test_case)
+        test_cases = decode_batch(self.tokenizer, outputs)
             
         return test_cases
 
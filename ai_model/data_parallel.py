@@ -0,0 +1,44 @@
+"""
+Process, thread and batch layout for data-parallel CPU fine-tuning.
+
+Kept free of torch so launchers and tests can use it without loading the
+training stack. fine_tune_codet5.py and benchmark_ddp_training.py split
+GLOBAL_BATCH_SIZE across processes with batch_layout, and the cores with
+threads_per_process.
+"""
+
+import os
+
+# Samples per optimizer step across all processes (per-device batch x accumulation x processes)
+GLOBAL_BATCH_SIZE = 64
+# Largest per-device batch; the rest of a process' share is gradient accumulation
+PER_DEVICE_BATCH_SIZE = 16
+
+
+def world_size():
+    """Processes in this training run (set by torch.distributed.run)."""
+    return int(os.environ.get("WORLD_SIZE", 1))
+
+
+def threads_per_process(processes):
+    """Intra-op threads of each process: OMP_NUM_THREADS if set, else an equal share of the cores."""
+    if os.environ.get("OMP_NUM_THREADS"):
+        return int(os.environ["OMP_NUM_THREADS"])
+    return max(1, (os.cpu_count() or 1) // processes)
+
+
+def batch_layout(processes):
+    """
+    (per-device batch, gradient accumulation steps) that keep GLOBAL_BATCH_SIZE for this many processes.
+
+    Raises ValueError when the global batch cannot be split evenly, rather than
+    silently training with a different one.
+    """
+    if processes < 1 or GLOBAL_BATCH_SIZE % processes:
+        raise ValueError(f"{processes} processes cannot split a global batch of {GLOBAL_BATCH_SIZE} evenly; "
+                         f"use a divisor of {GLOBAL_BATCH_SIZE}")
+    per_process = GLOBAL_BATCH_SIZE // processes
+    per_device = min(PER_DEVICE_BATCH_SIZE, per_process)
+    while per_process % per_device:
+        per_device -= 1
+    return per_device, per_process // per_device
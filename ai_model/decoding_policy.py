@@ -0,0 +1,202 @@
+"""
+Adaptive decoding policy for the test generators.
+
+Every generate() call used the same heavy decoding (5 beams, sometimes with
+sampling), so a `no_auth` scenario cost as much as a parameter combination
+test. DecodingPolicy picks a decoding strategy per scenario type and endpoint
+complexity, and tightens max_length from the output lengths seen so far:
+
+    greedy       fixed-shape scenarios (auth, injection, rate limit, ...)
+    small_beam   parameter scenarios on simple endpoints
+    beam         parameter scenarios on complex endpoints (the old default)
+    sampled      combination scenarios, where variety matters more than the best path
+
+Each call is recorded: generated tokens, time, whether max_length cut it off,
+and a quality score when the caller has one (the evaluator's similarity to
+the reference). The stats are kept in ai_model/data/decoding_policy.json;
+`python -m ai_model.decoding_policy report` shows cost and quality per
+policy, so the tables below can be tuned.
+
+    policy = DecodingPolicy.load()
+    name, kwargs = policy.choose(scenario_type, complexity, base_kwargs)
+    ... generate ...
+    policy.record(scenario_type, name, output_tokens, seconds, max_length=kwargs["max_length"])
+    policy.save()
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+STATS_PATH = "ai_model/data/decoding_policy.json"
+
+POLICIES = {
+    "greedy": {"num_beams": 1, "do_sample": False},
+    "small_beam": {"num_beams": 2, "do_sample": False, "early_stopping": True},
+    "beam": {"num_beams": 5, "do_sample": False, "early_stopping": True},
+    "sampled": {"num_beams": 1, "do_sample": True, "top_k": 50, "top_p": 0.95, "temperature": 0.7},
+}
+
+# Scenario type -> policy; other types use DEFAULT_POLICY
+SCENARIO_POLICIES = {
+    "no_auth": "greedy",
+    "invalid_auth": "greedy",
+    "expired_auth": "greedy",
+    "sql_injection": "greedy",
+    "xss_test": "greedy",
+    "rate_limit": "greedy",
+    "large_payload": "greedy",
+    "concurrent_requests": "greedy",
+    "timeout_test": "greedy",
+    "all_required": "small_beam",
+    "missing_required": "small_beam",
+    "invalid_enum": "small_beam",
+    "boundary_test": "small_beam",
+    "pattern_test": "small_beam",
+    "optional_combination": "sampled",
+}
+DEFAULT_POLICY = "small_beam"
+# Endpoints with at least this many parameters/body fields get full beam search instead of small_beam
+COMPLEX_ENDPOINT = 8
+
+# Settings that only apply to one kind of decoding; dropped when the policy does not use it
+DECODING_KEYS = {"num_beams", "do_sample", "top_k", "top_p", "temperature", "early_stopping", "length_penalty"}
+BEAM_ONLY_KEYS = {"length_penalty"}
+
+# max_length becomes LENGTH_HEADROOM x the LENGTH_QUANTILE of observed lengths, once there are enough
+LENGTH_QUANTILE = 0.95
+LENGTH_HEADROOM = 1.25
+LENGTH_MARGIN = 8
+MIN_LENGTH_SAMPLES = 20
+MAX_LENGTH_SAMPLES = 500
+
+
+def endpoint_complexity(method_info):
+    """Parameters plus request body properties of a Swagger operation."""
+    complexity = len(method_info.get("parameters", []))
+    for param in method_info.get("parameters", []):
+        if param.get("in") == "body":
+            complexity += len(param.get("schema", {}).get("properties", {}))
+    body = method_info.get("requestBody", {}).get("content", {}).get("application/json", {})
+    complexity += len(body.get("schema", {}).get("properties", {}))
+    return complexity
+
+
+def _quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+
+class DecodingPolicy:
+    def __init__(self, stats=None, stats_path=STATS_PATH):
+        self.stats_path = stats_path
+        stats = stats or {}
+        # scenario type -> recent output lengths (tokens)
+        self.lengths = stats.get("lengths", {})
+        # policy -> {"calls", "tokens", "seconds", "truncated", "quality_sum", "quality_calls"}
+        self.costs = stats.get("costs", {})
+
+    @classmethod
+    def load(cls, stats_path=STATS_PATH):
+        try:
+            with open(stats_path, "r") as f:
+                return cls(json.load(f), stats_path)
+        except (OSError, ValueError):
+            return cls(stats_path=stats_path)
+
+    def save(self):
+        directory = os.path.dirname(self.stats_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.stats_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"lengths": self.lengths, "costs": self.costs}, f)
+        os.replace(tmp_path, self.stats_path)
+
+    def policy_for(self, scenario_type=None, complexity=None):
+        name = SCENARIO_POLICIES.get(scenario_type, DEFAULT_POLICY)
+        if name == "small_beam" and complexity is not None and complexity >= COMPLEX_ENDPOINT:
+            name = "beam"
+        return name
+
+    def max_length_for(self, scenario_type, default):
+        """Observed-length cap for a scenario type, never above the caller's max_length."""
+        lengths = self.lengths.get(scenario_type or "*", [])
+        if len(lengths) < MIN_LENGTH_SAMPLES:
+            return default
+        cap = int(_quantile(lengths, LENGTH_QUANTILE) * LENGTH_HEADROOM) + LENGTH_MARGIN
+        return min(default, cap) if default else cap
+
+    def choose(self, scenario_type=None, complexity=None, base_kwargs=None, policy=None):
+        """
+        (policy name, generate() kwargs): base_kwargs with the policy's decoding and max_length.
+
+        `policy` forces a policy by name instead of the scenario table, e.g. to
+        score every policy on the same evaluation set.
+        """
+        name = policy or self.policy_for(scenario_type, complexity)
+        policy = POLICIES[name]
+        kwargs = {k: v for k, v in (base_kwargs or {}).items() if k not in DECODING_KEYS}
+        if policy["num_beams"] > 1:
+            kwargs.update({k: v for k, v in (base_kwargs or {}).items() if k in BEAM_ONLY_KEYS})
+        kwargs.update(policy)
+        if "max_length" in kwargs:
+            kwargs["max_length"] = self.max_length_for(scenario_type, kwargs["max_length"])
+        return name, kwargs
+
+    def record(self, scenario_type, policy, output_tokens, seconds, max_length=None, quality=None):
+        """Record one generated output (and its quality score, if known)."""
+        lengths = self.lengths.setdefault(scenario_type or "*", [])
+        lengths.append(int(output_tokens))
+        del lengths[:-MAX_LENGTH_SAMPLES]
+
+        cost = self.costs.setdefault(policy, {"calls": 0, "tokens": 0, "seconds": 0.0, "truncated": 0,
+                                              "quality_sum": 0.0, "quality_calls": 0})
+        cost["calls"] += 1
+        cost["tokens"] += int(output_tokens)
+        cost["seconds"] += seconds
+        if max_length is not None and output_tokens >= max_length - 1:
+            cost["truncated"] += 1
+        if quality is not None:
+            cost["quality_sum"] += quality
+            cost["quality_calls"] += 1
+
+    def report(self):
+        lines = [f"{'policy':<12} {'calls':>6} {'avg tokens':>10} {'avg s':>7} {'tokens/s':>9} "
+                 f"{'truncated':>9} {'quality':>8}", "-" * 68]
+        for name in POLICIES:
+            cost = self.costs.get(name)
+            if not cost or not cost["calls"]:
+                continue
+            calls = cost["calls"]
+            rate = cost["tokens"] / cost["seconds"] if cost["seconds"] else 0
+            quality = f"{cost['quality_sum'] / cost['quality_calls']:.3f}" if cost["quality_calls"] else "-"
+            lines.append(f"{name:<12} {calls:>6} {cost['tokens'] / calls:>10.1f} {cost['seconds'] / calls:>7.2f} "
+                         f"{rate:>9.1f} {cost['truncated'] / calls:>9.1%} {quality:>8}")
+        lines.append("")
+        lines.append(f"{'scenario type':<22} {'samples':>7} {'p95 tokens':>10} {'max_length cap':>14}")
+        for scenario_type, lengths in sorted(self.lengths.items()):
+            cap = self.max_length_for(scenario_type, None)
+            lines.append(f"{scenario_type:<22} {len(lengths):>7} {_quantile(lengths, LENGTH_QUANTILE):>10} "
+                         f"{cap if cap else '-':>14}")
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or reset decoding policy cost/quality stats")
+    parser.add_argument("command", choices=["report", "reset"])
+    parser.add_argument("--stats", default=STATS_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "reset":
+        DecodingPolicy(stats_path=args.stats).save()
+        print(f"Reset {args.stats}")
+    else:
+        print(DecodingPolicy.load(args.stats).report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Distill a small draft model from the fine-tuned generator.
+
+The draft (codet5-small by default) is trained on the same JSONL pairs as the
+generator, against both the reference output and the generator's own token
+distribution (temperature-scaled KL divergence). The closer the draft follows
+the generator, the more of its proposed tokens are accepted during assisted
+decoding (ai_model/draft_model.py).
+
+The draft only speeds up single-beam generation, so it is not part of the
+default pipeline (which generates with 5-beam search). Run it after
+retraining the generator when using --decoding adaptive --draft-model.
+
+Usage:
+    python ai_model/distill_draft_model.py [--train_file src/data/test_case_training.jsonl ...]
+        [--teacher src/data/models/checkpoints/latest_english_generator]
+        [--student Salesforce/codet5-small] [--output_dir src/data/models/checkpoints/latest_english_draft]
+"""
+
+import argparse
+import os
+import sys
+
+import torch
+import torch.nn.functional as F
+from transformers import T5ForConditionalGeneration, Trainer, TrainingArguments, DataCollatorForSeq2Seq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.draft_model import DEFAULT_DRAFT_PATH
+from ai_model.fine_tune_codet5 import TestCaseDataset, load_jsonl
+from ai_model.tokenizer_provider import get_tokenizer
+
+TEACHER_PATH = "src/data/models/checkpoints/latest_english_generator"
+STUDENT_NAME = "Salesforce/codet5-small"
+TRAIN_FILE = "src/data/test_case_training.jsonl"
+
+
+class DistillationTrainer(Trainer):
+    """Trainer whose loss mixes the reference cross-entropy with KL divergence to a teacher."""
+
+    def __init__(self, *args, teacher=None, temperature=2.0, alpha=0.5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.teacher = teacher.to(self.args.device)
+        self.teacher.eval()
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        outputs = model(**inputs)
+        with torch.no_grad():
+            teacher_logits = self.teacher(**inputs).logits
+
+        # Only label positions count; padding is -100
+        mask = inputs["labels"] != -100
+        t = self.temperature
+        distill_loss = F.kl_div(
+            F.log_softmax(outputs.logits[mask] / t, dim=-1),
+            F.softmax(teacher_logits[mask] / t, dim=-1),
+            reduction="batchmean",
+        ) * t * t
+        loss = self.alpha * outputs.loss + (1 - self.alpha) * distill_loss
+        return (loss, outputs) if return_outputs else loss
+
+
+def main(train_files, teacher_path, student_name, output_dir, num_train_epochs, temperature, alpha):
+    torch.set_num_threads(1)
+
+    data = [item for path in train_files for item in load_jsonl(path)]
+    print(f"Distilling on {len(data)} examples from {len(train_files)} file(s)")
+
+    tokenizer = get_tokenizer(teacher_path)
+    teacher = T5ForConditionalGeneration.from_pretrained(teacher_path)
+    student = T5ForConditionalGeneration.from_pretrained(student_name)
+    if student.config.vocab_size != teacher.config.vocab_size:
+        raise ValueError(f"{student_name} vocabulary ({student.config.vocab_size}) does not match "
+                         f"the teacher's ({teacher.config.vocab_size})")
+    print(f"Teacher: {teacher.num_parameters() / 1e6:.0f}M parameters, "
+          f"student: {student.num_parameters() / 1e6:.0f}M parameters")
+
+    dataset = TestCaseDataset(data, tokenizer)
+
+    training_args = TrainingArguments(
+        output_dir=output_dir,
+        per_device_train_batch_size=16,
+        gradient_accumulation_steps=4,
+        num_train_epochs=num_train_epochs,
+        save_steps=50,
+        save_total_limit=1,
+        logging_steps=10,
+        learning_rate=3e-4,              # Small model, higher learning rate
+        warmup_ratio=0.1,
+        remove_unused_columns=False,
+        dataloader_num_workers=0,
+        optim="adamw_torch",
+        weight_decay=0.01,
+    )
+
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=dataset,
+        data_collator=DataCollatorForSeq2Seq(tokenizer, model=student),
+        teacher=teacher,
+        temperature=temperature,
+        alpha=alpha,
+    )
+
+    trainer.train()
+    trainer.save_model(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"Draft model saved to {output_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distill a draft model for assisted decoding from the fine-tuned generator.")
+    parser.add_argument("--train_file", nargs="+", default=[TRAIN_FILE], help="Training data file(s) (JSONL format).")
+    parser.add_argument("--teacher", default=TEACHER_PATH, help="Fine-tuned generator to distill.")
+    parser.add_argument("--student", default=STUDENT_NAME, help="Model to initialize the draft from.")
+    parser.add_argument("--output_dir", default=DEFAULT_DRAFT_PATH, help="Directory to save the draft model.")
+    parser.add_argument("--num_train_epochs", type=int, default=10, help="Number of training epochs.")
+    parser.add_argument("--temperature", type=float, default=2.0, help="Softmax temperature for the distillation loss.")
+    parser.add_argument("--alpha", type=float, default=0.5, help="Weight of the reference loss (the rest is distillation).")
+    args = parser.parse_args()
+    main(args.train_file, args.teacher, args.student, args.output_dir, args.num_train_epochs,
+         args.temperature, args.alpha)
@@ -0,0 +1,55 @@
+"""
+Draft model for assisted (speculative) decoding.
+
+A small seq2seq model distilled from the fine-tuned generator (see
+ai_model/distill_draft_model.py) proposes several tokens at a time and the
+generator verifies them in one forward pass. With greedy decoding the output
+is the same as the generator's own; only the number of expensive forward
+passes drops.
+
+transformers only supports assisted generation for one sequence with a single
+beam, so generate() passes the draft for greedy and sampled decoding and
+falls back to plain generation for beam search:
+
+    draft = load_draft_model(DEFAULT_DRAFT_PATH, device, model)
+    ids = generate(model, input_ids, draft, max_length=200, num_beams=1)
+"""
+
+import os
+
+DEFAULT_DRAFT_PATH = "src/data/models/checkpoints/latest_english_draft"
+
+
+def load_draft_model(path, device, model=None):
+    """
+    Load a draft checkpoint for assisted decoding.
+
+    Args:
+        path: Draft checkpoint directory
+        device: Device to put it on (the generator's)
+        model: Generator it will assist; its vocabulary must match the draft's
+    """
+    from transformers import T5ForConditionalGeneration
+
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Draft model not found: {path} (train one with ai_model/distill_draft_model.py)")
+    draft = T5ForConditionalGeneration.from_pretrained(path).to(device)
+    draft.eval()
+    if model is not None and draft.config.vocab_size != model.config.vocab_size:
+        raise ValueError(f"Draft vocabulary ({draft.config.vocab_size}) does not match the generator's "
+                         f"({model.config.vocab_size})")
+    return draft
+
+
+def can_assist(input_ids, generate_kwargs):
+    """Whether transformers can use a draft for this generate() call."""
+    return (input_ids.shape[0] == 1
+            and generate_kwargs.get("num_beams", 1) == 1
+            and generate_kwargs.get("num_return_sequences", 1) == 1)
+
+
+def generate(model, input_ids, draft=None, **generate_kwargs):
+    """model.generate(), assisted by the draft when there is one and the decoding allows it."""
+    if draft is not None and can_assist(input_ids, generate_kwargs):
+        generate_kwargs["assistant_model"] = draft
+    return model.generate(input_ids, **generate_kwargs)
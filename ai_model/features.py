@@ -0,0 +1,208 @@
+"""
+Feature pipeline for the test prioritization model.
+
+Concrete URLs embed device GUIDs, tokens and transaction IDs, so one-hot
+encoding them makes the matrix grow with every run and leaves unseen URLs
+without a meaningful score. Instead:
+
+- URLs are normalized to their Swagger path template
+  (/v1.5/device/f7da845e-... -> /v1.5/device/{deviceGuid})
+- method, template and latency bucket are hashed into a fixed number of
+  sparse columns, so the width never changes between training cycles
+- each row gets rolling per-template aggregates (error rate, p50/p90 latency)
+  computed from earlier runs only; the latest values are kept in the encoder
+  so scoring a single test is a dict lookup plus a hash
+"""
+
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+
+ENCODER_PATH = "ai_model/data/feature_encoder.json"
+SWAGGER_PATH = "test_case_generator/data/swagger.json"
+
+AGGREGATE_FEATURES = ["endpoint_error_rate", "endpoint_latency_p50", "endpoint_latency_p90"]
+
+# Path segments that look like identifiers when no Swagger template matches
+_ID_SEGMENT_RE = re.compile(
+    r"^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+|[0-9A-Z]{16,})$"
+)
+
+# Trie key marking the end of a template; never a path segment since paths are split on "/"
+_LEAF = "/"
+
+
+def bucket_latency(ms):
+    """Coarse latency bucket used as a categorical feature."""
+    if ms is None:
+        return "unknown"
+    if ms < 500:
+        return "fast"
+    elif ms < 2000:
+        return "medium"
+    return "slow"
+
+
+class PathTemplateMatcher:
+    """Maps concrete URLs to Swagger path templates, preferring the most literal match."""
+
+    def __init__(self, templates: list = None):
+        self.templates = list(templates or [])
+        # Segment trie: literal segments are keys, None is a {param} segment and
+        # _LEAF holds the index of the first template ending at that node
+        self._trie = {}
+        for position, template in enumerate(self.templates):
+            node = self._trie
+            for segment in template.strip("/").split("/"):
+                node = node.setdefault(None if segment.startswith("{") else segment, {})
+            node.setdefault(_LEAF, position)
+        self._cache = {}
+
+    @classmethod
+    def from_swagger(cls, swagger_path: str = SWAGGER_PATH) -> "PathTemplateMatcher":
+        if not os.path.exists(swagger_path):
+            print(f"Swagger spec not found at {swagger_path}, using heuristic URL normalization")
+            return cls()
+        with open(swagger_path, "r") as f:
+            spec = json.load(f)
+        base_path = spec.get("basePath", "").rstrip("/")
+        return cls([base_path + path for path in spec.get("paths", {})])
+
+    def match(self, url: str) -> str:
+        template = self._cache.get(url)
+        if template is None:
+            template = self._cache[url] = self._match(url)
+        return template
+
+    def _match(self, url: str) -> str:
+        path = urlparse(url).path if "://" in url else url.split("?", 1)[0]
+        segments = path.strip("/").split("/")
+
+        # Depth-first over literal and {param} branches; most literals wins, then template order
+        best = None
+        stack = [(self._trie, 0, 0)]
+        while stack:
+            node, depth, literals = stack.pop()
+            if depth == len(segments):
+                if _LEAF in node and (best is None or (-literals, node[_LEAF]) < best):
+                    best = (-literals, node[_LEAF])
+                continue
+            if None in node:
+                stack.append((node[None], depth + 1, literals))
+            child = node.get(segments[depth])
+            if child is not None:
+                stack.append((child, depth + 1, literals + 1))
+        if best is not None:
+            return self.templates[best[1]]
+
+        return "/" + "/".join("{id}" if _ID_SEGMENT_RE.match(s) else s for s in segments)
+
+
+class FeatureEncoder:
+    def __init__(self, templates: list = None, n_features: int = 2 ** 12, window: int = 50,
+                 aggregates: dict = None, defaults: dict = None):
+        self.matcher = PathTemplateMatcher(templates)
+        self.n_features = n_features
+        self.window = window
+        # Latest rolling aggregates per template, used when scoring
+        self.aggregates = aggregates or {}
+        self.defaults = defaults or dict(zip(AGGREGATE_FEATURES, [0.0, 0.0, 0.0]))
+        self._hasher = FeatureHasher(n_features=n_features, input_type="string", alternate_sign=False)
+
+    @classmethod
+    def from_swagger(cls, swagger_path: str = SWAGGER_PATH, **kwargs) -> "FeatureEncoder":
+        return cls(templates=PathTemplateMatcher.from_swagger(swagger_path).templates, **kwargs)
+
+    @property
+    def width(self) -> int:
+        return self.n_features + len(AGGREGATE_FEATURES)
+
+    def template(self, url: str) -> str:
+        return self.matcher.match(str(url))
+
+    def _hashed(self, methods, templates, buckets):
+        tokens = (
+            [f"method={m}", f"template={t}", f"bucket={b}", f"endpoint={m} {t}"]
+            for m, t, b in zip(methods, templates, buckets)
+        )
+        return self._hasher.transform(tokens)
+
+    def _rolling_aggregates(self, df: pd.DataFrame, templates: pd.Series) -> pd.DataFrame:
+        """Per-template aggregates over the previous `window` runs (current row excluded)."""
+        frame = pd.DataFrame({
+            "template": templates.to_numpy(),
+            "is_error": pd.to_numeric(df["is_error"], errors="coerce").to_numpy(dtype=float),
+            "latency_ms": pd.to_numeric(df["latency_ms"], errors="coerce").to_numpy(dtype=float),
+        })
+        if "timestamp" in df.columns:
+            frame["order"] = pd.to_datetime(df["timestamp"]).to_numpy()
+            frame = frame.sort_values("order", kind="stable")
+
+        grouped = frame.groupby("template", sort=False)
+        prior_errors = grouped["is_error"].shift()
+        prior_latency = grouped["latency_ms"].shift()
+        keys = frame["template"]
+        rolling = lambda s: s.groupby(keys, sort=False).rolling(self.window, min_periods=1)
+        result = pd.DataFrame({
+            "endpoint_error_rate": rolling(prior_errors).mean().reset_index(level=0, drop=True),
+            "endpoint_latency_p50": rolling(prior_latency).quantile(0.5).reset_index(level=0, drop=True),
+            "endpoint_latency_p90": rolling(prior_latency).quantile(0.9).reset_index(level=0, drop=True),
+        })
+
+        # First run of a template: fall back to what earlier training cycles saw
+        prior = pd.DataFrame([self.aggregates.get(t, self.defaults) for t in keys], index=frame.index)
+        result = result.fillna(prior[AGGREGATE_FEATURES])
+
+        # Remember the latest window per template for scoring and the next cycle
+        for template, group in grouped:
+            tail = group.tail(self.window)
+            self.aggregates[template] = {
+                "endpoint_error_rate": float(tail["is_error"].mean()),
+                "endpoint_latency_p50": float(np.nan_to_num(tail["latency_ms"].quantile(0.5))),
+                "endpoint_latency_p90": float(np.nan_to_num(tail["latency_ms"].quantile(0.9))),
+            }
+        return result.sort_index()
+
+    def fit_transform(self, df: pd.DataFrame) -> sparse.csr_matrix:
+        """Encode training rows, updating the stored per-template aggregates."""
+        df = df.reset_index(drop=True)
+        templates = df["url"].astype(str).map(self.template)
+        hashed = self._hashed(df["method"].astype(str), templates, df["latency_bucket"].astype(str))
+        aggregates = self._rolling_aggregates(df, templates)
+
+        self.defaults = {name: float(aggregates[name].mean()) for name in AGGREGATE_FEATURES}
+        return sparse.hstack([hashed, sparse.csr_matrix(aggregates[AGGREGATE_FEATURES].to_numpy())],
+                             format="csr")
+
+    def transform(self, df: pd.DataFrame) -> sparse.csr_matrix:
+        """Encode rows for scoring, using the stored aggregates for each template."""
+        templates = df["url"].astype(str).map(self.template)
+        hashed = self._hashed(df["method"].astype(str), templates, df["latency_bucket"].astype(str))
+        aggregates = np.array([[self.aggregates.get(t, self.defaults)[name] for name in AGGREGATE_FEATURES]
+                               for t in templates], dtype=float).reshape(-1, len(AGGREGATE_FEATURES))
+        return sparse.hstack([hashed, sparse.csr_matrix(aggregates)], format="csr")
+
+    def save(self, path: str = ENCODER_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "templates": self.matcher.templates,
+                "n_features": self.n_features,
+                "window": self.window,
+                "aggregates": self.aggregates,
+                "defaults": self.defaults,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str = ENCODER_PATH) -> "FeatureEncoder":
+        with open(path, "r") as f:
+            state = json.load(f)
+        if "columns" in state:
+            raise ValueError(f"{path} uses the old one-hot format; retrain with --mode full")
+        return cls(**state)
@@ -1,8 +1,17 @@
 import json
-from transformers import T5ForConditionalGeneration, RobertaTokenizer, Trainer, TrainingArguments, DataCollatorForSeq2Seq
+import os
+import subprocess
+import sys
+from transformers import T5ForConditionalGeneration, Trainer, TrainingArguments, DataCollatorForSeq2Seq
 from torch.utils.data import Dataset
 import torch
 import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.data_parallel import batch_layout, threads_per_process, world_size
+from ai_model.precision import PRECISIONS, check_precision
+from ai_model.tokenizer_provider import encode_batch, get_tokenizer
 
 TRAIN_FILE = "src/data/test_case_training.jsonl"
 MODEL_NAME = "Salesforce/codet5-base"
@@ -17,27 +26,45 @@ class TestCaseDataset(Dataset):
         self.data = data
         self.tokenizer = tokenizer
         self.max_length = max_length
+        # Tokenized once in batches, instead of per item on every epoch
+        self.inputs = encode_batch(tokenizer, [item["input"] for item in data], max_length=max_length)
+        self.outputs = encode_batch(tokenizer, [item["output"] for item in data], max_length=max_length)
 
     def __len__(self):
         return len(self.data)
 
     def __getitem__(self, idx):
-        item = self.data[idx]
-        input_enc = self.tokenizer(
-            item["input"], truncation=True, padding=False, max_length=self.max_length, return_tensors="np"
-        )
-        output_enc = self.tokenizer(
-            item["output"], truncation=True, padding=False, max_length=self.max_length, return_tensors="np"
-        )
         return {
-            "input_ids": input_enc["input_ids"].squeeze(),
-            "attention_mask": input_enc["attention_mask"].squeeze(),
-            "labels": output_enc["input_ids"].squeeze()
+            "input_ids": np.asarray(self.inputs["input_ids"][idx]),
+            "attention_mask": np.asarray(self.inputs["attention_mask"][idx]),
+            "labels": np.asarray(self.outputs["input_ids"][idx])
         }
 
-def main(train_file, output_dir, model_name, num_train_epochs):
-    # Optimize for CPU
-    torch.set_num_threads(1)
+def launch_distributed(nproc, argv):
+    """
+    Re-run this script under torch.distributed.run with `nproc` local processes.
+
+    Each process gets an equal share of the CPU cores; the Trainer then runs
+    DistributedDataParallel over gloo, shards the data with a DistributedSampler
+    and only saves checkpoints from rank 0.
+    """
+    threads = threads_per_process(nproc)
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads))
+    command = [sys.executable, "-m", "torch.distributed.run", "--standalone", f"--nproc_per_node={nproc}",
+               os.path.abspath(__file__)] + argv
+    print(f"Launching {nproc} training processes with {threads} thread(s) each")
+    return subprocess.call(command, env=env)
+
+
+def main(train_file, output_dir, model_name, num_train_epochs, max_steps=-1, metrics_file=None, precision="fp32"):
+    check_precision(precision)
+    processes = world_size()
+    per_device_batch_size, gradient_accumulation_steps = batch_layout(processes)
+    # All cores for a single process, an equal share each under launch_distributed
+    threads = threads_per_process(processes)
+    torch.set_num_threads(threads)
+    print(f"{processes} process(es) x {threads} thread(s), batch {per_device_batch_size} x "
+          f"{gradient_accumulation_steps} accumulation steps per process")
     
     print(f"CUDA available: {torch.cuda.is_available()}")
     device_count = torch.cuda.device_count() if torch.cuda.is_available() else 0
@@ -45,7 +72,7 @@ def main(train_file, output_dir, model_name, num_train_epochs):
     
     data = load_jsonl(train_file)
 
-    tokenizer = RobertaTokenizer.from_pretrained(model_name)
+    tokenizer = get_tokenizer(model_name)
     model = T5ForConditionalGeneration.from_pretrained(model_name)
     
     # Enable gradient checkpointing
@@ -55,21 +82,25 @@ def main(train_file, output_dir, model_name, num_train_epochs):
 
     training_args = TrainingArguments(
         output_dir=output_dir,
-        per_device_train_batch_size=16,  # Increased from 8
-        gradient_accumulation_steps=4,    # Added gradient accumulation
+        # data_parallel.GLOBAL_BATCH_SIZE samples per optimizer step for any process count
+        per_device_train_batch_size=per_device_batch_size,
+        gradient_accumulation_steps=gradient_accumulation_steps,
         num_train_epochs=num_train_epochs,
+        max_steps=max_steps,
         save_steps=50,                    # Reduced checkpoint frequency
         save_total_limit=1,              # Keep only the latest checkpoint
         logging_steps=10,
         learning_rate=1e-4,              # Slightly increased learning rate
         warmup_ratio=0.1,               # Added warmup
-        fp16=False,                      # Mixed precision training
+        fp16=False,                      # No fp16 on CPU
         remove_unused_columns=False,
         dataloader_num_workers=0,        # Use 0 workers for CPU training on Windows
         gradient_checkpointing=True,     # Enable gradient checkpointing
         optim="adamw_torch",            # Use PyTorch's AdamW implementation
-        bf16=False,                     # Disable bfloat16 since we're using fp16
+        bf16=precision == "bf16",       # CPU autocast to bf16, fp32 master weights (ai_model/precision.py)
         weight_decay=0.01,              # Added weight decay for regularization
+        ddp_backend="gloo" if processes > 1 else None,
+        ddp_find_unused_parameters=False,  # Required with gradient checkpointing under DDP
     )
 
     data_collator = DataCollatorForSeq2Seq(tokenizer, model=model)
@@ -81,10 +112,18 @@ def main(train_file, output_dir, model_name, num_train_epochs):
         data_collator=data_collator,
     )
 
-    trainer.train()
+    result = trainer.train()
+    # save_model only writes from rank 0; everything else here is rank 0 only too
     trainer.save_model(output_dir)
+    if not trainer.is_world_process_zero():
+        return
     tokenizer.save_pretrained(output_dir)
     print(f"Fine-tuned model saved to {output_dir}")
+    print(f"Training throughput: {result.metrics['train_samples_per_second']:.2f} samples/s "
+          f"over {processes} process(es), {precision}")
+    if metrics_file:
+        with open(metrics_file, "w") as f:
+            json.dump(dict(result.metrics, processes=processes, precision=precision), f, indent=2)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fine-tune CodeT5 model for test case generation.")
@@ -92,5 +131,17 @@ if __name__ == "__main__":
     parser.add_argument("--output_dir", type=str, default="src/data/models/checkpoints/latest_english_generator", help="Directory to save the fine-tuned model.")
     parser.add_argument("--model_name", type=str, default="Salesforce/codet5-base", help="Name of the base model to fine-tune.")
     parser.add_argument("--num_train_epochs", type=int, default=20, help="Number of training epochs.")
+    parser.add_argument("--max_steps", type=int, default=-1, help="Stop after this many optimizer steps (overrides epochs).")
+    parser.add_argument("--nproc", type=int, default=1, help="Local training processes (data parallel over gloo).")
+    parser.add_argument("--metrics_file", type=str, default=None, help="Write the training metrics (JSON) here.")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32", help="bf16: CPU autocast with fp32 master weights.")
     args = parser.parse_args()
-    main(args.train_file, args.output_dir, args.model_name, args.num_train_epochs) 
\ No newline at end of file
+    # Processes started by torch.distributed.run have LOCAL_RANK set and train instead of launching again
+    if args.nproc > 1 and "LOCAL_RANK" not in os.environ:
+        try:
+            batch_layout(args.nproc)
+        except ValueError as e:
+            parser.error(str(e))
+        sys.exit(launch_distributed(args.nproc, sys.argv[1:]))
+    main(args.train_file, args.output_dir, args.model_name, args.num_train_epochs,
+         args.max_steps, args.metrics_file, args.precision) 
\ No newline at end of file
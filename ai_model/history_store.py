@@ -0,0 +1,264 @@
+"""
+Columnar history store for test execution logs.
+
+Replaces the ever-growing history_logs.csv with an append-only Parquet dataset
+partitioned by run date:
+
+    ai_model/data/history/run_date=2025-07-01/part-<timestamp>-<id>.parquet
+
+Every run writes a new part file (no rewrite of older data), columns are typed,
+and method/url/latency_bucket are dictionary-encoded. The request payload is
+kept as a JSON string (null for rows written before it was recorded). Rows
+imported from Postman/Newman run exports (ai_model/ingest_runs.py) also carry
+the run ID and their assertion results; local runs leave them null. "Last N
+days" reads only open the matching run_date partitions. Use `compact` to merge the small
+per-run files of older partitions.
+
+Payload-size benchmark curves (test_case_generator/payload_benchmark.py) are
+kept next to it, one compact row per endpoint and run, partitioned the same way:
+
+    ai_model/data/history_curves/run_date=2025-07-01/part-<timestamp>-<id>.parquet
+
+Usage:
+    python -m ai_model.history_store stats
+    python -m ai_model.history_store import-csv ai_model/data/history_logs.csv
+    python -m ai_model.history_store compact [--older-than 1]
+"""
+
+import argparse
+import glob
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+HISTORY_DIR = "ai_model/data/history"
+CURVES_DIR = "ai_model/data/history_curves"
+LEGACY_CSV = "ai_model/data/history_logs.csv"
+
+SCHEMA = pa.schema([
+    ("method", pa.dictionary(pa.int8(), pa.string())),
+    ("url", pa.dictionary(pa.int32(), pa.string())),
+    ("status_code", pa.int16()),
+    ("latency_ms", pa.float32()),
+    ("is_error", pa.int8()),
+    ("latency_bucket", pa.dictionary(pa.int8(), pa.string())),
+    ("timestamp", pa.timestamp("us")),
+    ("payload", pa.string()),
+    ("run_id", pa.dictionary(pa.int32(), pa.string())),
+    ("assertions_failed", pa.int16()),
+    ("assertions", pa.string()),
+])
+
+# One row per endpoint and benchmark run; list columns hold one value per payload size
+CURVE_SCHEMA = pa.schema([
+    ("build", pa.dictionary(pa.int16(), pa.string())),
+    ("method", pa.dictionary(pa.int8(), pa.string())),
+    ("endpoint", pa.dictionary(pa.int32(), pa.string())),
+    ("size_bytes", pa.list_(pa.int32())),
+    ("latency_ms", pa.list_(pa.float32())),
+    ("throughput_mbps", pa.list_(pa.float32())),
+    ("status_code", pa.list_(pa.int16())),
+    ("knee_bytes", pa.int32()),
+    ("timestamp", pa.timestamp("us")),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("run_date", pa.string())]), flavor="hive")
+# Reading with an explicit schema fills columns missing from older part files with nulls
+DATASET_SCHEMA = SCHEMA.append(pa.field("run_date", pa.string()))
+
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    """Coerce a history DataFrame to the store schema."""
+    df = df.copy()
+    for name in SCHEMA.names:
+        if name not in df.columns:
+            df[name] = None
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    df["status_code"] = pd.to_numeric(df["status_code"], errors="coerce").astype("Int16")
+    df["is_error"] = pd.to_numeric(df["is_error"], errors="coerce").fillna(0).astype("int8")
+    df["latency_ms"] = pd.to_numeric(df["latency_ms"], errors="coerce").astype("float32")
+    df["assertions_failed"] = pd.to_numeric(df["assertions_failed"], errors="coerce").astype("Int16")
+    for name in ("method", "url", "latency_bucket", "payload", "run_id", "assertions"):
+        df[name] = df[name].astype("string")
+    table = pa.Table.from_pandas(df[SCHEMA.names], preserve_index=False)
+    return table.cast(SCHEMA)
+
+
+def append(df: pd.DataFrame, history_dir: str = HISTORY_DIR) -> int:
+    """
+    Append execution records to the store.
+
+    Records are split by the date of their timestamp, and each partition gets a
+    new part file. Returns the number of rows written.
+    """
+    if df.empty:
+        return 0
+    table = _to_table(df)
+    run_dates = pd.Series(table.column("timestamp").to_pandas()).dt.strftime("%Y-%m-%d")
+
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    for run_date in sorted(run_dates.unique()):
+        part_dir = os.path.join(history_dir, f"run_date={run_date}")
+        os.makedirs(part_dir, exist_ok=True)
+        mask = pa.array((run_dates == run_date).to_numpy())
+        pq.write_table(table.filter(mask),
+                       os.path.join(part_dir, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"))
+    return table.num_rows
+
+
+def read(history_dir: str = HISTORY_DIR, days: int = None, since: date = None,
+         columns: list = None) -> pd.DataFrame:
+    """
+    Read history as a DataFrame.
+
+    Args:
+        history_dir: Root of the partitioned store
+        days: Only return the last N days (today included)
+        since: Only return runs on or after this date
+        columns: Optional subset of columns to load
+    """
+    if not os.path.isdir(history_dir) or not glob.glob(os.path.join(history_dir, "*", "*.parquet")):
+        return pd.DataFrame(columns=columns or SCHEMA.names)
+
+    if days is not None:
+        since = date.today() - timedelta(days=days - 1)
+    row_filter = ds.field("run_date") >= since.isoformat() if since else None
+
+    dataset = ds.dataset(history_dir, format="parquet", partitioning=PARTITIONING, schema=DATASET_SCHEMA)
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    return table.to_pandas()
+
+
+def load(path: str = HISTORY_DIR, days: int = None, columns: list = None) -> pd.DataFrame:
+    """Load history from the store directory, or from a legacy CSV file."""
+    if path.endswith(".csv"):
+        df = pd.read_csv(path, usecols=columns)
+        if days is not None and "timestamp" in df.columns:
+            cutoff = pd.Timestamp(date.today() - timedelta(days=days - 1))
+            df = df[pd.to_datetime(df["timestamp"], format="ISO8601") >= cutoff]
+        return df
+    return read(path, days=days, columns=columns)
+
+
+def append_curves(curves: list, curves_dir: str = CURVES_DIR) -> int:
+    """Append payload-size curves (dicts with the CURVE_SCHEMA fields) as one part file."""
+    if not curves:
+        return 0
+    table = pa.Table.from_pylist(curves, schema=CURVE_SCHEMA)
+    run_date = datetime.now().strftime("%Y-%m-%d")
+    part_dir = os.path.join(curves_dir, f"run_date={run_date}")
+    os.makedirs(part_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    pq.write_table(table, os.path.join(part_dir, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"))
+    return table.num_rows
+
+
+def read_curves(curves_dir: str = CURVES_DIR, build: str = None, days: int = None) -> pd.DataFrame:
+    """Payload-size curves, optionally for one build or the last N days, oldest first."""
+    if not glob.glob(os.path.join(curves_dir, "*", "*.parquet")):
+        return pd.DataFrame(columns=CURVE_SCHEMA.names)
+    row_filter = None
+    if days is not None:
+        row_filter = ds.field("run_date") >= (date.today() - timedelta(days=days - 1)).isoformat()
+    if build is not None:
+        build_filter = ds.field("build") == build
+        row_filter = build_filter if row_filter is None else row_filter & build_filter
+    dataset = ds.dataset(curves_dir, format="parquet", partitioning=PARTITIONING)
+    table = dataset.to_table(columns=CURVE_SCHEMA.names, filter=row_filter)
+    return table.to_pandas().sort_values("timestamp", ignore_index=True)
+
+
+def run_ids(history_dir: str = HISTORY_DIR) -> set:
+    """IDs of the imported Postman/Newman runs already in the store."""
+    if not glob.glob(os.path.join(history_dir, "*", "*.parquet")):
+        return set()
+    dataset = ds.dataset(history_dir, format="parquet", partitioning=PARTITIONING, schema=DATASET_SCHEMA)
+    column = dataset.to_table(columns=["run_id"]).column("run_id").cast(pa.string())
+    return set(pc.unique(column).drop_null().to_pylist())
+
+
+def exists(path: str = HISTORY_DIR) -> bool:
+    """Whether a history store directory or legacy CSV exists at path."""
+    return os.path.isfile(path) or bool(glob.glob(os.path.join(path, "*", "*.parquet")))
+
+
+def import_csv(csv_path: str = LEGACY_CSV, history_dir: str = HISTORY_DIR, chunksize: int = 500_000) -> int:
+    """Migrate a legacy history_logs.csv into the store, chunk by chunk."""
+    total = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        total += append(chunk, history_dir)
+    return total
+
+
+def compact(history_dir: str = HISTORY_DIR, older_than_days: int = 1) -> int:
+    """
+    Merge the part files of each partition older than `older_than_days` into one file.
+
+    The merged file is renamed into place before the old parts are removed, so an
+    interrupted compaction can leave duplicates but never loses rows.
+    Returns the number of partitions compacted.
+    """
+    cutoff = (date.today() - timedelta(days=older_than_days)).isoformat()
+    compacted = 0
+    for part_dir in sorted(glob.glob(os.path.join(history_dir, "run_date=*"))):
+        run_date = os.path.basename(part_dir).split("=", 1)[1]
+        parts = sorted(glob.glob(os.path.join(part_dir, "*.parquet")))
+        if run_date >= cutoff or len(parts) < 2:
+            continue
+
+        table = ds.dataset(parts, format="parquet", schema=SCHEMA).to_table()
+        table = table.sort_by("timestamp")
+        tmp_path = os.path.join(part_dir, f"_compact-{uuid.uuid4().hex[:8]}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(part_dir, f"compacted-{uuid.uuid4().hex[:8]}.parquet"))
+        for p in parts:
+            os.remove(p)
+        compacted += 1
+        print(f"Compacted {len(parts)} files in run_date={run_date} ({table.num_rows} rows)")
+    return compacted
+
+
+def stats(history_dir: str = HISTORY_DIR) -> dict:
+    """Partition, file and row counts for the store."""
+    partitions = glob.glob(os.path.join(history_dir, "run_date=*"))
+    files = glob.glob(os.path.join(history_dir, "run_date=*", "*.parquet"))
+    rows = sum(pq.ParquetFile(f).metadata.num_rows for f in files)
+    size_mb = sum(os.path.getsize(f) for f in files) / 1024 / 1024
+    return {"partitions": len(partitions), "files": len(files), "rows": rows, "size_mb": round(size_mb, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the partitioned test execution history store")
+    parser.add_argument("--history-dir", default=HISTORY_DIR, help="Root directory of the store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Show partition, file and row counts")
+
+    import_parser = sub.add_parser("import-csv", help="Import a legacy history_logs.csv")
+    import_parser.add_argument("csv_path", nargs="?", default=LEGACY_CSV)
+
+    compact_parser = sub.add_parser("compact", help="Merge per-run part files of older partitions")
+    compact_parser.add_argument("--older-than", type=int, default=1,
+                                help="Only compact partitions at least this many days old")
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        for key, value in stats(args.history_dir).items():
+            print(f"{key}: {value}")
+    elif args.command == "import-csv":
+        rows = import_csv(args.csv_path, args.history_dir)
+        print(f"Imported {rows} rows from {args.csv_path} into {args.history_dir}")
+    elif args.command == "compact":
+        count = compact(args.history_dir, args.older_than)
+        print(f"Compacted {count} partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Bulk ingestion of Postman/Newman run exports into the history store.
+
+Each export (a Postman app test-run export or a Newman JSON report) becomes
+one feature row per executed request, built the same way as local runs
+(analyze_logs.build_features), plus the run ID and the request's assertion
+results. Exports are streamed, rows are buffered across files and appended
+in batches of BATCH_ROWS so thousands of CI runs do not become thousands of
+tiny part files, and runs whose ID is already in the store are skipped, so
+re-ingesting an export directory is safe. Unreadable or truncated exports
+are skipped without losing the rows buffered from the others.
+
+Usage:
+    python -m ai_model.ingest_runs newman-reports/*.json
+    python -m ai_model.ingest_runs "src/data/processed/rGuest Pay Agent.postman_test_run.json"
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+import ijson
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model import history_store
+from ai_model.analyze_logs import build_features
+from postman_stream import iter_run_results, run_info
+
+# Rows buffered before one append to the store
+BATCH_ROWS = 200_000
+
+
+def run_frame(path, info):
+    """History rows of one run export."""
+    assertions_failed, assertions = [], []
+
+    def results():
+        # The assertion columns are filled in the same pass that builds the rows
+        for r in iter_run_results(path, info["format"]):
+            assertions_failed.append(sum(not a["passed"] for a in r["assertions"]))
+            assertions.append(json.dumps(r["assertions"]) if r["assertions"] else None)
+            yield r
+
+    df = build_features(results(), timestamp=info["started_at"].isoformat())
+    if df.empty:
+        return df
+    df["run_id"] = info["run_id"]
+    df["assertions_failed"] = assertions_failed
+    df["assertions"] = assertions
+    return df
+
+
+def ingest(paths, history_dir=history_store.HISTORY_DIR, batch_rows=BATCH_ROWS):
+    """Append the runs of every export not yet in the store. Returns (runs, rows) ingested."""
+    seen = history_store.run_ids(history_dir)
+    pending, pending_rows = [], 0
+    runs = rows = 0
+
+    def flush():
+        nonlocal pending, pending_rows, rows
+        if pending:
+            rows += history_store.append(pd.concat(pending, ignore_index=True), history_dir)
+        pending, pending_rows = [], 0
+
+    for path in paths:
+        try:
+            info = run_info(path)
+            if info["run_id"] in seen:
+                print(f"[SKIP] {os.path.basename(path)}: run {info['run_id']} already ingested")
+                continue
+            if info["started_at"] is None:
+                print(f"[SKIP] {os.path.basename(path)}: no run start time")
+                continue
+            df = run_frame(path, info)
+        except ValueError as e:
+            print(f"[SKIP] {e}")
+            continue
+        except (OSError, ijson.JSONError) as e:
+            # Missing, unreadable or truncated export; the other files still go in.
+            # yajl parse errors span several lines, only the first says what went wrong.
+            reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+            print(f"[SKIP] {os.path.basename(path)}: {reason}")
+            continue
+        seen.add(info["run_id"])
+        runs += 1
+        print(f"[RUN] {os.path.basename(path)}: {len(df)} requests ({info['format']}, {info['started_at']:%Y-%m-%d %H:%M})")
+        if df.empty:
+            continue
+        pending.append(df)
+        pending_rows += len(df)
+        if pending_rows >= batch_rows:
+            flush()
+
+    flush()
+    return runs, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest Postman/Newman run exports into the history store")
+    parser.add_argument("paths", nargs="+", help="Run export files or directories of .json exports")
+    parser.add_argument("--history-dir", default=history_store.HISTORY_DIR)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="Rows buffered per append")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path])
+
+    runs, rows = ingest(paths, args.history_dir, args.batch_rows)
+    print(f"✅ Ingested {runs} runs ({rows} rows) into {args.history_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+bf16 mixed precision on CPU.
+
+"bf16" runs matmuls and other autocast-eligible ops in bfloat16 under
+torch.autocast while the weights stay fp32. Training therefore keeps fp32
+master weights and optimizer state, and bf16's fp32-sized exponent means no
+loss scaling is needed. "fp32" is the default everywhere and leaves behavior
+unchanged.
+
+    with autocast(precision):
+        outputs = model.generate(input_ids, max_length=200)
+
+Autocast belongs around the forward pass and loss only, not backward or the
+optimizer step. The Hugging Face Trainer scripts therefore pass bf16=True to
+TrainingArguments, which does exactly that, instead of wrapping train().
+"""
+
+import contextlib
+
+PRECISIONS = ("fp32", "bf16")
+
+
+def check_precision(precision):
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+    if precision == "bf16" and not bf16_supported():
+        print("[WARNING] This CPU has no native bf16 support; bf16 autocast will be emulated and slower")
+
+
+def bf16_supported():
+    """Whether oneDNN reports native bf16 kernels (AVX512-BF16/AMX) on this CPU."""
+    import torch
+
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def autocast(precision):
+    """CPU autocast context for the precision ("fp32" is a no-op)."""
+    if precision == "fp32":
+        return contextlib.nullcontext()
+    import torch
+
+    return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
@@ -0,0 +1,78 @@
+"""
+Online risk scoring with the trained prioritization booster.
+
+Loads the booster and feature encoder written by train_model.py once, and
+scores single or batched test cases without waiting for the next batch
+prioritization run. Scores are memoized per (method, template, latency
+bucket), so repeated lookups are a dict hit.
+
+Usage:
+    from ai_model.risk_scorer import get_scorer
+
+    scorer = get_scorer()
+    if scorer is not None:
+        risk = scorer.score("POST", "http://localhost:8502/v1.5/transaction/sale")
+"""
+
+import os
+import sys
+
+import xgboost as xgb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.features import FeatureEncoder, ENCODER_PATH, bucket_latency
+from ai_model.train_model import MODEL_PATH
+
+_default_scorer = None
+
+
+class RiskScorer:
+    def __init__(self, model_path: str = MODEL_PATH, encoder_path: str = ENCODER_PATH):
+        self.booster = xgb.Booster()
+        self.booster.load_model(model_path)
+        self.encoder = FeatureEncoder.load(encoder_path)
+        self._cache = {}
+
+    def _key(self, method: str, url: str, latency_bucket: str = None):
+        method = (method or "GET").upper()
+        template = self.encoder.template(url or "")
+        if latency_bucket is None:
+            # Not executed yet: expect the endpoint's typical (p50) latency
+            aggregates = self.encoder.aggregates.get(template)
+            latency_bucket = bucket_latency(aggregates["endpoint_latency_p50"]) if aggregates else "unknown"
+        return method, template, latency_bucket
+
+    def score(self, method: str, url: str, latency_bucket: str = None) -> float:
+        """Failure probability for one request."""
+        return self.score_keys([self._key(method, url, latency_bucket)])[0]
+
+    def score_batch(self, tests: list) -> list:
+        """Failure probabilities for test case dicts (method + url/endpoint)."""
+        keys = [self._key(t.get("method"), t.get("url") or t.get("endpoint"), t.get("latency_bucket"))
+                for t in tests]
+        return self.score_keys(keys)
+
+    def score_keys(self, keys: list) -> list:
+        missing = list(dict.fromkeys(k for k in keys if k not in self._cache))
+        if missing:
+            import pandas as pd
+
+            frame = pd.DataFrame(missing, columns=["method", "url", "latency_bucket"])
+            X = self.encoder.transform(frame)
+            for key, risk in zip(missing, self.booster.inplace_predict(X)):
+                self._cache[key] = float(risk)
+        return [self._cache[k] for k in keys]
+
+
+def get_scorer(model_path: str = MODEL_PATH, encoder_path: str = ENCODER_PATH):
+    """Shared scorer for this process, or None if no model has been trained yet."""
+    global _default_scorer
+    if _default_scorer is None:
+        if not (os.path.exists(model_path) and os.path.exists(encoder_path)):
+            return None
+        try:
+            _default_scorer = RiskScorer(model_path, encoder_path)
+        except Exception as e:
+            print(f"Warning: risk scorer unavailable: {e}")
+            return None
+    return _default_scorer
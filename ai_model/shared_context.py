@@ -0,0 +1,134 @@
+"""
+Seq2seq generation with the shared per-endpoint context encoded once.
+
+Prompts for the scenarios of one endpoint all repeat the same endpoint,
+operation and summary header, and the encoder used to recompute it for every
+scenario. T5's encoder is bidirectional, so the states of a shared prefix
+cannot be cut out of a full prompt and reused. Instead the prompt is split
+into two segments that are encoded separately, as in Fusion-in-Decoder:
+
+    context  (endpoint header)      encoded once per endpoint, then cached
+    tails    (one per scenario)     encoded together as one padded batch
+
+Their encoder states are concatenated before decoding, so the decoder still
+cross-attends to the whole prompt; only the scenario tokens no longer attend
+to the context inside the encoder. Output can therefore differ slightly from
+full-prompt generation, which is why callers keep it as an opt-in mode.
+
+    generator = SharedContextGenerator(model, tokenizer, device)
+    texts = generator.generate(context, tails, max_length=200, num_beams=5)
+"""
+
+import time
+from collections import OrderedDict
+
+import torch
+from transformers.modeling_outputs import BaseModelOutput
+
+from ai_model.tokenizer_provider import decode_batch
+
+# Endpoint contexts whose encoder states are kept
+CONTEXT_CACHE_SIZE = 32
+# Tails decoded together (each expands to num_beams sequences)
+BATCH_SIZE = 16
+
+
+class GenerationStats:
+    """Encoder and decoder token counts and generation time, for tokens/sec reports."""
+
+    def __init__(self):
+        self.encoder_tokens = 0
+        self.generated_tokens = 0
+        self.seconds = 0.0
+        self.prompts = 0
+
+    def add(self, encoder_tokens, generated_tokens, seconds, prompts):
+        self.encoder_tokens += encoder_tokens
+        self.generated_tokens += generated_tokens
+        self.seconds += seconds
+        self.prompts += prompts
+
+    def summary(self):
+        seconds = self.seconds or float("inf")
+        return (f"{self.prompts} prompts, {self.encoder_tokens} encoder tokens, "
+                f"{self.generated_tokens} generated tokens in {self.seconds:.1f}s "
+                f"({self.generated_tokens / seconds:.1f} generated tokens/s)")
+
+
+def count_generated(tokenizer, sequences):
+    """Generated tokens in a batch of output sequences, excluding padding."""
+    return int((sequences != tokenizer.pad_token_id).sum())
+
+
+class SharedContextGenerator:
+    def __init__(self, model, tokenizer, device, cache_size=CONTEXT_CACHE_SIZE):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.encoder = model.get_encoder()
+        self.cache_size = cache_size
+        self._contexts = OrderedDict()
+        self.stats = GenerationStats()
+        self.last_output_tokens = []
+
+    def _context_states(self, context):
+        """Encoder states of a context segment (leading special token, no end token)."""
+        states = self._contexts.get(context)
+        if states is not None:
+            self._contexts.move_to_end(context)
+            return states, 0
+
+        ids = self.tokenizer(context, add_special_tokens=False)["input_ids"]
+        if self.tokenizer.bos_token_id is not None:
+            ids = [self.tokenizer.bos_token_id] + ids
+        input_ids = torch.tensor([ids], device=self.device)
+        with torch.no_grad():
+            states = self.encoder(input_ids=input_ids).last_hidden_state
+        self._contexts[context] = states
+        if len(self._contexts) > self.cache_size:
+            self._contexts.popitem(last=False)
+        return states, len(ids)
+
+    def _tail_states(self, tails, max_length):
+        """Encoder states and attention mask of the tail segments (end token, no leading token)."""
+        eos = [self.tokenizer.eos_token_id] if self.tokenizer.eos_token_id is not None else []
+        ids = [t[:max_length - len(eos)] + eos
+               for t in self.tokenizer(list(tails), add_special_tokens=False)["input_ids"]]
+        batch = self.tokenizer.pad({"input_ids": ids}, return_tensors="pt")
+        input_ids = batch["input_ids"].to(self.device)
+        attention_mask = batch["attention_mask"].to(self.device)
+        with torch.no_grad():
+            states = self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        return states, attention_mask, int(attention_mask.sum())
+
+    def generate(self, context, tails, batch_size=BATCH_SIZE, **generate_kwargs):
+        """One generated text per tail, each conditioned on context + tail."""
+        texts = []
+        # Generated tokens of each output of the last call
+        self.last_output_tokens = []
+        for start in range(0, len(tails), batch_size):
+            texts.extend(self._generate_batch(context, tails[start:start + batch_size], **generate_kwargs))
+        return texts
+
+    def _generate_batch(self, context, tails, max_tail_length=512, skip_special_tokens=True, **generate_kwargs):
+        start = time.perf_counter()
+        context_states, context_tokens = self._context_states(context)
+        tail_states, tail_mask, tail_tokens = self._tail_states(tails, max_tail_length)
+
+        batch_size = tail_states.shape[0]
+        states = torch.cat([context_states.expand(batch_size, -1, -1), tail_states], dim=1)
+        context_mask = torch.ones(batch_size, context_states.shape[1], dtype=tail_mask.dtype, device=self.device)
+        attention_mask = torch.cat([context_mask, tail_mask], dim=1)
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                encoder_outputs=BaseModelOutput(last_hidden_state=states),
+                attention_mask=attention_mask,
+                **generate_kwargs
+            )
+        texts = decode_batch(self.tokenizer, outputs, skip_special_tokens=skip_special_tokens,
+                             clean_up_tokenization_spaces=True)
+        self.last_output_tokens.extend((outputs != self.tokenizer.pad_token_id).sum(dim=1).tolist())
+        self.stats.add(context_tokens + tail_tokens, count_generated(self.tokenizer, outputs),
+                       time.perf_counter() - start, len(tails))
+        return texts
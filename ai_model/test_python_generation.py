@@ -1,13 +1,18 @@
+import os
+import sys
 import torch
-from transformers import T5ForConditionalGeneration, RobertaTokenizer
+from transformers import T5ForConditionalGeneration
 import json
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.tokenizer_provider import get_tokenizer
+
 def test_python_generation():
     # Load the fine-tuned model
     model_path = "src/data/models/checkpoints/latest_english_generator"
     
     print("Loading fine-tuned model...")
-    tokenizer = RobertaTokenizer.from_pretrained(model_path)
+    tokenizer = get_tokenizer(model_path)
     model = T5ForConditionalGeneration.from_pretrained(model_path)
     
     # Test prompts for Python generation
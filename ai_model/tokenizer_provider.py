@@ -0,0 +1,118 @@
+"""
+Shared tokenizer provider.
+
+Every script used to load the slow, pure-Python RobertaTokenizer for its own
+checkpoint. get_tokenizer() loads the Rust-backed fast tokenizer instead and
+keeps one instance per checkpoint for the life of the process, so generators,
+training and inference in the same process share it:
+
+    tokenizer = get_tokenizer("src/data/models/checkpoints/latest_english_generator")
+    batch = encode_batch(tokenizer, texts, max_length=512)    # one call into Rust per batch
+    texts = decode_batch(tokenizer, generated_ids)
+
+A local checkpoint saved with only the slow tokenizer files is converted on
+every load; checkpoint directories are never written to implicitly. To skip
+the conversion in later processes, write the converted tokenizer.json once:
+
+    python -m ai_model.tokenizer_provider src/data/models/checkpoints/latest_english_generator
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+DEFAULT_CHECKPOINT = "Salesforce/codet5-base"
+FAST_TOKENIZER_FILE = "tokenizer.json"
+
+_tokenizers = {}
+_lock = threading.Lock()
+
+
+def _checkpoint_key(checkpoint):
+    checkpoint = os.fspath(checkpoint)
+    return os.path.abspath(checkpoint) if os.path.isdir(checkpoint) else checkpoint
+
+
+def get_tokenizer(checkpoint=DEFAULT_CHECKPOINT):
+    """Fast tokenizer for a hub checkpoint or local model directory, loaded once per process."""
+    key = _checkpoint_key(checkpoint)
+    tokenizer = _tokenizers.get(key)
+    if tokenizer is not None:
+        return tokenizer
+
+    with _lock:
+        tokenizer = _tokenizers.get(key)
+        if tokenizer is None:
+            from transformers import AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(key, use_fast=True)
+            if not tokenizer.is_fast:
+                print(f"[WARNING] No fast tokenizer for {checkpoint}; using {type(tokenizer).__name__}")
+            _tokenizers[key] = tokenizer
+    return tokenizer
+
+
+def save_fast_tokenizer(checkpoint):
+    """
+    Write the converted tokenizer.json into a local checkpoint that lacks one.
+
+    Returns the file's path, or None if the checkpoint already has one.
+    """
+    if not os.path.isdir(checkpoint):
+        raise ValueError(f"{checkpoint} is not a local checkpoint directory")
+    path = os.path.join(os.fspath(checkpoint), FAST_TOKENIZER_FILE)
+    if os.path.exists(path):
+        return None
+    tokenizer = get_tokenizer(checkpoint)
+    if not tokenizer.is_fast:
+        raise ValueError(f"No fast tokenizer for {checkpoint}")
+    tokenizer.backend_tokenizer.save(path)
+    return path
+
+
+def _resolve(tokenizer):
+    """A tokenizer, or the shared tokenizer of a checkpoint name/path."""
+    if isinstance(tokenizer, (str, os.PathLike)):
+        return get_tokenizer(tokenizer)
+    return tokenizer
+
+
+def encode_batch(tokenizer, texts, max_length=512, truncation=True, padding=False, return_tensors=None):
+    """
+    Tokenize a batch of texts in one call.
+
+    Args:
+        tokenizer: Tokenizer, or a checkpoint to get the shared tokenizer of
+        texts: Texts to encode
+        max_length: Truncation length (ignored when truncation is False)
+        padding: False, True (to the longest text) or "max_length"
+        return_tensors: None for lists, "pt" or "np"
+    """
+    return _resolve(tokenizer)(
+        list(texts),
+        max_length=max_length if truncation else None,
+        truncation=truncation,
+        padding=padding,
+        return_tensors=return_tensors,
+    )
+
+
+def decode_batch(tokenizer, sequences, skip_special_tokens=True, **kwargs):
+    """Decode a batch of token id sequences (lists or a 2-D tensor) in one call."""
+    return _resolve(tokenizer).batch_decode(sequences, skip_special_tokens=skip_special_tokens, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write tokenizer.json into local checkpoints saved with only slow tokenizer files")
+    parser.add_argument("checkpoints", nargs="+", help="Local model directories")
+    args = parser.parse_args(argv)
+
+    for checkpoint in args.checkpoints:
+        path = save_fast_tokenizer(checkpoint)
+        print(f"Saved {path}" if path else f"{checkpoint} already has {FAST_TOKENIZER_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
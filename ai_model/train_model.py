@@ -1,44 +1,157 @@
+"""
+Train the XGBoost test prioritization model and write prioritized_tests.json.
+
+Modes:
+    full         Retrain from scratch on the whole history, or on the last
+                 --window-days days (sliding window)
+    incremental  Continue boosting the previous booster on the history rows
+                 added since the last training run only
+
+Usage:
+    python ai_model/train_model.py [--mode full|incremental] [--window-days 30]
+"""
+
+import argparse
+import json
+import os
+import sys
 import pandas as pd
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 
-# Load the processed test log data
-df = pd.read_csv("ai_model/data/history_logs.csv")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model import history_store
+from ai_model.features import FeatureEncoder, ENCODER_PATH, SWAGGER_PATH
+
+MODEL_PATH = "ai_model/data/risk_model.json"
+STATE_PATH = "ai_model/data/risk_model_state.json"
+PRIORITIZED_PATH = "ai_model/data/prioritized_tests.json"
+
+HISTORY_COLUMNS = ["method", "url", "status_code", "latency_ms", "is_error", "latency_bucket", "timestamp"]
+
+
+def load_history(history_dir=history_store.HISTORY_DIR, days=None, after=None):
+    """Load usable history rows, optionally only the last `days` days or rows after a timestamp."""
+    since = pd.Timestamp(after).date() if after else None
+    if days is not None:
+        df = history_store.read(history_dir, days=days, columns=HISTORY_COLUMNS)
+    else:
+        df = history_store.read(history_dir, since=since, columns=HISTORY_COLUMNS)
+    if after:
+        df = df[df["timestamp"] > pd.Timestamp(after)]
+
+    # Drop any rows missing critical data
+    return df.dropna(subset=["method", "url", "status_code", "latency_ms"])
+
+
+def load_state(state_path=STATE_PATH):
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, "r") as f:
+        return json.load(f)
+
+
+def save_state(df, state_path=STATE_PATH, **extra):
+    state = load_state(state_path)
+    state.update(extra)
+    if not df.empty:
+        state["last_timestamp"] = df["timestamp"].max().isoformat()
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def new_classifier(n_estimators):
+    return xgb.XGBClassifier(
+        objective="binary:logistic",
+        eval_metric="logloss",
+        n_estimators=n_estimators,
+        base_score=0.5
+    )
+
+
+def train_full(df, n_estimators=100, swagger_path=SWAGGER_PATH):
+    """Fit a new encoder and booster on df, printing a holdout classification report."""
+    encoder = FeatureEncoder.from_swagger(swagger_path)
+    X = encoder.fit_transform(df)
+    y = df["is_error"].to_numpy()
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = new_classifier(n_estimators)
+    model.fit(X_train, y_train)
+
+    y_pred = model.predict(X_test)
+    print("\nClassification Report ")
+    print(classification_report(y_test, y_pred))
+    return model, encoder
+
+
+def train_incremental(df, encoder, model_path=MODEL_PATH, n_estimators=20):
+    """Add n_estimators boosting rounds to the saved booster using only df."""
+    # Also rolls the encoder's per-endpoint aggregates forward over the new rows
+    X = encoder.fit_transform(df)
+    y = df["is_error"].to_numpy()
+    model = new_classifier(n_estimators)
+    model.fit(X, y, xgb_model=model_path)
+    return model
+
 
-# Drop any rows missing critical data
-df = df.dropna(subset=["method", "url", "status_code", "latency_ms"])
+def write_prioritized(model, encoder, df, output_path=PRIORITIZED_PATH):
+    """Score the distinct (method, url, latency_bucket) combinations and save them by risk."""
+    candidates = df.drop_duplicates(subset=["method", "url", "latency_bucket"]).copy()
+    candidates["risk_score"] = model.predict_proba(encoder.transform(candidates))[:, 1]
+    candidates[["method", "url", "risk_score"]].astype({"method": str, "url": str}) \
+        .sort_values(by="risk_score", ascending=False) \
+        .to_json(output_path, orient="records", indent=2)
 
-# Convert categorical features into numeric format
-X = pd.get_dummies(df[["method", "url", "latency_bucket"]])
 
-# Target: Whether the test failed
-y = df["is_error"]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the XGBoost test prioritization model")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="full",
+                        help="Retrain from scratch, or continue boosting on new history only")
+    parser.add_argument("--window-days", type=int,
+                        help="Full mode: only train on the last N days of history")
+    parser.add_argument("--rounds", type=int,
+                        help="Boosting rounds (default: 100 for full, 20 for incremental)")
+    parser.add_argument("--score-days", type=int, default=30,
+                        help="Score endpoints seen in the last N days")
+    parser.add_argument("--history-dir", default=history_store.HISTORY_DIR)
+    parser.add_argument("--swagger", default=SWAGGER_PATH,
+                        help="Swagger spec whose path templates URLs are normalized to")
+    args = parser.parse_args(argv)
 
-# Split into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    state = load_state()
+    if args.mode == "incremental" and not (os.path.exists(MODEL_PATH) and os.path.exists(ENCODER_PATH)
+                                           and state.get("last_timestamp")):
+        print("No previous model found, falling back to full training")
+        args.mode = "full"
 
-# Train an XGBoost classifier
-model = xgb.XGBClassifier(
-    objective="binary:logistic", 
-    eval_metric="logloss", 
-    use_label_encoder=False,
-    base_score=0.5
-)
+    if args.mode == "full":
+        df = load_history(args.history_dir, days=args.window_days)
+        if df.empty:
+            print("No history to train on")
+            return
+        print(f"Full training on {len(df)} rows")
+        model, encoder = train_full(df, args.rounds or 100, args.swagger)
+    else:
+        df = load_history(args.history_dir, after=state["last_timestamp"])
+        if df.empty:
+            print(f"No new history since {state['last_timestamp']}, model unchanged")
+            return
+        print(f"Incremental training on {len(df)} new rows since {state['last_timestamp']}")
+        encoder = FeatureEncoder.load(ENCODER_PATH)
+        model = train_incremental(df, encoder, MODEL_PATH, args.rounds or 20)
 
-model.fit(X_train, y_train)
+    model.save_model(MODEL_PATH)
+    encoder.save(ENCODER_PATH)
+    save_state(df, mode=args.mode, num_trees=model.get_booster().num_boosted_rounds())
 
-# Evaluate model
-y_pred = model.predict(X_test)
-print("\nClassification Report ")
-print(classification_report(y_test, y_pred))
+    # Predict risk score for recent test cases
+    score_df = load_history(args.history_dir, days=args.score_days)
+    write_prioritized(model, encoder, score_df if not score_df.empty else df)
 
-# Predict risk score for all test cases
-df["risk_score"] = model.predict_proba(X)[:, 1]
+    print("\n Model trained and prioritized_tests.json saved")
 
-# Save prioritized test cases
-df[["method", "url", "risk_score"]].sort_values(by="risk_score", ascending=False).to_json(
-    "ai_model/data/prioritized_tests.json", orient="records", indent=2
-)
 
-print("\n Model trained and prioritized_tests.json saved")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
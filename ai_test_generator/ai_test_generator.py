@@ -1,23 +1,18 @@
 import json
-import random
-import requests
 import os
 import sys
-import pandas as pd
-from typing import Dict, List, Any, Optional
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
 
 # Add parent directory to path to import ai_model
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-try:
-    from ai_model.codet5_generator import CodeT5TestGenerator
-except ImportError:
-    # Fallback if CodeT5 generator is not available
-    CodeT5TestGenerator = None
+
+# pandas, scikit-learn, xgboost and torch are imported where they are used, so
+# Swagger-only generation and CLI startup do not pay for them
+if TYPE_CHECKING:
+    import pandas as pd
 
 from config import DEVICE_GUID, TOKEN, TRANSACTION_ID, GATEWAY_ID, INDUSTRY_TYPE, CHECK_ID
+from ai_test_generator.schema_compiler import SchemaCompiler, request_body_schema
 
 class AITestGenerator:
     def __init__(self, swagger_path: str, historical_data_path: Optional[str] = None):
@@ -31,32 +26,93 @@ class AITestGenerator:
         self.swagger_path = swagger_path
         self.historical_data_path = historical_data_path
         self.spec = self._load_swagger()
+        # Builders for request body schemas are compiled once and reused for every test
+        self.schema_compiler = SchemaCompiler(self.spec, optional_rate=0.7, use_examples=True)
         self.historical_data = self._load_historical_data() if historical_data_path else None
-        self.vectorizer = TfidfVectorizer()
-        self.endpoint_vectors = None
+        self.similarity_index = None
         self._prepare_endpoint_vectors()
+        self.payload_index = self._build_payload_index()
+        self._similar_endpoints = {}
+        self._payload_examples_cache = {}
+        self.risk_scorer = self._load_risk_scorer()
 
     def _load_swagger(self) -> Dict:
         """Load and parse the Swagger/OpenAPI specification."""
         with open(self.swagger_path) as f:
             return json.load(f)
 
-    def _load_historical_data(self) -> pd.DataFrame:
-        """Load historical test execution data if available."""
-        if os.path.exists(self.historical_data_path):
-            return pd.read_csv(self.historical_data_path)
+    def _load_historical_data(self) -> "pd.DataFrame":
+        """Load historical test execution data (history store directory or legacy CSV) if available."""
+        from ai_model import history_store
+
+        if history_store.exists(self.historical_data_path):
+            return history_store.load(self.historical_data_path)
         return None
 
+    def _load_risk_scorer(self):
+        """Online risk scorer, or None if no model is trained or xgboost is not available."""
+        try:
+            from ai_model.risk_scorer import get_scorer
+        except ImportError:
+            return None
+        return get_scorer()
+
     def _prepare_endpoint_vectors(self):
-        """Prepare TF-IDF vectors for endpoint descriptions."""
+        """Load (or build and save) the TF-IDF similarity index for this spec."""
         if not self.historical_data is None:
-            descriptions = []
-            for path, path_item in self.spec.get("paths", {}).items():
-                for method, details in path_item.items():
-                    desc = f"{method} {path} {details.get('summary', '')} {details.get('description', '')}"
-                    descriptions.append(desc)
-            
-            self.endpoint_vectors = self.vectorizer.fit_transform(descriptions)
+            from ai_test_generator.similarity_index import EndpointSimilarityIndex
+
+            self.similarity_index = EndpointSimilarityIndex.load_or_build(self.spec)
+
+    def _build_payload_index(self) -> Dict[str, Dict[str, list]]:
+        """
+        Index field values of successful historical payloads by Swagger path.
+
+        Built once: history URLs are matched to path templates per unique URL,
+        then successful payloads are grouped by path, giving
+        {path: {field_name: [example values]}}.
+        """
+        data = self.historical_data
+        if data is None or data.empty or "payload" not in data.columns:
+            return {}
+
+        import pandas as pd
+        from ai_model.features import PathTemplateMatcher
+
+        ok = data.loc[(data["status_code"] < 400) & data["payload"].notna(), ["url", "payload"]]
+        ok = ok.drop_duplicates()
+        if ok.empty:
+            return {}
+
+        base_path = self.spec.get("basePath", "").rstrip("/")
+        paths = {base_path + path: path for path in self.spec.get("paths", {})}
+        matcher = PathTemplateMatcher(list(paths))
+        codes, urls = pd.factorize(ok["url"].astype(str))
+        templates = pd.Series([paths.get(matcher.match(url)) for url in urls]).to_numpy()[codes]
+
+        index = {}
+        for path, payloads in ok["payload"].groupby(templates, sort=False):
+            fields = {}
+            for payload in payloads:
+                try:
+                    _collect_field_values(json.loads(payload), fields)
+                except (TypeError, ValueError):
+                    continue
+            if fields:
+                index[path] = fields
+        return index
+
+    def _payload_examples(self, endpoint: str, method: str) -> Dict[str, list]:
+        """Historical field values for an endpoint and its most similar endpoints."""
+        key = (endpoint, method)
+        examples = self._payload_examples_cache.get(key)
+        if examples is None:
+            examples = {}
+            for path in [endpoint] + self._find_similar_endpoints(endpoint, method):
+                for field, values in self.payload_index.get(path, {}).items():
+                    examples.setdefault(field, values)
+            self._payload_examples_cache[key] = examples
+        return examples
 
     def _generate_smart_payload(self, schema: Dict, endpoint: str, method: str) -> Any:
         """
@@ -67,63 +123,22 @@ class AITestGenerator:
             endpoint: API endpoint path
             method: HTTP method
         """
-        if "type" not in schema:
-            return ""
-
-        # Use historical data to influence payload generation
-        if self.historical_data is not None:
-            similar_endpoints = self._find_similar_endpoints(endpoint, method)
-            if similar_endpoints:
-                # Use values from successful historical requests
-                successful_requests = self.historical_data[
-                    (self.historical_data['status_code'] < 400) & 
-                    (self.historical_data['url'].str.contains(endpoint))
-                ]
-                if not successful_requests.empty:
-                    # Extract and use successful payload patterns
-                    pass
-
-        # Base payload generation logic
-        if schema["type"] == "string":
-            # Generate more realistic string values based on field name
-            field_name = schema.get("name", "").lower()
-            if "email" in field_name:
-                return "test@example.com"
-            elif "date" in field_name:
-                return "2024-03-11"
-            elif "id" in field_name:
-                return str(random.randint(1000, 9999))
-            return "sample-string"
-        elif schema["type"] == "integer":
-            return random.randint(1, 100)
-        elif schema["type"] == "number":
-            return round(random.uniform(1.0, 100.0), 2)
-        elif schema["type"] == "boolean":
-            return random.choice([True, False])
-        elif schema["type"] == "array":
-            item_schema = schema.get("items", {})
-            return [self._generate_smart_payload(item_schema, endpoint, method)]
-        elif schema["type"] == "object":
-            props = schema.get("properties", {})
-            required = schema.get("required", [])
-            return {
-                key: self._generate_smart_payload(value, endpoint, method)
-                for key, value in props.items()
-                if key in required or random.random() < 0.7
-            }
-        return None
+        # Values from successful historical requests to this or similar endpoints come first
+        examples = self._payload_examples(endpoint, method) if self.payload_index else None
+        return self.schema_compiler.compile(schema)(examples=examples)
 
     def _find_similar_endpoints(self, endpoint: str, method: str) -> List[str]:
         """Find similar endpoints based on historical data."""
-        if self.endpoint_vectors is None:
-            return []
-        
-        query = f"{method} {endpoint}"
-        query_vector = self.vectorizer.transform([query])
-        similarities = cosine_similarity(query_vector, self.endpoint_vectors)
-        similar_indices = np.argsort(similarities[0])[-3:][::-1]  # Top 3 similar endpoints
-        
-        return [list(self.spec["paths"].keys())[i] for i in similar_indices]
+        key = (endpoint, method)
+        if key not in self._similar_endpoints:
+            self._similar_endpoints.update(zip([key], self._find_similar_endpoints_batch([key])))
+        return self._similar_endpoints[key]
+
+    def _find_similar_endpoints_batch(self, operations: List[tuple], top_n: int = 3) -> List[List[str]]:
+        """Top similar endpoint paths for many (endpoint, method) pairs in one batched query."""
+        if self.similarity_index is None:
+            return [[] for _ in operations]
+        return self.similarity_index.query_operations(operations, top_n)
 
     def _generate_edge_cases(self, schema: Dict) -> List[Any]:
         """Generate edge cases for a given schema."""
@@ -171,22 +186,15 @@ class AITestGenerator:
         if prioritized:
             prioritized_set = set((item["method"].upper(), item["url"]) for item in prioritized)
 
+        # Look up similar endpoints for every operation at once instead of per payload
+        if self.payload_index:
+            operations = [(path, method) for path, path_item in self.spec.get("paths", {}).items()
+                          for method in path_item if (path, method) not in self._similar_endpoints]
+            self._similar_endpoints.update(zip(operations, self._find_similar_endpoints_batch(operations)))
+
         for path, path_item in self.spec.get("paths", {}).items():
             for method, details in path_item.items():
-                # Replace path parameters with real values
-                url = path
-                for param in details.get("parameters", []):
-                    if param.get("in") == "path":
-                        name = param["name"]
-                        value_map = {
-                            "deviceGuid": DEVICE_GUID,
-                            "token": TOKEN,
-                            "transactionId": TRANSACTION_ID,
-                            "checkId": CHECK_ID,
-                        }
-                        fake_value = value_map.get(name, f"real-{name}")
-                        url = url.replace(f"{{{name}}}", fake_value)
-                full_url = BASE_URL + url
+                full_url = BASE_URL + fill_path_params(path, details)
                 if prioritized and (method.upper(), full_url) not in prioritized_set:
                     continue
                 # Generate base test case
@@ -197,12 +205,7 @@ class AITestGenerator:
                     "description": details.get("summary", ""),
                     "expected_status": 200
                 }
-                request_body = details.get("requestBody", {})
-                content = request_body.get("content", {})
-                app_json = content.get("application/json", {})
-                schema = app_json.get("schema", {})
-                if "$ref" in schema:
-                    schema = self._resolve_schema(schema["$ref"])
+                schema = self.schema_compiler.resolve(request_body_schema(details) or {})
                 if schema:
                     test["payload"] = self._generate_smart_payload(schema, path, method)
                 test["url"] = full_url
@@ -220,21 +223,23 @@ class AITestGenerator:
                         edge_test["description"] = f"Edge case: {test['description']}"
                         edge_test["expected_status"] = 400
                         tests.append(edge_test)
+
+        # Score new tests inline instead of waiting for the next prioritization run
+        if self.risk_scorer is not None and tests:
+            for test, risk in zip(tests, self.risk_scorer.score_batch(tests)):
+                test["risk_score"] = round(risk, 6)
         return tests
 
     def _resolve_schema(self, ref: str) -> Dict:
         """Resolve $ref to actual schema object."""
-        ref_path = ref[2:].split("/")
-        result = self.spec
-        for part in ref_path:
-            result = result.get(part, {})
-        return result
+        return self.schema_compiler.resolve({"$ref": ref})
 
     def save_test_cases(self, output_path: str, prioritized: list = None):
         """Save generated test cases to a file, optionally only for prioritized endpoints."""
         test_cases = self.generate_test_cases(prioritized=prioritized)
         
         # Try to use CodeT5 for enhanced test generation if available
+        CodeT5TestGenerator = _load_codet5_generator()
         if CodeT5TestGenerator is not None:
             try:
                 codet5_generator = CodeT5TestGenerator()
@@ -254,10 +259,50 @@ class AITestGenerator:
         with open(output_path, 'w') as f:
             json.dump(test_cases, f, indent=2)
         print(f"Generated {len(test_cases)} test cases and saved to {output_path}")
+        return test_cases
+
+PATH_PARAM_VALUES = {
+    "deviceGuid": DEVICE_GUID,
+    "token": TOKEN,
+    "transactionId": TRANSACTION_ID,
+    "checkId": CHECK_ID,
+}
+
+def fill_path_params(path: str, operation: Dict) -> str:
+    """Replace path parameters with real values."""
+    for param in operation.get("parameters", []):
+        if param.get("in") == "path":
+            name = param["name"]
+            path = path.replace(f"{{{name}}}", PATH_PARAM_VALUES.get(name, f"real-{name}"))
+    return path
+
+def _collect_field_values(node: Any, fields: Dict[str, list], limit: int = 20):
+    """Add scalar values of a JSON payload to fields, keyed by property name."""
+    if isinstance(node, list):
+        for item in node:
+            _collect_field_values(item, fields, limit)
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            # Scalar array items are examples for the array's property name
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, (dict, list)):
+                    _collect_field_values(item, fields, limit)
+                elif item is not None:
+                    values = fields.setdefault(key, [])
+                    if len(values) < limit and item not in values:
+                        values.append(item)
+
+def _load_codet5_generator():
+    """CodeT5TestGenerator class, or None if torch/transformers are not available."""
+    try:
+        from ai_model.codet5_generator import CodeT5TestGenerator
+    except ImportError:
+        return None
+    return CodeT5TestGenerator
 
 def main():
     # Initialize the CodeT5 generator
-    generator = CodeT5TestGenerator()
+    generator = _load_codet5_generator()()
     
     # Load your Swagger specification
     with open("swagger.json", "r") as f:
@@ -0,0 +1,371 @@
+"""
+Schema-aware payload fuzzer.
+
+For every operation with a request body, a valid base payload is built from
+its schema and then mutated one field at a time:
+
+- boundary values from `minimum`/`maximum` (and exclusive variants),
+  `minLength`/`maxLength`, `enum` and `pattern`
+- type confusion (a string where an integer is expected, null, ...)
+- missing required properties
+- size scaling: the whole payload rebuilt with larger arrays and strings
+
+Cases are seeded from (seed, method, path), so a given seed always produces
+the same cases whatever the number of workers. Operations are fuzzed in
+worker processes and yielded in spec order through a bounded window of
+pending operations, so cases can be streamed into the executor without
+materializing them all.
+
+Usage:
+    python -m ai_test_generator.fuzzer --seed 42 --workers 4 --output test_case_generator/data/fuzz_tests.jsonl
+    python -m ai_test_generator.fuzzer --seed 42 --execute --budget 10m
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import BASE_URL
+from ai_test_generator.ai_test_generator import fill_path_params
+from ai_test_generator.schema_compiler import SchemaCompiler, random_leaf, request_body_schema
+from test_case_generator.run_tests import apply_defaults
+
+SWAGGER_PATH = "test_case_generator/data/swagger.json"
+OUTPUT_FILE = "test_case_generator/data/fuzz_tests.jsonl"
+
+# (array_items, string_length) for each size-scaling case
+SIZE_STEPS = [(10, 1_000), (100, 10_000), (1_000, 100_000)]
+
+# Values of the wrong type for each schema type
+TYPE_CONFUSION = {
+    "string": [12345, True, [], {}],
+    "integer": ["1", 1.5, True, []],
+    "number": ["1.0", True, []],
+    "boolean": ["true", 1, []],
+    "object": [[], "object", 0],
+    "array": [{}, "array", 0],
+}
+
+GENERIC_STRINGS = [
+    ("empty", ""),
+    ("whitespace", "   "),
+    ("special_chars", "!@#$%^&*()"),
+    ("unicode", "ünïcødé ✓ 测试"),
+    ("null_string", "null"),
+    ("sql_injection", "' OR '1'='1"),
+]
+
+INVALID_FORMATS = {
+    "email": "invalid-email",
+    "date": "2024-13-45",
+    "date-time": "2024-13-45T99:99:99Z",
+    "uuid": "not-a-uuid",
+}
+
+# Times a $ref may appear on one field path, so recursive schemas stay finite
+MAX_REF_DEPTH = 2
+
+_MISSING = object()
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def valid_leaf(schema: Dict, field_name: str = None):
+    """Values within the schema's enum, range and length constraints, for a valid base payload."""
+    schema_type = schema.get("type")
+    if schema.get("enum"):
+        enum = list(schema["enum"])
+        return lambda ctx: ctx.rng.choice(enum)
+    if schema_type in ("integer", "number"):
+        low = schema.get("minimum", 1)
+        high = max(schema.get("maximum", low + 99), low)
+        if schema_type == "integer":
+            return lambda ctx: ctx.rng.randint(int(low), int(high))
+        return lambda ctx: round(ctx.rng.uniform(low, high), 2)
+    draw = random_leaf(schema, field_name)
+    if schema_type == "string" and ("minLength" in schema or "maxLength" in schema):
+        min_length, max_length = schema.get("minLength", 0), schema.get("maxLength")
+
+        def draw_string(ctx):
+            value = draw(ctx)
+            if len(value) < min_length:
+                value += "a" * (min_length - len(value))
+            return value[:max_length] if max_length is not None else value
+        return draw_string
+    return draw
+
+
+def numeric_mutations(schema: Dict) -> List[tuple]:
+    """(kind, value, valid) boundary values for an integer or number schema."""
+    step = 1 if schema.get("type") == "integer" else 0.01
+    mutations = []
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+        mutations.append(("minimum", minimum, not schema.get("exclusiveMinimum", False)))
+        mutations.append(("below_minimum", minimum - step, False))
+    if "maximum" in schema:
+        maximum = schema["maximum"]
+        mutations.append(("maximum", maximum, not schema.get("exclusiveMaximum", False)))
+        mutations.append(("above_maximum", maximum + step, False))
+    numeric_enum = [v for v in schema.get("enum", []) if isinstance(v, (int, float))]
+    if numeric_enum:
+        mutations.append(("not_in_enum", max(numeric_enum) + step, False))
+    mutations.extend([("zero", 0, None), ("negative", -step, None), ("overflow", 2 ** 63, None)])
+    return mutations
+
+
+def string_mutations(schema: Dict) -> List[tuple]:
+    """(kind, value, valid) boundary values for a string schema."""
+    mutations = []
+    if "enum" in schema and schema["enum"]:
+        mutations.append(("enum_first", schema["enum"][0], True))
+        mutations.append(("enum_last", schema["enum"][-1], True))
+        mutations.append(("not_in_enum", "INVALID_ENUM_VALUE", False))
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        mutations.append(("min_length", "a" * min_length, True))
+        if min_length > 0:
+            mutations.append(("below_min_length", "a" * (min_length - 1), False))
+    if "maxLength" in schema:
+        max_length = schema["maxLength"]
+        mutations.append(("max_length", "a" * max_length, True))
+        mutations.append(("above_max_length", "a" * (max_length + 1), False))
+    if "pattern" in schema:
+        try:
+            pattern = re.compile(schema["pattern"])
+        except re.error:
+            pattern = None
+        if pattern is not None:
+            for _, candidate in GENERIC_STRINGS + [("digits", "0"), ("letters", "abc")]:
+                if not pattern.search(candidate):
+                    mutations.append(("pattern_violation", candidate, False))
+                    break
+    if schema.get("format") in INVALID_FORMATS:
+        mutations.append(("invalid_format", INVALID_FORMATS[schema["format"]], False))
+    mutations.extend((kind, value, None) for kind, value in GENERIC_STRINGS)
+    return mutations
+
+
+def field_mutations(schema: Dict, required: bool = False) -> List[tuple]:
+    """All (kind, value, valid) mutations of one field; valid=None when the spec does not say."""
+    schema_type = schema.get("type") or ("object" if "properties" in schema else None)
+    mutations = []
+    if schema_type in ("integer", "number"):
+        mutations.extend(numeric_mutations(schema))
+    elif schema_type == "string":
+        mutations.extend(string_mutations(schema))
+    elif schema_type == "array":
+        mutations.append(("empty_array", [], not schema.get("minItems")))
+    elif schema_type == "object":
+        mutations.append(("empty_object", {}, not schema.get("required")))
+    mutations.extend(("type_confusion", value, False) for value in TYPE_CONFUSION.get(schema_type, []))
+    mutations.append(("null", None, bool(schema.get("x-nullable") or schema.get("nullable"))))
+    if required:
+        mutations.append(("missing_required", _MISSING, False))
+    return mutations
+
+
+def iter_fields(compiler: SchemaCompiler, schema: Dict, path: tuple = (), refs: tuple = ()):
+    """Yield (path, resolved schema, required) for every field below a schema."""
+    schema_type = schema.get("type") or ("object" if "properties" in schema else None)
+    if schema_type == "object":
+        required = set(schema.get("required", []))
+        for name, prop in schema.get("properties", {}).items():
+            ref = prop.get("$ref")
+            if ref and refs.count(ref) >= MAX_REF_DEPTH:
+                continue
+            resolved = compiler.resolve(prop)
+            child_refs = refs + (ref,) if ref else refs
+            yield path + (name,), resolved, name in required
+            yield from iter_fields(compiler, resolved, path + (name,), child_refs)
+    elif schema_type == "array":
+        items = schema.get("items", {})
+        ref = items.get("$ref")
+        if ref and refs.count(ref) >= MAX_REF_DEPTH:
+            return
+        resolved = compiler.resolve(items)
+        yield path + (0,), resolved, False
+        yield from iter_fields(compiler, resolved, path + (0,), refs + (ref,) if ref else refs)
+
+
+def replace_at(payload: Any, path: tuple, value: Any) -> Any:
+    """
+    Copy of payload with the value at path replaced (or removed for _MISSING).
+
+    Only the containers along the path are copied; raises KeyError/IndexError
+    if the path is not in the payload.
+    """
+    if not path:
+        return value
+    key, rest = path[0], path[1:]
+    if isinstance(payload, dict):
+        copy = dict(payload)
+        if not rest and value is _MISSING:
+            del copy[key]
+        else:
+            copy[key] = replace_at(payload[key], rest, value)
+        return copy
+    if isinstance(payload, list):
+        copy = list(payload)
+        copy[key] = replace_at(payload[key], rest, value)
+        return copy
+    raise KeyError(key)
+
+
+def operation_cases(method: str, path: str, operation: Dict, compiler: SchemaCompiler,
+                    seed: int = 0, size_steps: List[tuple] = SIZE_STEPS) -> List[Dict]:
+    """All fuzz cases of one operation, in a deterministic order."""
+    schema = request_body_schema(operation)
+    if not schema:
+        return []
+
+    # A string seed is hashed with sha512, so it is stable across processes and runs
+    rng = random.Random(f"{seed}:{method.upper()}:{path}")
+    builder = compiler.compile(schema)
+    base = builder(rng=rng)
+    # The executor does not fill defaults into fuzz cases, so mutations of these fields stick
+    if isinstance(base, dict):
+        apply_defaults(base)
+    url = BASE_URL + fill_path_params(path, operation)
+
+    def case(kind, payload, valid, field=None):
+        return {
+            "method": method.upper(),
+            "endpoint": path,
+            "url": url,
+            "payload": payload,
+            "description": f"Fuzz {kind}" + (f" of {'.'.join(map(str, field))}" if field else ""),
+            # None: the spec does not say whether the value is accepted
+            "expected_status": None if valid is None else (200 if valid else 400),
+            "fuzz": {"seed": seed, "kind": kind, "field": list(field) if field else None},
+        }
+
+    cases = []
+    for kind, value, valid in field_mutations(compiler.resolve(schema)):
+        if value is not _MISSING:
+            cases.append(case(kind, value, valid))
+    for field, field_schema, required in iter_fields(compiler, compiler.resolve(schema)):
+        for kind, value, valid in field_mutations(field_schema, required):
+            try:
+                cases.append(case(kind, replace_at(base, field, value), valid, field))
+            except (KeyError, IndexError, TypeError):
+                # Field cut off in the base payload (recursive schema); nothing to mutate
+                break
+    for array_items, string_length in size_steps:
+        payload = builder(rng=rng, array_items=array_items, string_length=string_length)
+        if isinstance(payload, dict):
+            apply_defaults(payload)
+        cases.append(case(f"size_{array_items}x{string_length}", payload, None))
+    return cases
+
+
+def _init_worker(spec, seed, size_steps):
+    _worker["spec"] = spec
+    _worker["compiler"] = SchemaCompiler(spec, leaf_factory=valid_leaf)
+    _worker["seed"] = seed
+    _worker["size_steps"] = size_steps
+
+
+def _fuzz_operation(path, method):
+    operation = _worker["spec"]["paths"][path][method]
+    return operation_cases(method, path, operation, _worker["compiler"], _worker["seed"], _worker["size_steps"])
+
+
+def iter_cases(spec: Dict, seed: int = 0, workers: int = None, size_steps: List[tuple] = SIZE_STEPS,
+               max_cases: int = None) -> Iterator[Dict]:
+    """
+    Stream fuzz cases for every operation of a spec, in spec order.
+
+    Args:
+        spec: Swagger/OpenAPI document
+        seed: Base seed; the same seed always yields the same cases
+        workers: Worker processes (default: CPU count; 1 fuzzes in this process)
+        size_steps: (array_items, string_length) of the size-scaling cases
+        max_cases: Stop after this many cases
+    """
+    operations = [(path, method) for path, path_item in spec.get("paths", {}).items()
+                  for method, operation in path_item.items() if isinstance(operation, dict)]
+    workers = workers or os.cpu_count() or 1
+    emitted = 0
+
+    if workers <= 1:
+        _init_worker(spec, seed, size_steps)
+        results = (_fuzz_operation(path, method) for path, method in operations)
+        for cases in results:
+            for test in cases:
+                if max_cases is not None and emitted >= max_cases:
+                    return
+                yield test
+                emitted += 1
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(spec, seed, size_steps)) as pool:
+        # At most two operations per worker are pending, so a slow consumer holds back the workers
+        pending = deque()
+        remaining = iter(operations)
+        try:
+            for path, method in remaining:
+                pending.append(pool.submit(_fuzz_operation, path, method))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                cases = pending.popleft().result()
+                for path, method in remaining:
+                    pending.append(pool.submit(_fuzz_operation, path, method))
+                    break
+                for test in cases:
+                    if max_cases is not None and emitted >= max_cases:
+                        return
+                    yield test
+                    emitted += 1
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate seeded, schema-aware fuzz test cases")
+    parser.add_argument("--swagger", default=SWAGGER_PATH, help="Swagger/OpenAPI specification")
+    parser.add_argument("--seed", type=int, default=0, help="Seed; the same seed reproduces the same cases")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-cases", type=int, help="Stop after this many cases")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="JSONL file for the cases (without --execute)")
+    parser.add_argument("--execute", action="store_true",
+                        help="Stream cases straight into the test executor instead of writing them")
+    parser.add_argument("--budget", help="Wall-clock budget when executing, e.g. 90s, 5m, 1h")
+    parser.add_argument("--max-failures", type=int, help="Stop executing after this many failures")
+    args = parser.parse_args(argv)
+
+    with open(args.swagger, "r") as f:
+        spec = json.load(f)
+    cases = iter_cases(spec, seed=args.seed, workers=args.workers, max_cases=args.max_cases)
+
+    if args.execute:
+        from test_case_generator import run_tests, scheduler
+
+        budget_s = scheduler.parse_budget(args.budget) if args.budget else None
+        run_tests.run_tests(cases, budget_s=budget_s, max_failures=args.max_failures,
+                            stream_file=run_tests.STREAM_FILE, collect=False)
+        print(f"Fuzz results streamed to {run_tests.STREAM_FILE}")
+        return
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    count = 0
+    with open(args.output, "w") as f:
+        for test in cases:
+            f.write(json.dumps(test) + "\n")
+            count += 1
+    print(f"Wrote {count} fuzz cases (seed {args.seed}) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,21 @@ import os
 import sys
 from .ai_test_generator import AITestGenerator
 import json
-import pandas as pd
 
-def main():
+def main(prioritized_mode=None):
+    """Generate test cases into generated_tests.json and return them."""
     # Paths
     swagger_path = "test_case_generator/data/swagger.json"
     postman_path = "test_case_generator/data/rGuest Pay Agent.postman_test_run.json"
-    historical_data_path = "ai_model/data/history_logs.csv"
+    historical_data_path = "ai_model/data/history"
     output_path = "test_case_generator/data/generated_tests.json"
     prioritized_path = "ai_model/data/prioritized_tests.json"
 
     # Check for prioritized mode (via env or arg)
     prioritized = None
-    if os.environ.get("PRIORITIZED") == "1" or (len(sys.argv) > 1 and sys.argv[1] == "--prioritized"):
+    if prioritized_mode is None:
+        prioritized_mode = os.environ.get("PRIORITIZED") == "1" or (len(sys.argv) > 1 and sys.argv[1] == "--prioritized")
+    if prioritized_mode:
         if os.path.exists(prioritized_path):
             with open(prioritized_path, "r") as f:
                 prioritized = json.load(f)
@@ -22,33 +24,29 @@ def main():
         else:
             print("Prioritized tests file not found, running full generation.")
 
+    all_tests = None
+
     # Generate from Swagger if available
     if os.path.exists(swagger_path):
         generator = AITestGenerator(
             swagger_path=swagger_path,
             historical_data_path=historical_data_path
         )
-        generator.save_test_cases(output_path, prioritized=prioritized)
+        all_tests = generator.save_test_cases(output_path, prioritized=prioritized)
         print("✅ Test cases generated from Swagger.")
 
     # Generate from Postman if available
     if os.path.exists(postman_path):
-        with open(postman_path, "r") as f:
-            postman_data = json.load(f)
-        # Convert Postman test run to test cases format
-        results = postman_data.get("results", [])
-        collection_methods = {req["id"]: req["method"] for req in postman_data.get("collection", {}).get("requests", [])}
+        from postman_stream import iter_run_results
+
+        # Convert Postman test run to test cases format, streaming the export
         postman_tests = []
-        for result in results:
-            url = result.get("url")
-            method = collection_methods.get(result["id"], "GET")
-            status_code = result.get("responseCode", {}).get("code", 0)
-            time = result.get("time", 0)
+        for result in iter_run_results(postman_path):
             postman_tests.append({
-                "method": method,
-                "url": url,
-                "status_code": status_code,
-                "latency_ms": time
+                "method": result["method"] or "GET",
+                "url": result["url"],
+                "status_code": result["status_code"] if result["status_code"] is not None else 0,
+                "latency_ms": result["latency_ms"] if result["latency_ms"] is not None else 0
             })
         # Save/append to the same output file
         if os.path.exists(output_path):
@@ -61,5 +59,7 @@ def main():
             json.dump(all_tests, f, indent=2)
         print("✅ Test cases generated from Postman test run.")
 
+    return all_tests
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Compile JSON schemas into reusable payload builders.
+
+Payload generators used to walk the schema tree (and re-resolve every $ref)
+for each test they produced. SchemaCompiler does that walk once per schema
+and returns a PayloadBuilder: a tree of closures that only has to draw
+values. Builders are memoized per schema object and per $ref, so every
+operation sharing a definition shares its builder.
+
+    compiler = SchemaCompiler(spec)
+    build = compiler.compile(request_body_schema(operation))
+    happy = build(seed=1)
+    large = build(seed=1, array_items=1000, string_length=10_000)
+
+How leaf values are drawn is pluggable (`leaf_factory`), so each generator
+keeps its own value policy.
+"""
+
+import random
+from typing import Any, Callable, Dict, Optional
+
+# Times a $ref may be expanded inside itself before it is built as null
+MAX_REF_DEPTH = 3
+
+# leaf_factory(schema, field_name) -> draw(ctx) for every non-object, non-array schema node
+LeafFactory = Callable[[Dict, Optional[str]], Callable[["BuildContext"], Any]]
+
+
+class BuildContext:
+    """Per-call state shared by every closure of one build."""
+    __slots__ = ("rng", "array_items", "string_length", "examples", "ref_depth")
+
+    def __init__(self, rng, array_items=1, string_length=None, examples=None):
+        self.rng = rng
+        self.array_items = array_items
+        self.string_length = string_length
+        self.examples = examples
+        # $ref -> how many times it is currently being expanded
+        self.ref_depth = {}
+
+
+class PayloadBuilder:
+    def __init__(self, build: Callable[[BuildContext], Any], schema: Dict):
+        self._build = build
+        self.schema = schema
+
+    def __call__(self, seed: int = None, rng=None, array_items: int = 1, string_length: int = None,
+                 examples: Dict[str, list] = None) -> Any:
+        """
+        Build one payload.
+
+        Args:
+            seed: Seed for a private random generator, for reproducible payloads
+            rng: Random generator to draw from (defaults to the global `random` module)
+            array_items: Items generated per array (items of such an array get one item per array)
+            string_length: Pad or cut generated strings outside scaled arrays to this length
+            examples: {field_name: [values]} to draw from before synthesizing a value
+        """
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        return self._build(BuildContext(rng, array_items, string_length, examples))
+
+
+def request_body_schema(operation: Dict) -> Optional[Dict]:
+    """Request body schema of an operation (Swagger 2.0 body parameter or OpenAPI 3 requestBody)."""
+    for param in operation.get("parameters", []):
+        if param.get("in") == "body" and "schema" in param:
+            return param["schema"]
+    content = operation.get("requestBody", {}).get("content", {})
+    return content.get("application/json", {}).get("schema")
+
+
+def matches_type(value: Any, schema_type: str) -> bool:
+    """Whether a value fits a JSON schema primitive type."""
+    if schema_type == "boolean":
+        return isinstance(value, bool)
+    if isinstance(value, bool):
+        return False
+    if schema_type == "string":
+        return isinstance(value, str)
+    if schema_type == "integer":
+        return isinstance(value, int)
+    if schema_type == "number":
+        return isinstance(value, (int, float))
+    return False
+
+
+def random_leaf(schema: Dict, field_name: str = None) -> Callable[[BuildContext], Any]:
+    """Randomized values with field-name hints (the AITestGenerator policy)."""
+    schema_type = schema.get("type")
+    if schema_type is None:
+        return lambda ctx: ""
+    if schema_type == "string":
+        name = schema.get("name", "").lower()
+        if "email" in name:
+            return lambda ctx: "test@example.com"
+        if "date" in name:
+            return lambda ctx: "2024-03-11"
+        if "id" in name:
+            return lambda ctx: str(ctx.rng.randint(1000, 9999))
+        return lambda ctx: "sample-string"
+    if schema_type == "integer":
+        return lambda ctx: ctx.rng.randint(1, 100)
+    if schema_type == "number":
+        return lambda ctx: round(ctx.rng.uniform(1.0, 100.0), 2)
+    if schema_type == "boolean":
+        return lambda ctx: ctx.rng.choice([True, False])
+    return lambda ctx: None
+
+
+class SchemaCompiler:
+    def __init__(self, spec: Dict = None, leaf_factory: LeafFactory = random_leaf,
+                 overrides: Dict[str, Any] = None, optional_rate: float = 1.0, use_examples: bool = False):
+        """
+        Args:
+            spec: Swagger/OpenAPI document that $ref pointers resolve against
+            leaf_factory: Builds the value drawer for primitive schema nodes
+            overrides: {property_name: value} used instead of the property's schema
+            optional_rate: Probability of including each non-required property
+            use_examples: Whether builders take per-call `examples` for named fields
+        """
+        self.spec = spec or {}
+        self.leaf_factory = leaf_factory
+        self.overrides = overrides or {}
+        self.optional_rate = optional_rate
+        self.use_examples = use_examples
+        # (id(schema), field) -> (schema, draw); the schema is kept so its id is never reused
+        self._compiled = {}
+        self._builders = {}
+        self._refs = {}
+        self._expanding = set()
+        self._recursive = set()
+
+    def resolve(self, schema: Dict) -> Dict:
+        """Follow $ref pointers (#/definitions/X, #/components/schemas/X) to the target schema."""
+        seen = set()
+        while isinstance(schema, dict) and "$ref" in schema:
+            ref = schema["$ref"]
+            if ref in seen:
+                return {}
+            seen.add(ref)
+            target = self.spec
+            for part in ref.lstrip("#/").split("/"):
+                target = target.get(part, {}) if isinstance(target, dict) else {}
+            schema = target
+        return schema if isinstance(schema, dict) else {}
+
+    def compile(self, schema: Dict) -> PayloadBuilder:
+        """Builder for a schema, compiled on first use."""
+        schema = schema or {}
+        cached = self._builders.get(id(schema))
+        if cached is None:
+            builder = PayloadBuilder(self._draw(schema), self.resolve(schema))
+            cached = self._builders[id(schema)] = (schema, builder)
+        return cached[1]
+
+    def _draw(self, schema: Dict, field_name: str = None) -> Callable[[BuildContext], Any]:
+        if "$ref" in schema:
+            return self._ref(schema["$ref"], field_name)
+
+        key = (id(schema), field_name)
+        cached = self._compiled.get(key)
+        if cached is None:
+            cached = self._compiled[key] = (schema, self._compile_node(schema, field_name))
+        return cached[1]
+
+    def _ref(self, ref: str, field_name: str) -> Callable[[BuildContext], Any]:
+        key = (ref, field_name)
+        draw = self._refs.get(key)
+        if draw is not None:
+            if key in self._expanding:
+                self._recursive.add(key)
+            return draw
+
+        # Placeholder while compiling, so recursive definitions compile
+        self._refs[key] = lambda ctx: self._refs[key](ctx)
+        self._expanding.add(key)
+        try:
+            target = self._draw(self.resolve({"$ref": ref}), field_name)
+        finally:
+            self._expanding.discard(key)
+        if key not in self._recursive:
+            self._refs[key] = target
+            return target
+
+        def draw_ref(ctx):
+            # ...and build: a definition nested in itself too deep becomes null
+            depth = ctx.ref_depth.get(ref, 0)
+            if depth >= MAX_REF_DEPTH:
+                return None
+            ctx.ref_depth[ref] = depth + 1
+            try:
+                return target(ctx)
+            finally:
+                ctx.ref_depth[ref] = depth
+        self._refs[key] = draw_ref
+        return draw_ref
+
+    def _compile_node(self, schema: Dict, field_name: str) -> Callable[[BuildContext], Any]:
+        schema_type = schema.get("type")
+        if schema_type == "object" or (schema_type is None and "properties" in schema):
+            return self._compile_object(schema)
+        if schema_type == "array":
+            return self._compile_array(schema, field_name)
+
+        draw = self.leaf_factory(schema, field_name)
+        if schema_type == "string":
+            draw = _sized_string(draw)
+        if not self.use_examples or field_name is None or schema_type not in ("string", "integer", "number", "boolean"):
+            return draw
+
+        def draw_example(ctx):
+            if ctx.examples:
+                values = [v for v in ctx.examples.get(field_name, ()) if matches_type(v, schema_type)]
+                if values:
+                    return ctx.rng.choice(values)
+            return draw(ctx)
+        return draw_example
+
+    def _compile_object(self, schema: Dict) -> Callable[[BuildContext], Any]:
+        required = set(schema.get("required", []))
+        properties = []
+        for name, prop_schema in schema.get("properties", {}).items():
+            if name in self.overrides:
+                value = self.overrides[name]
+                properties.append((name, lambda ctx, value=value: value, True))
+            else:
+                properties.append((name, self._draw(prop_schema, name), name in required))
+        optional_rate = self.optional_rate
+
+        if optional_rate >= 1:
+            all_properties = [(name, draw) for name, draw, _ in properties]
+            return lambda ctx: {name: draw(ctx) for name, draw in all_properties}
+
+        def draw_object(ctx):
+            return {
+                name: draw(ctx)
+                for name, draw, is_required in properties
+                if is_required or ctx.rng.random() < optional_rate
+            }
+        return draw_object
+
+    def _compile_array(self, schema: Dict, field_name: str) -> Callable[[BuildContext], Any]:
+        draw_item = self._draw(schema.get("items", {}), field_name)
+
+        def draw_array(ctx):
+            if ctx.array_items == 1:
+                return [draw_item(ctx)]
+            # Items of a scaled array are not scaled again, so nested schemas stay linear in size
+            array_items, string_length = ctx.array_items, ctx.string_length
+            ctx.array_items, ctx.string_length = 1, None
+            try:
+                return [draw_item(ctx) for _ in range(array_items)]
+            finally:
+                ctx.array_items, ctx.string_length = array_items, string_length
+        return draw_array
+
+
+def _sized_string(draw: Callable[[BuildContext], Any]) -> Callable[[BuildContext], Any]:
+    def draw_string(ctx):
+        value = draw(ctx)
+        if ctx.string_length is None or not isinstance(value, str):
+            return value
+        if len(value) < ctx.string_length:
+            value = (value or "x") * (ctx.string_length // max(len(value), 1) + 1)
+        return value[:ctx.string_length]
+    return draw_string
@@ -0,0 +1,168 @@
+"""
+Persisted TF-IDF similarity index over the operations of a Swagger spec.
+
+Fitting the vectorizer and scoring a query against every endpoint used to
+happen on each AITestGenerator construction and payload. The index is now
+built once per spec, saved under INDEX_DIR keyed by a hash of the spec's
+paths, and queried in batches:
+
+    ai_test_generator/data/similarity_index/<spec hash>.json   vocabulary, idf, paths
+    ai_test_generator/data/similarity_index/<spec hash>.npz    L2-normalized TF-IDF rows
+
+TF-IDF rows are L2-normalized, so cosine similarity is a sparse dot product,
+and the top k per query comes from argpartition instead of a full argsort.
+
+Usage:
+    python -m ai_test_generator.similarity_index build test_case_generator/data/swagger.json
+    python -m ai_test_generator.similarity_index query test_case_generator/data/swagger.json "post /v1.5/payments"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+INDEX_DIR = "ai_test_generator/data/similarity_index"
+# Queries scored per sparse product, bounding the dense similarity block
+QUERY_CHUNK_SIZE = 1024
+
+
+def spec_hash(spec: Dict) -> str:
+    """Hash of the spec's operations; the index is rebuilt whenever it changes."""
+    canonical = json.dumps(spec.get("paths", {}), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def describe_operations(spec: Dict) -> tuple:
+    """One text description per operation, with the path of each row."""
+    descriptions, paths = [], []
+    for path, path_item in spec.get("paths", {}).items():
+        for method, details in path_item.items():
+            if not isinstance(details, dict):
+                continue
+            descriptions.append(f"{method} {path} {details.get('summary', '')} {details.get('description', '')}")
+            paths.append(path)
+    return descriptions, paths
+
+
+class EndpointSimilarityIndex:
+    def __init__(self, vectorizer: TfidfVectorizer, matrix, paths: List[str], key: str = None):
+        self.vectorizer = vectorizer
+        self.matrix = sparse.csr_matrix(matrix)
+        self.paths = list(paths)
+        self.key = key
+        # Most operations sharing one path, so top-k over rows always covers k distinct paths
+        self._max_per_path = max(np.unique(self.paths, return_counts=True)[1]) if self.paths else 1
+
+    @classmethod
+    def build(cls, spec: Dict) -> "EndpointSimilarityIndex":
+        descriptions, paths = describe_operations(spec)
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform(descriptions) if descriptions else sparse.csr_matrix((0, 0))
+        return cls(vectorizer, matrix, paths, spec_hash(spec))
+
+    @classmethod
+    def load_or_build(cls, spec: Dict, index_dir: str = INDEX_DIR) -> "EndpointSimilarityIndex":
+        """Load the saved index for this spec, or build and save it."""
+        key = spec_hash(spec)
+        try:
+            return cls.load(key, index_dir)
+        except (OSError, ValueError, KeyError):
+            index = cls.build(spec)
+            if index.paths:
+                try:
+                    index.save(index_dir)
+                except OSError as e:
+                    print(f"[WARNING] Could not save similarity index: {e}")
+            return index
+
+    def save(self, index_dir: str = INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        base = os.path.join(index_dir, self.key)
+        # The matrix is written first, so a readable .json always has its .npz
+        sparse.save_npz(base + ".npz", self.matrix)
+        tmp_path = base + ".json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "paths": self.paths,
+                "vocabulary": {term: int(i) for term, i in self.vectorizer.vocabulary_.items()},
+                "idf": self.vectorizer.idf_.tolist(),
+            }, f)
+        os.replace(tmp_path, base + ".json")
+
+    @classmethod
+    def load(cls, key: str, index_dir: str = INDEX_DIR) -> "EndpointSimilarityIndex":
+        base = os.path.join(index_dir, key)
+        with open(base + ".json", "r") as f:
+            state = json.load(f)
+        vectorizer = TfidfVectorizer(vocabulary=state["vocabulary"])
+        vectorizer.idf_ = np.asarray(state["idf"])
+        matrix = sparse.load_npz(base + ".npz")
+        if matrix.shape[0] != len(state["paths"]):
+            raise ValueError(f"Similarity index {base} is inconsistent")
+        return cls(vectorizer, matrix, state["paths"], key)
+
+    def query(self, queries: List[str], top_k: int = 3) -> List[List[str]]:
+        """Top k distinct similar paths for each query text."""
+        if not queries or not self.paths:
+            return [[] for _ in queries]
+
+        # Enough rows that deduplicating by path still leaves top_k paths
+        n_rows = min(top_k * self._max_per_path, len(self.paths))
+        results = []
+        for start in range(0, len(queries), QUERY_CHUNK_SIZE):
+            vectors = self.vectorizer.transform(queries[start:start + QUERY_CHUNK_SIZE])
+            similarities = (vectors @ self.matrix.T).toarray()
+            if n_rows < similarities.shape[1]:
+                top = np.argpartition(-similarities, n_rows - 1, axis=1)[:, :n_rows]
+            else:
+                top = np.tile(np.arange(similarities.shape[1]), (similarities.shape[0], 1))
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            # Stable sort, so tied endpoints keep spec order
+            top = np.take_along_axis(top, np.argsort(-top_scores, axis=1, kind="stable"), axis=1)
+
+            for row in top:
+                paths = []
+                for i in row:
+                    path = self.paths[i]
+                    if path not in paths:
+                        paths.append(path)
+                        if len(paths) == top_k:
+                            break
+                results.append(paths)
+        return results
+
+    def query_operations(self, operations: List[tuple], top_k: int = 3) -> List[List[str]]:
+        """Top k similar paths for each (endpoint, method) pair."""
+        return self.query([f"{method} {endpoint}" for endpoint, method in operations], top_k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the endpoint similarity index of a Swagger spec")
+    parser.add_argument("command", choices=["build", "query"])
+    parser.add_argument("swagger_path")
+    parser.add_argument("queries", nargs="*", help="Query texts, e.g. \"post /v1.5/payments\"")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    with open(args.swagger_path, "r") as f:
+        spec = json.load(f)
+
+    if args.command == "build":
+        index = EndpointSimilarityIndex.build(spec)
+        index.save(args.index_dir)
+        print(f"Indexed {len(index.paths)} operations to {os.path.join(args.index_dir, index.key)}.json")
+    else:
+        index = EndpointSimilarityIndex.load_or_build(spec, args.index_dir)
+        for query, paths in zip(args.queries, index.query(args.queries, args.top_k)):
+            print(f"{query}: {', '.join(paths)}")
+
+
+if __name__ == "__main__":
+    main()
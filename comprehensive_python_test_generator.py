@@ -3,10 +3,31 @@ import os
 import re
 import random
 import string
+import zlib
+
+from ai_test_generator.schema_compiler import SchemaCompiler, request_body_schema
 
 class ComprehensivePythonTestGenerator:
-    def __init__(self, base_url="http://localhost:8502"):
+    def __init__(self, base_url="http://localhost:8502", swagger_path="data/raw/swagger_fixed.json"):
         self.base_url = base_url
+        # With a spec, request bodies are built from each operation's schema instead of fixed sample data
+        self.spec = None
+        if swagger_path and os.path.exists(swagger_path):
+            with open(swagger_path, 'r', encoding='utf-8') as f:
+                self.spec = json.load(f)
+        self.schema_compiler = SchemaCompiler(self.spec)
+        self._builders = {}
+
+    def payload_builder(self, endpoint):
+        """Compiled request body builder for "METHOD /path", or None if the spec has no body schema."""
+        if endpoint not in self._builders:
+            operation = {}
+            if self.spec:
+                path_item = self.spec.get('paths', {}).get(self.extract_path(endpoint), {})
+                operation = path_item.get(self.extract_http_method(endpoint).lower(), {})
+            schema = request_body_schema(operation)
+            self._builders[endpoint] = self.schema_compiler.compile(schema) if schema else None
+        return self._builders[endpoint]
         
     def extract_http_method(self, endpoint):
         """Extract HTTP method from endpoint string"""
@@ -30,23 +51,36 @@ class ComprehensivePythonTestGenerator:
         """Generate appropriate test data based on scenario type and endpoint"""
         scenario_type = scenario.get('scenario_type', '')
         
-        # Base test data
-        base_data = {
-            "amount": 10.00,
-            "currency": "USD",
-            "cardData": "encrypted_card_data_here",
-            "deviceGuid": "test-device-guid-123",
-            "token": "test-token-456",
-            "transactionId": "test-transaction-789"
-        }
+        # Base test data, built from the request body schema when the spec has one
+        base_data = None
+        builder = self.payload_builder(endpoint)
+        if builder is not None:
+            # Seeded per endpoint and scenario, so regenerated test files do not change
+            seed = zlib.crc32(f"{endpoint}|{scenario_type}".encode('utf-8'))
+            if scenario_type == 'large_payload':
+                # Scale the real fields: 1,000-item arrays and 10KB strings
+                base_data = builder(seed=seed, array_items=1000, string_length=10000)
+            else:
+                base_data = builder(seed=seed)
+        from_schema = isinstance(base_data, dict) and bool(base_data)
+        if not from_schema:
+            base_data = {
+                "amount": 10.00,
+                "currency": "USD",
+                "cardData": "encrypted_card_data_here",
+                "deviceGuid": "test-device-guid-123",
+                "token": "test-token-456",
+                "transactionId": "test-transaction-789"
+            }
         
         # Scenario-specific modifications
         if scenario_type == 'large_payload':
             # Generate large payload for performance testing
-            base_data.update({
-                "largeField": "x" * 10000,  # 10KB string
-                "arrayField": [{"id": i, "data": f"item_{i}"} for i in range(1000)]
-            })
+            if not from_schema:
+                base_data.update({
+                    "largeField": "x" * 10000,  # 10KB string
+                    "arrayField": [{"id": i, "data": f"item_{i}"} for i in range(1000)]
+                })
         
         elif scenario_type == 'sql_injection':
             # SQL injection test data
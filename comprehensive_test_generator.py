@@ -1,18 +1,86 @@
 import json
 import itertools
-from transformers import T5ForConditionalGeneration, RobertaTokenizer
-import torch
 import argparse
 import os
+import time
+
+from ai_model.precision import PRECISIONS
+
+PROMPT_MODES = ("full", "shared")
+# "fixed" decodes every scenario with GENERATION_KWARGS; "adaptive" lets ai_model/decoding_policy.py choose
+DECODING_MODES = ("fixed", "adaptive")
+
+# Instructions after the scenario in a full prompt; part of the shared context in "shared" mode
+SCENARIO_INSTRUCTIONS = (
+    "Generate a comprehensive test case that covers this specific scenario. "
+    "Include specific test data, expected behavior, and validation criteria.\n\n"
+)
+
+GENERATION_KWARGS = dict(
+    max_length=200,
+    num_beams=5,
+    repetition_penalty=2.5,
+    length_penalty=1.0,
+    early_stopping=True,
+    num_return_sequences=1,
+    no_repeat_ngram_size=2
+)
 
 class ComprehensiveTestGenerator:
-    def __init__(self, model_path="src/data/models/checkpoints/latest_english_generator"):
+    def __init__(self, model_path="src/data/models/checkpoints/latest_english_generator", prompt_mode="full",
+                 decoding="fixed", draft_model_path=None, precision="fp32"):
+        """
+        Args:
+            model_path: Fine-tuned checkpoint directory
+            prompt_mode: "full" encodes each scenario's whole prompt; "shared" encodes the
+                endpoint context once per endpoint (see ai_model/shared_context.py)
+            decoding: "fixed" uses GENERATION_KWARGS for every scenario; "adaptive" picks greedy,
+                small-beam, beam or sampled decoding per scenario (see ai_model/decoding_policy.py)
+            draft_model_path: Optional distilled draft for assisted decoding of single-beam
+                generations in "full" mode (see ai_model/draft_model.py)
+            precision: "fp32", or "bf16" to generate under CPU autocast (see ai_model/precision.py)
+        """
+        # Heavy imports deferred until a model is actually loaded
+        import torch
+        from transformers import T5ForConditionalGeneration
+        from ai_model.draft_model import generate, load_draft_model
+        from ai_model.precision import autocast, check_precision
+        from ai_model.shared_context import SharedContextGenerator, count_generated
+        from ai_model.tokenizer_provider import get_tokenizer
+
+        if prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"prompt_mode must be one of {PROMPT_MODES}, got {prompt_mode!r}")
+        self.prompt_mode = prompt_mode
+        if decoding not in DECODING_MODES:
+            raise ValueError(f"decoding must be one of {DECODING_MODES}, got {decoding!r}")
+        self.decoding = decoding
+        self.decoding_policy = None
+        if decoding == "adaptive":
+            from ai_model.decoding_policy import DecodingPolicy
+            self.decoding_policy = DecodingPolicy.load()
+
+        check_precision(precision)
+        self.precision = precision
+        self._autocast = autocast
+
         # Optimize for CPU
         torch.set_num_threads(1)
         self.device = torch.device("cpu")
         self.model = T5ForConditionalGeneration.from_pretrained(model_path).to(self.device)
-        self.tokenizer = RobertaTokenizer.from_pretrained(model_path)
+        self.tokenizer = get_tokenizer(model_path)
         self.model.eval()
+        self.shared_generator = SharedContextGenerator(self.model, self.tokenizer, self.device)
+        # Both modes report into the same counters
+        self.stats = self.shared_generator.stats
+        self._count_generated = count_generated
+        self._generate = generate
+        self.draft_model = None
+        if draft_model_path:
+            self.draft_model = load_draft_model(draft_model_path, self.device, self.model)
+            if prompt_mode == "shared":
+                print("[WARNING] Assisted decoding needs one prompt per call; the draft model is unused in shared mode")
+            elif decoding == "fixed" and GENERATION_KWARGS["num_beams"] > 1:
+                print("[WARNING] Beam search cannot be assisted; use --decoding adaptive to draft greedy/sampled scenarios")
 
     def load_swagger(self, swagger_file):
         """Load and parse the Swagger specification."""
@@ -201,29 +269,88 @@ class ComprehensiveTestGenerator:
         ]
         return performance_scenarios
 
-    def _format_comprehensive_prompt(self, path, method_info, scenario):
-        """Format a comprehensive test scenario into a prompt."""
+    def _format_endpoint_context(self, path, method_info):
+        """Prompt header shared by every scenario of an endpoint."""
         operation_id = method_info.get("operationId", "N/A")
         summary = method_info.get("summary", "No summary available.")
-        
-        # Build scenario-specific description
-        scenario_desc = scenario['description']
-        if scenario.get('params'):
-            param_names = [p['name'] for p in scenario['params']]
-            scenario_desc += f" (Parameters: {', '.join(param_names)})"
-        
-        prompt = (
+        return (
             f"Generate a detailed test case for the following API endpoint and scenario:\n\n"
             f"API Endpoint: {method_info.get('method', 'N/A').upper()} {path}\n"
             f"Operation: {operation_id}\n"
             f"Summary: {summary}\n"
+        )
+
+    def _format_scenario(self, scenario):
+        """Scenario-specific lines of a prompt."""
+        scenario_desc = scenario['description']
+        if scenario.get('params'):
+            param_names = [p['name'] for p in scenario['params']]
+            scenario_desc += f" (Parameters: {', '.join(param_names)})"
+        return (
             f"Test Scenario: {scenario_desc}\n"
             f"Scenario Type: {scenario['type']}\n\n"
-            f"Generate a comprehensive test case that covers this specific scenario. "
-            f"Include specific test data, expected behavior, and validation criteria.\n\n"
-            f"Test Case:"
         )
-        return prompt
+
+    def _format_comprehensive_prompt(self, path, method_info, scenario):
+        """Format a comprehensive test scenario into a prompt."""
+        return (
+            self._format_endpoint_context(path, method_info)
+            + self._format_scenario(scenario)
+            + SCENARIO_INSTRUCTIONS
+            + "Test Case:"
+        )
+
+    def _decoding_for(self, scenario, complexity):
+        """(policy name, generate() kwargs) for one scenario."""
+        if self.decoding_policy is None:
+            return "fixed", GENERATION_KWARGS
+        return self.decoding_policy.choose(scenario['type'], complexity, GENERATION_KWARGS)
+
+    def _record_decoding(self, scenario, policy, output_tokens, seconds, kwargs):
+        if self.decoding_policy is not None:
+            self.decoding_policy.record(scenario['type'], policy, output_tokens, seconds,
+                                        max_length=kwargs.get('max_length'))
+
+    def _generate_scenario_test_cases(self, path, method_info, scenarios):
+        """Generated test case text for each scenario of one endpoint."""
+        from ai_model.decoding_policy import endpoint_complexity
+
+        complexity = endpoint_complexity(method_info)
+        decodings = [self._decoding_for(scenario, complexity) for scenario in scenarios]
+
+        if self.prompt_mode == "shared":
+            # Endpoint header and instructions are encoded once; only scenario lines per scenario.
+            # Scenarios decoded the same way are generated as one batch.
+            context = self._format_endpoint_context(path, method_info) + SCENARIO_INSTRUCTIONS
+            groups = {}
+            for i, (policy, kwargs) in enumerate(decodings):
+                groups.setdefault((policy, kwargs.get('max_length')), []).append(i)
+            test_cases = [None] * len(scenarios)
+            for indices in groups.values():
+                policy, kwargs = decodings[indices[0]]
+                tails = [self._format_scenario(scenarios[i]) + "Test Case:" for i in indices]
+                start = time.perf_counter()
+                with self._autocast(self.precision):
+                    texts = self.shared_generator.generate(context, tails, **kwargs)
+                seconds = (time.perf_counter() - start) / len(indices)
+                for i, text, tokens in zip(indices, texts, self.shared_generator.last_output_tokens):
+                    test_cases[i] = text
+                    self._record_decoding(scenarios[i], policy, tokens, seconds, kwargs)
+            return test_cases
+
+        test_cases = []
+        for scenario, (policy, kwargs) in zip(scenarios, decodings):
+            prompt = self._format_comprehensive_prompt(path, method_info, scenario)
+            start = time.perf_counter()
+            input_ids = self.tokenizer(prompt, return_tensors='pt').input_ids.to(self.device)
+            with self._autocast(self.precision):
+                generated_ids = self._generate(self.model, input_ids, self.draft_model, **kwargs)
+            test_cases.append(self.tokenizer.decode(generated_ids[0], skip_special_tokens=True, clean_up_tokenization_spaces=True))
+            seconds = time.perf_counter() - start
+            output_tokens = self._count_generated(self.tokenizer, generated_ids[:1])
+            self.stats.add(input_ids.numel(), self._count_generated(self.tokenizer, generated_ids), seconds, 1)
+            self._record_decoding(scenario, policy, output_tokens, seconds, kwargs)
+        return test_cases
 
     def generate_comprehensive_test_cases(self, swagger_file, output_file="data/processed/comprehensive_test_cases.json"):
         """Generate comprehensive test cases for all endpoints."""
@@ -254,24 +381,9 @@ class ComprehensiveTestGenerator:
                     
                     for scenario in all_scenarios:
                         print(f"  Generating test case for scenario: {scenario['type']}")
-                        
-                        prompt = self._format_comprehensive_prompt(path, method_info, scenario)
-                        
-                        input_ids = self.tokenizer(prompt, return_tensors='pt').input_ids.to(self.device)
-                        
-                        generated_ids = self.model.generate(
-                            input_ids,
-                            max_length=200,
-                            num_beams=5,
-                            repetition_penalty=2.5,
-                            length_penalty=1.0,
-                            early_stopping=True,
-                            num_return_sequences=1,
-                            no_repeat_ngram_size=2
-                        )
-                        
-                        test_case = self.tokenizer.decode(generated_ids[0], skip_special_tokens=True, clean_up_tokenization_spaces=True)
-                        
+                    generated = self._generate_scenario_test_cases(path, method_info, all_scenarios)
+
+                    for scenario, test_case in zip(all_scenarios, generated):
                         endpoint_test_cases.append({
                             'scenario_type': scenario['type'],
                             'description': scenario['description'],
@@ -310,6 +422,11 @@ class ComprehensiveTestGenerator:
         print(f"   • Total Endpoints: {total_endpoints}")
         print(f"   • Total Test Scenarios: {total_scenarios}")
         print(f"   • Average Scenarios per Endpoint: {avg_scenarios_per_endpoint:.1f}")
+        print(f"   • Generation ({self.prompt_mode} prompts, {self.decoding} decoding, {self.precision}): "
+              f"{self.stats.summary()}")
+        if self.decoding_policy is not None:
+            self.decoding_policy.save()
+            print(f"   • Decoding policy stats saved to {self.decoding_policy.stats_path}")
         
         return all_test_cases
 
@@ -319,10 +436,19 @@ def main():
                       help='Path to the Swagger specification file')
     parser.add_argument('--output', default='data/processed/comprehensive_test_cases.json',
                       help='Path to save the comprehensive test cases')
+    parser.add_argument('--prompt-mode', choices=PROMPT_MODES, default='full',
+                      help='"shared" encodes each endpoint\'s context once for all of its scenarios')
+    parser.add_argument('--decoding', choices=DECODING_MODES, default='fixed',
+                      help='"adaptive" picks greedy, beam or sampled decoding per scenario type')
+    parser.add_argument('--draft-model', nargs='?', const="src/data/models/checkpoints/latest_english_draft",
+                      help='Distilled draft checkpoint for assisted decoding (default path if given without a value)')
+    parser.add_argument('--precision', choices=PRECISIONS, default='fp32',
+                      help='bf16 generates under CPU autocast (weights stay fp32)')
     args = parser.parse_args()
 
     print("[START] Initializing Comprehensive Test Generator...")
-    generator = ComprehensiveTestGenerator()
+    generator = ComprehensiveTestGenerator(prompt_mode=args.prompt_mode, decoding=args.decoding,
+                                           draft_model_path=args.draft_model, precision=args.precision)
     
     print(f"[LOAD] Loading Swagger specification from {args.swagger}")
     
@@ -1,176 +1,331 @@
 import json
 import os
 import argparse
+import heapq
+import tempfile
 from collections import defaultdict
 
-def deduplicate_prioritized_tests(input_file="ai_model/data/prioritized_tests.json", 
+# Records sorted in memory at once before spilling a sorted run to disk
+SORT_RUN_SIZE = 100_000
+READ_CHUNK_SIZE = 1 << 16
+
+def iter_records(input_file, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield records from a JSON array or JSONL file without loading the whole file.
+
+    JSON arrays are decoded element by element from a bounded read buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(input_file, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        pos = len(buf) - len(buf.lstrip())
+        if not buf[pos:pos + 1] == '[':
+            # JSONL: one record per line
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        pos += 1
+        eof = False
+        while True:
+            # Skip whitespace and separators, refilling the buffer as needed
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                more = f.read(chunk_size)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+
+            if pos >= len(buf):
+                raise ValueError(f"Unterminated JSON array in {input_file}")
+            if buf[pos] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+                # A value ending exactly at the buffer edge may be truncated
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+
+            if not complete:
+                more = f.read(chunk_size)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+
+            yield record
+            pos = end
+            if pos > chunk_size:
+                buf, pos = buf[pos:], 0
+
+def _record_key(test):
+    return f"{test['method']}_{test['url']}"
+
+def _sort_key(entry):
+    """Descending risk, ties in order of each endpoint's first appearance in the input."""
+    first_seen, test = entry
+    return -test['risk_score'], first_seen
+
+def _sorted_by_risk(entries, top_k=None, run_size=None, tmp_dir=None):
+    """
+    Yield the records of (first_seen, record) entries by descending risk score using bounded memory.
+
+    With top_k only a k-sized heap is kept; otherwise entries are external-sorted
+    through sorted runs of at most run_size (default SORT_RUN_SIZE) entries.
+    """
+    run_size = run_size or SORT_RUN_SIZE
+    if top_k is not None:
+        for _, test in heapq.nsmallest(top_k, entries, key=_sort_key):
+            yield test
+        return
+
+    run_files = []
+    run = []
+    try:
+        for entry in entries:
+            run.append(entry)
+            if len(run) >= run_size:
+                run_files.append(_spill_run(run, tmp_dir))
+                run = []
+
+        run.sort(key=_sort_key)
+        if not run_files:
+            for _, test in run:
+                yield test
+            return
+        if run:
+            run_files.append(_spill_run(run, tmp_dir))
+
+        handles = [open(path, 'r', encoding='utf-8') for path in run_files]
+        try:
+            streams = [(json.loads(line) for line in handle) for handle in handles]
+            for _, test in heapq.merge(*streams, key=_sort_key):
+                yield test
+        finally:
+            for handle in handles:
+                handle.close()
+    finally:
+        for path in run_files:
+            os.remove(path)
+
+def _spill_run(run, tmp_dir):
+    """Write one sorted run as JSONL to a temp file and return its path."""
+    run.sort(key=_sort_key)
+    fd, path = tempfile.mkstemp(suffix='.jsonl', dir=tmp_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for entry in run:
+            f.write(json.dumps(entry) + '\n')
+    return path
+
+def _write_atomically(records, output_file):
+    """Stream records to a temp file next to output_file, then rename it into place."""
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    jsonl = output_file.endswith('.jsonl')
+    fd, tmp_path = tempfile.mkstemp(prefix='.dedup-', suffix='.tmp', dir=output_dir)
+    written = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if not jsonl:
+                f.write('[')
+            for record in records:
+                if jsonl:
+                    f.write(json.dumps(record) + '\n')
+                else:
+                    f.write(('\n  ' if written == 0 else ',\n  ') + json.dumps(record))
+                written += 1
+            if not jsonl:
+                f.write('\n]\n')
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return written
+
+def deduplicate_prioritized_tests(input_file="ai_model/data/prioritized_tests.json",
                                  output_file=None,
-                                 backup_original=True):
+                                 backup_original=True,
+                                 top_k=None):
     """
     Remove duplicates from prioritized tests and keep the highest risk score for each unique endpoint
-    
+
+    Streams the input (JSON array or JSONL) twice: once to build a compact
+    key -> (risk, position) map, and once to emit the winning records, which
+    are then ordered by risk with a bounded-memory top-k or external sort.
+
     Args:
         input_file (str): Path to the input prioritized tests file
         output_file (str): Path to save the deduplicated tests (defaults to input_file)
-        backup_original (bool): Whether to create a backup of the original file
+        backup_original (bool): Whether to keep the original file as <input_file>.backup
+        top_k (int): Only keep the k highest-risk unique tests
+
+    Returns:
+        dict with original/unique/written counts, or None on failure
     """
-    
+
     if not os.path.exists(input_file):
         print(f"❌ Input file not found: {input_file}")
         return None
-    
+
     # Set output file to input file if not specified
     if output_file is None:
         output_file = input_file
-    
+
     print(f"🔍 Deduplicating prioritized tests from: {input_file}")
-    
-    # Create backup if requested
-    if backup_original and input_file == output_file:
-        backup_file = f"{input_file}.backup"
-        try:
-            with open(input_file, 'r', encoding='utf-8') as src:
-                with open(backup_file, 'w', encoding='utf-8') as dst:
-                    dst.write(src.read())
-            print(f"💾 Backup created: {backup_file}")
-        except Exception as e:
-            print(f"⚠️  Failed to create backup: {e}")
-    
-    # Load the prioritized tests
+
+    # Pass 1: compact map of key -> [risk_score, position of best record, occurrences]
+    # (keys stay in order of first appearance)
+    best = {}
+    total = 0
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            tests = json.load(f)
-    except json.JSONDecodeError as e:
+        for position, test in enumerate(iter_records(input_file)):
+            key = _record_key(test)
+            entry = best.get(key)
+            if entry is None:
+                best[key] = [test['risk_score'], position, 1]
+            else:
+                entry[2] += 1
+                if test['risk_score'] > entry[0]:
+                    entry[0], entry[1] = test['risk_score'], position
+            total += 1
+    except (json.JSONDecodeError, ValueError) as e:
         print(f"❌ Invalid JSON in input file: {e}")
         return None
     except Exception as e:
         print(f"❌ Error reading input file: {e}")
         return None
-    
-    print(f"📊 Original prioritized tests: {len(tests)}")
-    
+
+    print(f"📊 Original prioritized tests: {total}")
+
     # Analyze duplicates before deduplication
-    endpoint_counts = defaultdict(int)
-    for test in tests:
-        key = f"{test['method']}_{test['url']}"
-        endpoint_counts[key] += 1
-    
-    duplicate_endpoints = {k: v for k, v in endpoint_counts.items() if v > 1}
+    duplicate_endpoints = {k: v[2] for k, v in best.items() if v[2] > 1}
     total_duplicates = sum(v - 1 for v in duplicate_endpoints.values())
-    
+
     print(f"🔍 Found {len(duplicate_endpoints)} endpoints with duplicates")
     print(f"📈 Total duplicate entries: {total_duplicates}")
-    
+
     # Show top 5 most duplicated endpoints
     if duplicate_endpoints:
         print("\n🔝 Top 5 most duplicated endpoints:")
-        sorted_duplicates = sorted(duplicate_endpoints.items(), key=lambda x: x[1], reverse=True)
-        for i, (endpoint, count) in enumerate(sorted_duplicates[:5], 1):
+        top_duplicates = heapq.nlargest(5, duplicate_endpoints.items(), key=lambda x: x[1])
+        for i, (endpoint, count) in enumerate(top_duplicates, 1):
             method, url = endpoint.split('_', 1)
             print(f"  {i}. {method} {url} ({count} occurrences)")
-    
-    # Create a dictionary to store unique endpoints with highest risk scores
-    unique_tests = {}
-    
-    for test in tests:
-        # Create a unique key based on method and URL
-        key = f"{test['method']}_{test['url']}"
-        
-        # Keep the test with the highest risk score
-        if key not in unique_tests or test['risk_score'] > unique_tests[key]['risk_score']:
-            unique_tests[key] = test
-    
-    # Convert back to list
-    deduplicated_tests = list(unique_tests.values())
-    
-    # Sort by risk score (highest first)
-    deduplicated_tests.sort(key=lambda x: x['risk_score'], reverse=True)
-    
+
     print(f"\n✅ Deduplication results:")
-    print(f"  - Original tests: {len(tests)}")
-    print(f"  - Deduplicated tests: {len(deduplicated_tests)}")
-    print(f"  - Duplicates removed: {len(tests) - len(deduplicated_tests)}")
-    print(f"  - Reduction: {((len(tests) - len(deduplicated_tests)) / len(tests) * 100):.1f}%")
-    
+    print(f"  - Original tests: {total}")
+    print(f"  - Deduplicated tests: {len(best)}")
+    print(f"  - Duplicates removed: {total - len(best)}")
+    if total:
+        print(f"  - Reduction: {((total - len(best)) / total * 100):.1f}%")
+
     # Show risk score distribution
-    if deduplicated_tests:
-        risk_scores = [test['risk_score'] for test in deduplicated_tests]
+    if best:
+        risk_scores = [entry[0] for entry in best.values()]
         print(f"\n📊 Risk score distribution:")
         print(f"  - Highest risk score: {max(risk_scores):.6f}")
         print(f"  - Lowest risk score: {min(risk_scores):.6f}")
         print(f"  - Average risk score: {sum(risk_scores) / len(risk_scores):.6f}")
-    
-    # Save the deduplicated tests
+
+    # Pass 2: emit only the winning record of each key, ordered by risk
+    winners = {entry[1]: first_seen for first_seen, entry in enumerate(best.values())}
+    del best
+    unique_entries = ((winners[position], test) for position, test in enumerate(iter_records(input_file))
+                      if position in winners)
+
+    # Keep the original as a hard link instead of copying it
+    if backup_original and os.path.abspath(input_file) == os.path.abspath(output_file):
+        backup_file = f"{input_file}.backup"
+        try:
+            if os.path.exists(backup_file):
+                os.remove(backup_file)
+            os.link(input_file, backup_file)
+            print(f"💾 Backup created: {backup_file}")
+        except OSError as e:
+            print(f"⚠️  Failed to create backup: {e}")
+
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(deduplicated_tests, f, indent=2)
+        written = _write_atomically(
+            _sorted_by_risk(unique_entries, top_k=top_k, tmp_dir=os.path.dirname(os.path.abspath(output_file))),
+            output_file
+        )
         print(f"💾 Deduplicated tests saved to: {output_file}")
     except Exception as e:
         print(f"❌ Error saving output file: {e}")
         return None
-    
-    return deduplicated_tests
 
-def analyze_test_distribution(tests):
+    return {"original": total, "unique": len(winners), "written": written}
+
+def analyze_test_distribution(tests_file):
     """Analyze the distribution of test methods and URL patterns"""
-    if not tests:
-        return
-    
-    print(f"\n📈 Test distribution analysis:")
-    
-    # Method distribution
     method_counts = defaultdict(int)
-    for test in tests:
-        method_counts[test['method']] += 1
-    
-    print(f"  HTTP Methods:")
-    for method, count in sorted(method_counts.items()):
-        percentage = (count / len(tests)) * 100
-        print(f"    {method}: {count} ({percentage:.1f}%)")
-    
-    # URL pattern analysis
     url_patterns = defaultdict(int)
-    for test in tests:
+    total = 0
+
+    for test in iter_records(tests_file):
+        total += 1
+        method_counts[test['method']] += 1
+
         # Extract base path (remove parameters)
         url = test['url']
         if '/v1.5/' in url:
             base_path = url.split('/v1.5/')[1].split('/')[0]
             url_patterns[base_path] += 1
-    
+
+    if not total:
+        return
+
+    print(f"\n📈 Test distribution analysis:")
+
+    print(f"  HTTP Methods:")
+    for method, count in sorted(method_counts.items()):
+        percentage = (count / total) * 100
+        print(f"    {method}: {count} ({percentage:.1f}%)")
+
     print(f"  Top URL patterns:")
     sorted_patterns = sorted(url_patterns.items(), key=lambda x: x[1], reverse=True)
     for pattern, count in sorted_patterns[:10]:
-        percentage = (count / len(tests)) * 100
+        percentage = (count / total) * 100
         print(f"    {pattern}: {count} ({percentage:.1f}%)")
 
 def main():
     parser = argparse.ArgumentParser(description='Deduplicate prioritized test cases')
-    parser.add_argument('--input', '-i', 
+    parser.add_argument('--input', '-i',
                        default='ai_model/data/prioritized_tests.json',
-                       help='Input file path (default: ai_model/data/prioritized_tests.json)')
+                       help='Input file path, JSON array or JSONL (default: ai_model/data/prioritized_tests.json)')
     parser.add_argument('--output', '-o',
                        help='Output file path (default: overwrite input file)')
     parser.add_argument('--no-backup', action='store_true',
-                       help='Do not create backup of original file')
+                       help='Do not keep the original file as <input>.backup')
+    parser.add_argument('--top-k', type=int,
+                       help='Only keep the K highest-risk unique tests')
     parser.add_argument('--analyze', '-a', action='store_true',
                        help='Analyze test distribution after deduplication')
-    
+
     args = parser.parse_args()
-    
+
     print("🚀 Prioritized Tests Deduplication Tool")
     print("=" * 50)
-    
+
     # Run deduplication
-    deduplicated_tests = deduplicate_prioritized_tests(
+    result = deduplicate_prioritized_tests(
         input_file=args.input,
         output_file=args.output,
-        backup_original=not args.no_backup
+        backup_original=not args.no_backup,
+        top_k=args.top_k
     )
-    
-    if deduplicated_tests and args.analyze:
-        analyze_test_distribution(deduplicated_tests)
-    
+
+    if result and args.analyze:
+        analyze_test_distribution(args.output or args.input)
+
     print(f"\n🎉 Deduplication complete!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,6 +1,7 @@
 import json
 import os
-from transformers import T5ForConditionalGeneration, RobertaTokenizer
+from transformers import T5ForConditionalGeneration
+from ai_model.tokenizer_provider import get_tokenizer
 import torch
 
 class EnglishToPythonTestGenerator:
@@ -10,7 +11,7 @@ class EnglishToPythonTestGenerator:
         
         # Load the fine-tuned model
         print("Loading fine-tuned CodeT5 model...")
-        self.tokenizer = RobertaTokenizer.from_pretrained(model_path)
+        self.tokenizer = get_tokenizer(model_path)
         self.model = T5ForConditionalGeneration.from_pretrained(model_path)
         self.model.to(self.device)
         self.model.eval()
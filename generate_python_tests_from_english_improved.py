@@ -1,20 +1,60 @@
+import argparse
 import json
 import os
 import re
-from transformers import T5ForConditionalGeneration, RobertaTokenizer
+import time
+from transformers import T5ForConditionalGeneration
+from ai_model.decoding_policy import DecodingPolicy
+from ai_model.draft_model import DEFAULT_DRAFT_PATH, generate, load_draft_model
+from ai_model.precision import PRECISIONS, autocast, check_precision
+from ai_model.shared_context import SharedContextGenerator, count_generated
+from ai_model.tokenizer_provider import get_tokenizer
 import torch
 
+# "full": original prompt with the example block; "compact": the example block reduced to
+# one instruction; "shared": compact, with each endpoint's context encoded once
+PROMPT_MODES = ("full", "compact", "shared")
+# "fixed": GENERATION_KWARGS for every test; "adaptive": decoding picked by ai_model/decoding_policy.py
+DECODING_MODES = ("fixed", "adaptive")
+# Scenario type the decoding policy records these generations under
+SCENARIO_TYPE = "python_test"
+
+GENERATION_KWARGS = dict(
+    max_length=512,
+    num_beams=5,  # Increased for better quality
+    early_stopping=True,
+    temperature=0.8,
+    do_sample=True,
+    top_k=50,
+    top_p=0.95,
+    repetition_penalty=1.2
+)
+
 class ImprovedEnglishToPythonTestGenerator:
-    def __init__(self, model_path="src/data/models/checkpoints/latest_english_generator"):
+    def __init__(self, model_path="src/data/models/checkpoints/latest_english_generator", prompt_mode="full",
+                 decoding="fixed", draft_model_path=None, precision="fp32"):
+        if prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"prompt_mode must be one of {PROMPT_MODES}, got {prompt_mode!r}")
+        if decoding not in DECODING_MODES:
+            raise ValueError(f"decoding must be one of {DECODING_MODES}, got {decoding!r}")
+        self.prompt_mode = prompt_mode
+        self.decoding = decoding
+        check_precision(precision)
+        self.precision = precision
+        self.decoding_policy = DecodingPolicy.load() if decoding == "adaptive" else None
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {self.device}")
         
         # Load the fine-tuned model
         print("Loading fine-tuned CodeT5 model...")
-        self.tokenizer = RobertaTokenizer.from_pretrained(model_path)
+        self.tokenizer = get_tokenizer(model_path)
         self.model = T5ForConditionalGeneration.from_pretrained(model_path)
         self.model.to(self.device)
         self.model.eval()
+        self.shared_generator = SharedContextGenerator(self.model, self.tokenizer, self.device)
+        self.stats = self.shared_generator.stats
+        # Assists single-beam generations in full/compact modes
+        self.draft_model = load_draft_model(draft_model_path, self.device, self.model) if draft_model_path else None
     
     def extract_http_method_and_path(self, endpoint):
         """Extract HTTP method and path from endpoint string"""
@@ -95,12 +135,59 @@ Generate the Python test code:"""
         
         return prompt
     
+    def create_compact_context(self, endpoint, operation_id):
+        """Compact prompt header shared by every test case of an endpoint"""
+        http_method, path = self.extract_http_method_and_path(endpoint)
+        test_data = self.generate_test_data_for_endpoint(endpoint, operation_id)
+        fixtures = "base_url, headers, test_data" if test_data else "base_url, headers"
+        body = ", json=test_data" if test_data else ""
+        
+        # The example block is reduced to one instruction, and the test case is not repeated in it
+        return f"""Generate Python test code for the following API endpoint.
+
+Endpoint: {http_method} {path}
+Operation ID: {operation_id}
+Test Data: {json.dumps(test_data, separators=(",", ":"))}
+
+Write one pytest function test_<name>({fixtures}) that calls requests.{http_method.lower()}(f"{{base_url}}{path}", headers=headers{body}), asserts 200/201/204 for success cases and 400/401/404/500 for error or failure cases, and prints the status code.
+
+"""
+    
+    def create_compact_task(self, english_test_case):
+        """Test-case-specific end of a compact prompt"""
+        return f"Test Case: {english_test_case}\n\nGenerate the Python test code:"
+    
+    def _strip_prompt(self, prompt, generated_text):
+        # Extract only the generated part (after the prompt)
+        if prompt in generated_text:
+            return generated_text[len(prompt):].strip()
+        return generated_text.strip()
+    
+    def _decoding_for(self, endpoint, operation_id):
+        """(policy name, generate() kwargs) for the tests of an endpoint"""
+        if self.decoding_policy is None:
+            return "fixed", GENERATION_KWARGS
+        complexity = len(self.generate_test_data_for_endpoint(endpoint, operation_id))
+        return self.decoding_policy.choose(SCENARIO_TYPE, complexity, GENERATION_KWARGS)
+    
+    def _record_decoding(self, policy, output_tokens, seconds, kwargs):
+        if self.decoding_policy is not None:
+            self.decoding_policy.record(SCENARIO_TYPE, policy, output_tokens, seconds,
+                                        max_length=kwargs.get("max_length"))
+    
     def generate_python_test(self, endpoint, operation_id, english_test_case):
         """Generate Python test code from English description with improved prompting"""
+        if self.prompt_mode == "shared":
+            return self.generate_python_tests(endpoint, operation_id, [english_test_case])[0]
         
         # Create improved prompt
-        prompt = self.create_improved_prompt(endpoint, operation_id, english_test_case)
+        if self.prompt_mode == "compact":
+            prompt = self.create_compact_context(endpoint, operation_id) + self.create_compact_task(english_test_case)
+        else:
+            prompt = self.create_improved_prompt(endpoint, operation_id, english_test_case)
         
+        policy, decoding_kwargs = self._decoding_for(endpoint, operation_id)
+        start = time.perf_counter()
         # Tokenize input
         inputs = self.tokenizer(
             prompt,
@@ -111,31 +198,41 @@ Generate the Python test code:"""
         ).to(self.device)
         
         # Generate output with better parameters
-        with torch.no_grad():
-            outputs = self.model.generate(
+        with torch.no_grad(), autocast(self.precision):
+            outputs = generate(
+                self.model,
                 inputs["input_ids"],
-                max_length=512,
-                num_beams=5,  # Increased for better quality
-                early_stopping=True,
-                temperature=0.8,
-                do_sample=True,
-                top_k=50,
-                top_p=0.95,
-                repetition_penalty=1.2,
+                self.draft_model,
                 pad_token_id=self.tokenizer.pad_token_id,
-                eos_token_id=self.tokenizer.eos_token_id
+                eos_token_id=self.tokenizer.eos_token_id,
+                **decoding_kwargs
             )
         
         # Decode output
         generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        seconds = time.perf_counter() - start
+        self.stats.add(inputs["input_ids"].numel(), count_generated(self.tokenizer, outputs), seconds, 1)
+        self._record_decoding(policy, count_generated(self.tokenizer, outputs[:1]), seconds, decoding_kwargs)
         
-        # Extract only the generated part (after the prompt)
-        if prompt in generated_text:
-            generated_part = generated_text[len(prompt):].strip()
-        else:
-            generated_part = generated_text.strip()
-        
-        return generated_part
+        return self._strip_prompt(prompt, generated_text)
+    
+    def generate_python_tests(self, endpoint, operation_id, english_test_cases):
+        """Generate Python test code for all test cases of an endpoint, encoding its context once"""
+        context = self.create_compact_context(endpoint, operation_id)
+        tasks = [self.create_compact_task(test_case) for test_case in english_test_cases]
+        policy, decoding_kwargs = self._decoding_for(endpoint, operation_id)
+        start = time.perf_counter()
+        with autocast(self.precision):
+            generated = self.shared_generator.generate(
+                context, tasks,
+                pad_token_id=self.tokenizer.pad_token_id,
+                eos_token_id=self.tokenizer.eos_token_id,
+                **decoding_kwargs
+            )
+        seconds = (time.perf_counter() - start) / max(len(tasks), 1)
+        for output_tokens in self.shared_generator.last_output_tokens:
+            self._record_decoding(policy, output_tokens, seconds, decoding_kwargs)
+        return [self._strip_prompt(context + task, text) for task, text in zip(tasks, generated)]
     
     def create_fallback_test(self, endpoint, operation_id, english_test_case, test_index):
         """Create a fallback test when AI generation fails"""
@@ -235,12 +332,26 @@ Generate the Python test code:"""
             test_code.append("    return " + json.dumps(test_data, indent=4))
             test_code.append("")
         
+        # In shared mode all test cases of the endpoint are generated in one batch
+        batch_codes = None
+        if self.prompt_mode == "shared":
+            try:
+                batch_codes = self.generate_python_tests(endpoint, operation_id, test_cases)
+            except Exception as e:
+                print(f"  ❌ Error generating tests for {endpoint}: {e}")
+                batch_codes = [None] * len(test_cases)
+        
         # Generate individual test functions
         for i, test_case in enumerate(test_cases, 1):
             print(f"Generating Python test {i} for: {test_case[:50]}...")
             
             try:
-                python_code = self.generate_python_test(endpoint, operation_id, test_case)
+                if batch_codes is not None:
+                    python_code = batch_codes[i - 1]
+                    if python_code is None:
+                        raise RuntimeError("batch generation failed")
+                else:
+                    python_code = self.generate_python_test(endpoint, operation_id, test_case)
                 
                 # Clean up the generated code
                 python_code = python_code.strip()
@@ -305,14 +416,31 @@ Generate the Python test code:"""
             generated_files.append(filepath)
         
         print(f"\n🎉 Successfully generated {len(generated_files)} improved Python test files!")
+        print(f"📊 Generation ({self.prompt_mode} prompts, {self.decoding} decoding, {self.precision}): {self.stats.summary()}")
+        if self.decoding_policy is not None:
+            self.decoding_policy.save()
+            print(f"📊 Decoding policy stats saved to {self.decoding_policy.stats_path}")
         return generated_files
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate Python tests from English test cases")
+    parser.add_argument("--prompt-mode", choices=PROMPT_MODES, default="full",
+                        help="compact drops the repeated example block; shared also encodes each endpoint's context once")
+    parser.add_argument("--decoding", choices=DECODING_MODES, default="fixed",
+                        help="adaptive picks greedy, beam or sampled decoding and a tighter max_length from past outputs")
+    parser.add_argument("--draft-model", nargs="?", const=DEFAULT_DRAFT_PATH,
+                        help="distilled draft checkpoint for assisted decoding of greedy/sampled generations")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32",
+                        help="bf16 generates under CPU autocast (weights stay fp32)")
+    args = parser.parse_args()
+
     print("🚀 Starting Improved English to Python Test Generation")
     print("=" * 60)
     
     # Initialize generator
-    generator = ImprovedEnglishToPythonTestGenerator()
+    generator = ImprovedEnglishToPythonTestGenerator(prompt_mode=args.prompt_mode, decoding=args.decoding,
+                                                     draft_model_path=args.draft_model,
+                                                     precision=args.precision)
     
     # Generate all tests
     generated_files = generator.generate_all_tests()
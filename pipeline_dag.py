@@ -0,0 +1,418 @@
+"""
+In-process DAG runner for the test coverage pipelines.
+
+Steps declare their dependencies and the typed artifacts they produce. A step
+is either a Python callable that runs in this process and receives the
+artifacts published so far (so in-memory results such as generated test cases
+do not need to be re-read from JSON), or a command that runs in a subprocess
+(used for torch-heavy steps that should release their memory when done).
+
+Steps whose dependencies have finished run in parallel on a thread pool. After
+the run a table of per-step wall-clock time and peak RSS is printed.
+
+Steps that declare input and output files are skipped when a run manifest shows
+that their last successful run saw the same input contents and the same code
+fingerprint, and their outputs are still as that run left them. The code
+fingerprint covers the step's scripts and every local module they import,
+directly or transitively (including imports inside functions). A skipped step
+publishes no artifacts, so dependents must fall back to reading its output
+files when an artifact is missing.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is reported as unknown
+    resource = None
+
+
+def _self_peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _is_instance(value, expected_type):
+    """isinstance() that also accepts a class name, so steps need not import heavy libraries."""
+    if isinstance(expected_type, str):
+        return any(cls.__name__ == expected_type for cls in type(value).__mro__)
+    return isinstance(value, expected_type)
+
+
+def _module_files(module, search_dirs):
+    """Local files that importing `module` executes: package __init__s and the module itself."""
+    parts = module.split(".")
+    for base in search_dirs:
+        files = []
+        for i in range(1, len(parts) + 1):
+            path = os.path.join(base, *parts[:i])
+            if os.path.isfile(path + ".py"):
+                files.append(path + ".py")
+                break
+            if os.path.isfile(os.path.join(path, "__init__.py")):
+                files.append(os.path.join(path, "__init__.py"))
+            else:
+                files = []
+                break
+        if files:
+            return files
+    return []
+
+
+def _imported_names(tree, package_dir):
+    """(module, search dirs override) for each import in a parsed file, including relative ones."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name, None
+        elif isinstance(node, ast.ImportFrom):
+            base = None
+            if node.level:
+                base = package_dir
+                for _ in range(node.level - 1):
+                    base = os.path.dirname(base)
+            if node.module:
+                yield node.module, base
+            # `from package import module` imports a submodule
+            for alias in node.names:
+                yield f"{node.module}.{alias.name}" if node.module else alias.name, base
+
+
+def local_imports(paths, root="."):
+    """
+    The given source files plus every file under root they import, transitively.
+
+    Modules are resolved against the importing file's directory and root (the
+    scripts add the repository root to sys.path); anything that does not
+    resolve to a file under root is third-party or stdlib and ignored.
+    """
+    root = os.path.abspath(root)
+    seen = set()
+    pending = [os.path.abspath(p) for p in paths if p.endswith(".py") and os.path.isfile(p)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            with open(path, "rb") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        directory = os.path.dirname(path)
+        for module, base in _imported_names(tree, directory):
+            for found in _module_files(module, [base] if base else [directory, root]):
+                found = os.path.abspath(found)
+                if found not in seen and os.path.commonpath([found, root]) == root:
+                    pending.append(found)
+    return sorted(os.path.relpath(p, root) for p in seen)
+
+
+class Step:
+    def __init__(self, name, func=None, command=None, deps=(), produces=None,
+                 fallback_command=None, description=None, inputs=(), outputs=(), code=(),
+                 requires_deps=False):
+        """
+        Args:
+            name: Unique step name
+            func: Callable(artifacts) -> dict of artifacts, run in-process
+            command: Subprocess argv, used instead of func
+            deps: Names of steps that must finish first
+            produces: {artifact_name: type or class name} published by func
+            fallback_command: Subprocess argv to try if the step fails
+            description: Human readable description for logs
+            inputs: Files/directories the step reads
+            outputs: Files/directories the step writes; steps without outputs always run
+            code: Extra source files/directories that make up the step's code fingerprint
+                (local modules imported by these, the command scripts and func are added automatically)
+            requires_deps: Do not run (status "blocked") if a dependency failed
+        """
+        if (func is None) == (command is None):
+            raise ValueError(f"Step {name!r} needs exactly one of func or command")
+        self.name = name
+        self.func = func
+        self.command = command
+        self.deps = list(deps)
+        self.produces = produces or {}
+        self.fallback_command = fallback_command
+        self.description = description or name
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.requires_deps = requires_deps
+
+    def code_paths(self):
+        """Source files whose contents fingerprint this step."""
+        paths = list(self.code)
+        scripts = [p for p in self.code if os.path.isfile(p)]
+        if self.func is not None:
+            source = inspect.getsourcefile(self.func)
+            if source:
+                paths.append(os.path.relpath(source))
+                # Only what the function itself imports, not every step's imports in its file
+                try:
+                    tree = ast.parse(inspect.getsource(self.func).strip())
+                except (OSError, SyntaxError):
+                    tree = None
+                if tree is not None:
+                    directory = os.path.dirname(os.path.abspath(source))
+                    for module, base in _imported_names(tree, directory):
+                        scripts.extend(_module_files(module, [base] if base else [directory, "."]))
+        for command in (self.command, self.fallback_command):
+            scripts.extend(arg for arg in command or [] if arg.endswith(".py") and os.path.exists(arg))
+        paths.extend(p for p in local_imports(scripts) if p not in paths)
+        return paths
+
+
+class StepResult:
+    def __init__(self, name, status, seconds=0.0, peak_rss_mb=None, rss_scope="", error=None):
+        self.name = name
+        self.status = status
+        self.seconds = seconds
+        self.peak_rss_mb = peak_rss_mb
+        self.rss_scope = rss_scope
+        self.error = error
+
+
+def run_subprocess(command):
+    """
+    Run a command, returning (returncode, stdout, stderr, peak_rss_mb).
+
+    On POSIX the child's own peak RSS comes from wait4().
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        process = subprocess.Popen(command, stdout=out, stderr=err)
+        peak_rss_mb = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            process.wait()
+        out.seek(0)
+        err.seek(0)
+        return (process.returncode, out.read().decode(errors="replace"),
+                err.read().decode(errors="replace"), peak_rss_mb)
+
+
+class FileHasher:
+    """Content hashes of files and directories, reusing hashes when mtime and size are unchanged."""
+
+    def __init__(self, cache=None):
+        self.cache = cache or {}
+
+    def _file(self, path):
+        stat = os.stat(path)
+        cached = self.cache.get(path)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return cached["sha256"]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.cache[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def hash(self, path):
+        """sha256 of a file, of a directory's files (names + contents), or 'missing'."""
+        if os.path.isfile(path):
+            return self._file(path)
+        if not os.path.isdir(path):
+            return "missing"
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(self._file(file_path).encode())
+        return digest.hexdigest()
+
+    def hash_all(self, paths):
+        return {path: self.hash(path) for path in paths}
+
+
+class PipelineDAG:
+    def __init__(self, name="pipeline", manifest_path=None, force=False):
+        """
+        Args:
+            name: Name used in logs and the report
+            manifest_path: JSON run manifest used to skip unchanged steps (None disables skipping)
+            force: Run every step even if the manifest says it is up to date
+        """
+        self.name = name
+        self.steps = {}
+        self.artifacts = {}
+        self.results = {}
+        self.manifest_path = manifest_path
+        self.force = force
+        self.manifest = {"steps": {}, "file_hashes": {}}
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                self.manifest = json.load(f)
+        self.hasher = FileHasher(self.manifest.get("file_hashes"))
+
+    def add(self, step):
+        if step.name in self.steps:
+            raise ValueError(f"Duplicate step name: {step.name}")
+        self.steps[step.name] = step
+        return step
+
+    def _validate(self):
+        for step in self.steps.values():
+            for dep in step.deps:
+                if dep not in self.steps:
+                    raise ValueError(f"Step {step.name!r} depends on unknown step {dep!r}")
+        # Kahn's algorithm to reject cycles up front
+        remaining = {name: set(step.deps) for name, step in self.steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between steps: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _fingerprint(self, step):
+        return {
+            "inputs": self.hasher.hash_all(step.inputs),
+            "code": hashlib.sha256(json.dumps(self.hasher.hash_all(step.code_paths()),
+                                              sort_keys=True).encode()).hexdigest(),
+        }
+
+    def _up_to_date(self, step, fingerprint):
+        """Whether the last successful run of step saw the same inputs/code and left these outputs."""
+        if self.force or not self.manifest_path or not step.outputs:
+            return False
+        recorded = self.manifest["steps"].get(step.name)
+        if not recorded:
+            return False
+        return (recorded["inputs"] == fingerprint["inputs"]
+                and recorded["code"] == fingerprint["code"]
+                and recorded["outputs"] == self.hasher.hash_all(step.outputs)
+                and "missing" not in recorded["outputs"].values())
+
+    def _record(self, step, fingerprint):
+        self.manifest["steps"][step.name] = dict(
+            fingerprint,
+            outputs=self.hasher.hash_all(step.outputs),
+            finished_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
+
+    def _save_manifest(self):
+        if not self.manifest_path:
+            return
+        self.manifest["file_hashes"] = self.hasher.cache
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _execute(self, step):
+        """Run one step; never raises, failures are reported in the StepResult."""
+        if step.requires_deps:
+            failed = [d for d in step.deps if self.results[d].status in ("failed", "blocked")]
+            if failed:
+                print(f"[SKIP] {step.name}: dependencies failed ({', '.join(failed)})", flush=True)
+                return StepResult(step.name, "blocked", error=f"dependencies failed: {failed}")
+
+        fingerprint = self._fingerprint(step) if self.manifest_path else None
+        if fingerprint and self._up_to_date(step, fingerprint):
+            print(f"[SKIP] {step.name}: inputs and code unchanged since last successful run", flush=True)
+            return StepResult(step.name, "skipped")
+
+        print(f"[RUN] {step.name}: {step.description}...", flush=True)
+        start = time.perf_counter()
+        try:
+            if step.func is not None:
+                published = step.func(self.artifacts) or {}
+                for artifact, expected_type in step.produces.items():
+                    value = published.get(artifact)
+                    if value is not None and not _is_instance(value, expected_type):
+                        raise TypeError(f"{step.name} produced {artifact} as {type(value).__name__}, "
+                                        f"expected {getattr(expected_type, '__name__', expected_type)}")
+                self.artifacts.update(published)
+                result = StepResult(step.name, "ok", rss_scope="process")
+                result.peak_rss_mb = _self_peak_rss_mb()
+            else:
+                returncode, _, stderr, peak = run_subprocess(step.command)
+                if returncode != 0:
+                    raise RuntimeError(f"exit code {returncode}: {stderr.strip()[-2000:]}")
+                result = StepResult(step.name, "ok", peak_rss_mb=peak, rss_scope="child")
+        except (Exception, SystemExit) as e:
+            result = StepResult(step.name, "failed", error=str(e) or type(e).__name__)
+            if step.fallback_command:
+                print(f"WARNING: {step.name} failed ({e}), trying fallback...")
+                returncode, _, stderr, peak = run_subprocess(step.fallback_command)
+                if returncode == 0:
+                    result = StepResult(step.name, "fallback", peak_rss_mb=peak, rss_scope="child")
+                else:
+                    result.error += f"; fallback exit code {returncode}: {stderr.strip()[-2000:]}"
+
+        result.seconds = time.perf_counter() - start
+        if fingerprint and result.status != "failed" and step.outputs:
+            self._record(step, fingerprint)
+        if result.status == "failed":
+            print(f"ERROR: {step.name} failed after {result.seconds:.1f}s: {result.error}", flush=True)
+        else:
+            print(f"SUCCESS: {step.name} completed in {result.seconds:.1f}s", flush=True)
+        return result
+
+    def run(self, max_workers=4):
+        """
+        Run all steps, each as soon as its dependencies have finished.
+
+        A failed step does not stop its dependents: they run against whatever
+        artifacts (or files from earlier runs) are available, as the sequential
+        pipeline always did.
+        """
+        self._validate()
+        pending = dict(self.steps)
+        running = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                ready = [s for s in pending.values() if all(d in self.results for d in s.deps)]
+                for step in ready:
+                    del pending[step.name]
+                    running[pool.submit(self._execute, step)] = step.name
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.results[name] = future.result()
+
+        self.total_seconds = time.perf_counter() - start
+        self._save_manifest()
+        return self.results
+
+    def print_report(self):
+        """Print per-step wall-clock time and peak RSS."""
+        print(f"\n[STATS] {self.name} step timings:")
+        print(f"  {'step':<28} {'status':<9} {'wall (s)':>9} {'peak RSS (MB)':>14}  scope")
+        print("  " + "-" * 72)
+        for name in self.steps:
+            result = self.results.get(name)
+            if result is None:
+                continue
+            rss = f"{result.peak_rss_mb:.0f}" if result.peak_rss_mb is not None else "n/a"
+            print(f"  {name:<28} {result.status:<9} {result.seconds:>9.1f} {rss:>14}  {result.rss_scope}")
+        serial = sum(r.seconds for r in self.results.values())
+        print(f"  Total wall-clock: {self.total_seconds:.1f}s (sum of steps {serial:.1f}s)")
+        print("  Peak RSS scope: 'child' is the step's own process, "
+              "'process' is this process' high-water mark after the step")
@@ -0,0 +1,274 @@
+"""
+Streaming parser for Postman collections and run exports.
+
+Collections, Postman test-run exports and Newman JSON reports used to be
+`json.load`ed whole and walked recursively. These generators read the file
+incrementally with ijson, so memory stays bounded by one request (plus the
+folders above it) no matter how large the export is:
+
+    for folders, item in iter_collection_items(path):    # every request item
+        ...
+    for result in iter_run_results(path):                # every executed request
+        ...
+
+iter_run_results reads both Postman app test-run exports (`results`) and
+Newman JSON reporter output (`run.executions`) and yields the same record for
+each: id, name, method, url, status_code, latency_ms and assertions.
+run_info gives the run's ID and start time.
+
+Usage:
+    python postman_stream.py requests "data/raw/rGuest Pay Agent.postman_collection 1.json"
+    python postman_stream.py results "src/data/processed/rGuest Pay Agent.postman_test_run.json"
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+
+import ijson
+
+
+def iter_collection_items(path):
+    """
+    Yield (folders, item) for every request item of a collection, in collection order.
+
+    folders lists the names of the enclosing folders. Folder contents are never
+    kept in memory, except when a folder's "name" comes after its "item" array:
+    its requests are then held back until the folder closes and its name is known.
+    """
+    with open(path, "rb") as f:
+        # One frame per open folder/request: [prefix, builder, is_folder, child array prefix, held back];
+        # the collection itself is the bottom frame and is not built
+        stack = [["", None, True, "item", []]]
+        frame = stack[-1]
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            children = frame[3]
+            if prefix.startswith(children) and (len(prefix) == len(children) or prefix[len(children)] == "."):
+                if event == "start_map" and prefix == children + ".item":
+                    frame = [prefix, ijson.ObjectBuilder(), False, prefix + ".item", []]
+                    frame[1].event(event, value)
+                    stack.append(frame)
+                else:
+                    # The child array itself; its elements are handled above
+                    frame[2] = True
+                continue
+            builder = frame[1]
+            if builder is None or (event == "map_key" and value == "item" and prefix == frame[0]):
+                continue
+
+            builder.event(event, value)
+            if event != "end_map" or prefix != frame[0]:
+                continue
+
+            closed = stack.pop()
+            frame = stack[-1]
+            if closed[2]:
+                # A folder: its name is known now, so requests held back for it can go out
+                for folders, item in closed[4]:
+                    yield [f[1].value.get("name", "") for f in folders], item
+                continue
+
+            folders = stack[1:]
+            # Hold the request back in the outermost folder that has no name yet (or is already
+            # holding requests back, to keep collection order)
+            holder = next((f for f in folders if f[4] or "name" not in f[1].value), None)
+            if holder is not None:
+                holder[4].append((list(folders), builder.value))
+            else:
+                yield [f[1].value.get("name", "") for f in folders], builder.value
+
+
+def test_scripts(item):
+    """Non-empty `test` event scripts of a request item."""
+    scripts = []
+    for event in item.get("event", []):
+        if event.get("listen") == "test":
+            script = "\n".join(event.get("script", {}).get("exec", []))
+            if script.strip():
+                scripts.append(script)
+    return scripts
+
+
+def url_string(url):
+    """Raw URL of a Postman URL (a string, or an object with raw or host/path parts)."""
+    if not isinstance(url, dict):
+        return url or ""
+    if url.get("raw"):
+        return url["raw"]
+    host = url.get("host", "")
+    host = ".".join(host) if isinstance(host, list) else host
+    if url.get("port"):
+        host += f":{url['port']}"
+    path = url.get("path", "")
+    path = "/".join(path) if isinstance(path, list) else path
+    raw = f"{url['protocol']}://{host}" if url.get("protocol") else host
+    if path:
+        raw += "/" + path.lstrip("/")
+    query = [q for q in url.get("query", []) if not q.get("disabled")]
+    if query:
+        raw += "?" + "&".join(f"{q.get('key', '')}={q.get('value') or ''}" for q in query)
+    return raw
+
+
+# Top-level key that identifies each export format
+FORMAT_KEYS = {"run": "newman", "results": "postman"}
+
+
+def run_format(path):
+    """'newman' for Newman JSON reports, 'postman' for Postman app test-run exports, else None."""
+    with open(path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == "" and event == "map_key" and value in FORMAT_KEYS:
+                return FORMAT_KEYS[value]
+    return None
+
+
+# Run-level fields of each export format: key -> ijson prefix
+RUN_FIELDS = {
+    "postman": {"run_id": "id", "name": "name", "started_at": "startedAt"},
+    "newman": {"collection_id": "collection.info._postman_id", "name": "collection.info.name",
+               "started_at": "run.timings.started"},
+}
+
+SCALAR_EVENTS = {"string", "number", "boolean", "null"}
+
+
+def _scan_run(path):
+    """(format, run-level fields) of a run export in one pass, stopping as soon as both are known."""
+    prefixes = {prefix for fields in RUN_FIELDS.values() for prefix in fields.values()}
+    fmt, found = None, {}
+    with open(path, "rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == "" and event == "map_key" and fmt is None and value in FORMAT_KEYS:
+                fmt = FORMAT_KEYS[value]
+            elif prefix in prefixes and event in SCALAR_EVENTS and prefix not in found:
+                found[prefix] = value
+            else:
+                continue
+            if fmt is not None and all(p in found for p in RUN_FIELDS[fmt].values()):
+                break
+    if fmt is None:
+        return None, {}
+    return fmt, {key: found.get(prefix) for key, prefix in RUN_FIELDS[fmt].items()}
+
+
+def run_info(path):
+    """
+    Format, run ID, name and start time (naive local datetime) of a run export.
+
+    Newman reports have no run ID, so it is the collection ID plus the start
+    time; exports without either are identified by a hash of their content.
+    """
+    fmt, fields = _scan_run(path)
+    if fmt is None:
+        raise ValueError(f"{path} is not a Postman test-run export or Newman JSON report")
+    info = {"format": fmt, **fields}
+
+    started_at = info["started_at"]
+    if isinstance(started_at, (int, float)) and not isinstance(started_at, bool):
+        started_at = datetime.fromtimestamp(started_at / 1000, tz=timezone.utc)
+    elif isinstance(started_at, str):
+        started_at = datetime.fromisoformat(started_at.replace("Z", "+00:00"))
+    else:
+        started_at = None
+    if started_at is not None and started_at.tzinfo is not None:
+        started_at = started_at.astimezone().replace(tzinfo=None)
+    info["started_at"] = started_at
+
+    if fmt == "newman":
+        collection_id = info.pop("collection_id")
+        if collection_id and started_at:
+            info["run_id"] = f"{collection_id}@{started_at.isoformat()}"
+        else:
+            info["run_id"] = None
+    if not info["run_id"]:
+        info["run_id"] = "sha256:" + _file_sha256(path)
+    return info
+
+
+def _file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def iter_run_results(path, fmt=None):
+    """
+    Yield one normalized record per executed request of a Postman or Newman run export.
+
+    fmt is the export's format if already known (run_info's "format"); otherwise it is detected.
+    """
+    fmt = fmt or run_format(path)
+    if fmt == "newman":
+        with open(path, "rb") as f:
+            for execution in ijson.items(f, "run.executions.item", use_float=True):
+                yield _newman_result(execution)
+    elif fmt == "postman":
+        # Methods are only listed in the collection summary, which follows the results
+        with open(path, "rb") as f:
+            methods = {r.get("id"): r.get("method") for r in ijson.items(f, "collection.requests.item")}
+        with open(path, "rb") as f:
+            for result in ijson.items(f, "results.item", use_float=True):
+                yield _postman_result(result, methods)
+    else:
+        raise ValueError(f"{path} is not a Postman test-run export or Newman JSON report")
+
+
+def _postman_result(result, methods):
+    return {
+        "id": result.get("id"),
+        "name": result.get("name", ""),
+        "method": methods.get(result.get("id")),
+        "url": result.get("url", ""),
+        "status_code": (result.get("responseCode") or {}).get("code"),
+        "latency_ms": result.get("time"),
+        "assertions": [{"name": name, "passed": bool(passed)} for name, passed in (result.get("tests") or {}).items()],
+    }
+
+
+def _newman_result(execution):
+    item = execution.get("item", {})
+    request = execution.get("request") or item.get("request") or {}
+    response = execution.get("response") or {}
+    return {
+        "id": item.get("id"),
+        "name": item.get("name", ""),
+        "method": request.get("method"),
+        "url": url_string(request.get("url")),
+        "status_code": response.get("code"),
+        "latency_ms": response.get("responseTime"),
+        "assertions": [
+            {"name": a.get("assertion", ""), "passed": not a.get("error")}
+            for a in execution.get("assertions", []) if not a.get("skipped")
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream requests or run results out of a Postman export as JSONL")
+    parser.add_argument("command", choices=["requests", "results"])
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "requests":
+        for folders, item in iter_collection_items(args.path):
+            request = item.get("request", {})
+            print(json.dumps({
+                "folders": folders,
+                "name": item.get("name", ""),
+                "method": request.get("method", ""),
+                "url": url_string(request.get("url")),
+                "tests": test_scripts(item),
+            }, ensure_ascii=False))
+    else:
+        for result in iter_run_results(args.path):
+            print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
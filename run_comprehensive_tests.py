@@ -8,38 +8,27 @@ This script runs the comprehensive test generation pipeline:
 2. Generate comprehensive Python test files
 3. Generate a detailed report
 
+Steps whose inputs and code are unchanged since their last successful run are
+skipped (see comprehensive_tests_manifest.json); pass --force to rerun them.
+
 Usage:
-    python run_comprehensive_tests.py [--swagger path/to/swagger.json]
+    python run_comprehensive_tests.py [--swagger path/to/swagger.json] [--force]
 """
 
-import subprocess
 import sys
 import os
 import json
 import argparse
+from pipeline_dag import PipelineDAG, Step
 
-def run_step(command, description):
-    """Run a command and handle errors gracefully."""
-    try:
-        print(f"[RUN] Running: {description}...")
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, check=True)
-        print(f"[SUCCESS] {description} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] {description} failed with error: {e}")
-        if e.stdout:
-            print(f"Output: {e.stdout}")
-        if e.stderr:
-            print(f"Error output: {e.stderr}")
-        return False
-    except Exception as e:
-        print(f"[ERROR] {description} failed with unexpected error: {e}")
-        return False
+MANIFEST_PATH = "comprehensive_tests_manifest.json"
 
 def main():
     parser = argparse.ArgumentParser(description='Run comprehensive test generation pipeline')
     parser.add_argument('--swagger', default='data/raw/swagger_fixed.json',
                       help='Path to the Swagger specification file')
+    parser.add_argument('--force', action='store_true',
+                      help='Rerun every step even if its inputs and code are unchanged')
     args = parser.parse_args()
 
     print("=" * 60)
@@ -47,23 +36,34 @@ def main():
     print("=" * 60)
     print(f"[LOAD] Using Swagger file: {args.swagger}")
 
+    dag = PipelineDAG("Comprehensive test generation", manifest_path=MANIFEST_PATH, force=args.force)
+
     # Step 1: Generate comprehensive English test cases
-    print(f"\n[STEP1] Step 1: Generating comprehensive English test cases...")
-    success = run_step(
-        f'python comprehensive_test_generator.py --swagger "{args.swagger}"',
-        "Comprehensive English test case generation"
-    )
-    
-    if not success:
-        print("[FAIL] Comprehensive test generation failed. Exiting.")
-        return
+    dag.add(Step(
+        "english_tests",
+        command=[sys.executable, "comprehensive_test_generator.py", "--swagger", args.swagger],
+        inputs=[args.swagger, "src/data/models/checkpoints/latest_english_generator"],
+        outputs=["data/processed/comprehensive_test_cases.json"],
+        description="Comprehensive English test case generation"
+    ))
 
     # Step 2: Generate summary report
-    print(f"\n[STEP2] Step 2: Generating summary report...")
-    run_step(
-        'python generate_summary_report.py',
-        "Summary report generation"
-    )
+    dag.add(Step(
+        "summary_report",
+        command=[sys.executable, "generate_summary_report.py"],
+        deps=["english_tests"],
+        requires_deps=True,
+        inputs=["data/processed/comprehensive_test_cases.json"],
+        outputs=["comprehensive_test_summary.md"],
+        description="Summary report generation"
+    ))
+
+    dag.run(max_workers=1)
+    dag.print_report()
+
+    if dag.results["english_tests"].status == "failed":
+        print("[FAIL] Comprehensive test generation failed. Exiting.")
+        return
 
     print(f"\n[SUCCESS] COMPREHENSIVE TEST GENERATION COMPLETE!")
     print("=" * 60)
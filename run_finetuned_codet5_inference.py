@@ -1,11 +1,12 @@
-from transformers import T5ForConditionalGeneration, RobertaTokenizer
+from transformers import T5ForConditionalGeneration
+from ai_model.tokenizer_provider import get_tokenizer
 
 # Path to your fine-tuned model directory
 model_dir = "src/data/models"
 
 # Load the tokenizer and model
 print("Loading model and tokenizer from", model_dir)
-tokenizer = RobertaTokenizer.from_pretrained(model_dir)
+tokenizer = get_tokenizer(model_dir)
 model = T5ForConditionalGeneration.from_pretrained(model_dir)
 
 # Use a prompt from the training data
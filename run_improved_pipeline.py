@@ -1,166 +1,160 @@
-import subprocess
+import argparse
 import os
 import sys
 import json
-import pandas as pd
+from datetime import datetime
 from collections import defaultdict
+from deduplicate_prioritized_tests import deduplicate_prioritized_tests
+from pipeline_dag import PipelineDAG, Step
 
-def deduplicate_prioritized_tests(prioritized_file="ai_model/data/prioritized_tests.json"):
-    """Remove duplicates from prioritized tests and keep the highest risk score for each unique endpoint"""
-    print("Deduplicating prioritized tests...")
-    
-    if not os.path.exists(prioritized_file):
-        print("WARNING: Prioritized tests file not found, skipping deduplication")
-        return
-    
-    # Load the prioritized tests
-    with open(prioritized_file, 'r', encoding='utf-8') as f:
-        tests = json.load(f)
-    
-    print(f"Original prioritized tests: {len(tests)}")
-    
-    # Create a dictionary to store unique endpoints with highest risk scores
-    unique_tests = {}
-    
-    for test in tests:
-        # Create a unique key based on method and URL
-        key = f"{test['method']}_{test['url']}"
-        
-        # Keep the test with the highest risk score
-        if key not in unique_tests or test['risk_score'] > unique_tests[key]['risk_score']:
-            unique_tests[key] = test
-    
-    # Convert back to list
-    deduplicated_tests = list(unique_tests.values())
-    
-    # Sort by risk score (highest first)
-    deduplicated_tests.sort(key=lambda x: x['risk_score'], reverse=True)
-    
-    print(f"Deduplicated tests: {len(deduplicated_tests)} (removed {len(tests) - len(deduplicated_tests)} duplicates)")
-    
-    # Save the deduplicated tests
-    with open(prioritized_file, 'w', encoding='utf-8') as f:
-        json.dump(deduplicated_tests, f, indent=2)
-    
-    return deduplicated_tests
+def _load_script(path):
+    """Import a pipeline script that does not live in a package."""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def step_deduplicate(artifacts):
+    return {"prioritized_summary": deduplicate_prioritized_tests(backup_original=False)}
 
-def run_command_with_error_handling(command, description):
-    """Run a command with proper error handling"""
+PRIORITIZED_FILE = "ai_model/data/prioritized_tests.json"
+
+def _prioritized_summary(path=PRIORITIZED_FILE):
+    """Summary of an already deduplicated prioritized tests file, as step_deduplicate publishes it."""
+    from deduplicate_prioritized_tests import iter_records
+    if not os.path.exists(path):
+        return None
     try:
-        print(f"Running: {description}...")
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        print(f"SUCCESS: {description} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"ERROR: {description} failed with error: {e}")
-        print(f"Error output: {e.stderr}")
-        return False
-    except FileNotFoundError as e:
-        print(f"ERROR: {description} failed - file not found: {e}")
-        return False
+        count = sum(1 for _ in iter_records(path))
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Could not read {path}: {e}")
+        return None
+    return {"original": count, "unique": count, "written": count}
+
+def step_generate_ai_tests(artifacts):
+    from ai_test_generator import run_ai_generator
+    summary = artifacts.get("prioritized_summary")
+    if summary is None:
+        # deduplicate was skipped (file unchanged since it last ran) or failed: use the file as it is
+        summary = _prioritized_summary()
+    if summary and summary["written"]:
+        print(f"Using {summary['written']} deduplicated prioritized tests...")
+        try:
+            return {"generated_tests": run_ai_generator.main(prioritized_mode=True)}
+        except Exception as e:
+            print(f"WARNING: Prioritized generation failed ({e}), trying full test generation instead...")
+    else:
+        print("No prioritized tests found, generating all test cases...")
+    return {"generated_tests": run_ai_generator.main(prioritized_mode=False)}
+
+def step_run_tests(artifacts):
+    from test_case_generator import run_tests
+    test_cases = artifacts.get("generated_tests")
+    if test_cases is None:
+        test_cases = run_tests.load_tests(run_tests.INPUT_FILE)
+    results = run_tests.run_tests(test_cases)
+    run_tests.save_results(results, run_tests.OUTPUT_FILE)
+    return {"execution_log": results}
+
+def step_analyze_logs(artifacts):
+    from ai_model import analyze_logs
+    return {"run_features": analyze_logs.main(artifacts.get("execution_log"))}
+
+def step_prepare_training_data(artifacts):
+    prepare_training_data = _load_script("src/data/prepare_training_data.py")
+    return {"training_pairs": prepare_training_data.main(artifacts.get("execution_log"))}
+
+def step_generate_python_tests(artifacts):
+    import comprehensive_python_test_generator
+    comprehensive_python_test_generator.main()
+
+def step_train_xgboost(artifacts):
+    from ai_model import train_model
+    train_model.main([])
+
+def step_report(artifacts):
+    generate_comprehensive_test_report()
+
+MANIFEST_PATH = "pipeline_manifest.json"
+
+def build_pipeline(force=False):
+    """The improved pipeline as a DAG; independent branches run concurrently."""
+    dag = PipelineDAG("Comprehensive pipeline", manifest_path=MANIFEST_PATH, force=force)
+    dag.add(Step("english_tests", command=[sys.executable, "comprehensive_test_generator.py"],
+                 fallback_command=[sys.executable, "generate_english_tests.py"],
+                 inputs=["data/raw/swagger_fixed.json", "src/data/models/checkpoints/latest_english_generator"],
+                 outputs=["data/processed/comprehensive_test_cases.json"],
+                 description="Comprehensive English test case generation"))
+    dag.add(Step("deduplicate", step_deduplicate, produces={"prioritized_summary": dict},
+                 inputs=[PRIORITIZED_FILE],
+                 outputs=[PRIORITIZED_FILE],
+                 code=["deduplicate_prioritized_tests.py"],
+                 description="Deduplicating prioritized tests"))
+    dag.add(Step("generate_ai_tests", step_generate_ai_tests, deps=["deduplicate"],
+                 produces={"generated_tests": list},
+                 inputs=["test_case_generator/data/swagger.json",
+                         "test_case_generator/data/rGuest Pay Agent.postman_test_run.json",
+                         "ai_model/data/prioritized_tests.json", "ai_model/data/history",
+                         "ai_model/data/risk_model.json", "ai_model/data/feature_encoder.json"],
+                 outputs=["test_case_generator/data/generated_tests.json"],
+                 code=["ai_test_generator", "ai_model/codet5_generator.py", "ai_model/risk_scorer.py",
+                       "postman_stream.py"],
+                 description="AI test case generation"))
+    # Always runs: results depend on the live service, not just on files
+    dag.add(Step("run_tests", step_run_tests, deps=["generate_ai_tests"],
+                 produces={"execution_log": list}, description="Test execution"))
+    dag.add(Step("analyze_logs", step_analyze_logs, deps=["run_tests"],
+                 produces={"run_features": "DataFrame"},
+                 inputs=["test_case_generator/data/test_execution_log.json"],
+                 outputs=["ai_model/data/processed_logs.csv"],
+                 code=["ai_model/analyze_logs.py", "ai_model/history_store.py", "ai_model/features.py"],
+                 description="Log analysis"))
+    dag.add(Step("prepare_training_data", step_prepare_training_data, deps=["run_tests"],
+                 produces={"training_pairs": list},
+                 inputs=["test_case_generator/data/test_execution_log.json"],
+                 outputs=["src/data/training_dataset.json"],
+                 code=["src/data/prepare_training_data.py"],
+                 description="Training data preparation"))
+    dag.add(Step("fine_tune_codet5", command=[sys.executable, "ai_model/fine_tune_codet5.py"],
+                 deps=["prepare_training_data"],
+                 inputs=["src/data/test_case_training.jsonl"],
+                 outputs=["src/data/models/checkpoints/latest_english_generator"],
+                 description="CodeT5 fine-tuning"))
+    dag.add(Step("python_tests", step_generate_python_tests, deps=["english_tests"],
+                 fallback_command=[sys.executable, "generate_improved_python_tests.py"],
+                 inputs=["data/processed/comprehensive_test_cases.json"],
+                 outputs=["comprehensive_python_tests"],
+                 code=["comprehensive_python_test_generator.py"],
+                 description="Comprehensive Python test generation from English"))
+    dag.add(Step("train_xgboost", step_train_xgboost, deps=["analyze_logs"],
+                 inputs=["ai_model/data/history"],
+                 outputs=["ai_model/data/risk_model.json", "ai_model/data/feature_encoder.json",
+                          "ai_model/data/prioritized_tests.json"],
+                 code=["ai_model/train_model.py", "ai_model/features.py"],
+                 description="XGBoost model training"))
+    dag.add(Step("report", step_report,
+                 deps=[name for name in dag.steps if name != "report"],
+                 description="Comprehensive test report"))
+    return dag
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the comprehensive AI test coverage pipeline")
+    parser.add_argument("--cycles", type=int, default=1, help="Number of full pipeline cycles")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum steps running at once")
+    parser.add_argument("--force", action="store_true",
+                        help="Rerun every step even if its inputs and code are unchanged")
+    args = parser.parse_args()
+
     print("[START] Starting COMPREHENSIVE AI Test Coverage Pipeline")
     print("=" * 70)
-    
-    NUM_CYCLES = 1  # Number of full pipeline cycles
-    
-    for cycle in range(NUM_CYCLES):
+
+    for cycle in range(args.cycles):
         print(f"\n=== Pipeline Cycle {cycle+1} ===")
-        
-        # Step 1: Generate COMPREHENSIVE English test cases from Swagger
-        print("\n[STEP1] Step 1: Generating COMPREHENSIVE English test cases from Swagger...")
-        if not run_command_with_error_handling(
-            [sys.executable, "comprehensive_test_generator.py"],
-            "Comprehensive English test case generation"
-        ):
-            print("WARNING: Trying basic English test generation as fallback...")
-            run_command_with_error_handling(
-                [sys.executable, "generate_english_tests.py"],
-                "Basic English test case generation"
-            )
-        
-        # Step 2: Deduplicate prioritized tests
-        print("\n[STEP2] Step 2: Deduplicating prioritized tests...")
-        deduplicated_tests = deduplicate_prioritized_tests()
-        
-        # Step 3: Generate test cases using AI Test Generator
-        print("\n[STEP3] Step 3: Generating AI test cases...")
-        prioritized_path = "ai_model/data/prioritized_tests.json"
-        if os.path.exists(prioritized_path) and deduplicated_tests:
-            print(f"Using {len(deduplicated_tests)} deduplicated prioritized tests...")
-            if not run_command_with_error_handling(
-                [sys.executable, "-m", "ai_test_generator.run_ai_generator", "--prioritized"],
-                "Prioritized test case generation"
-            ):
-                print("WARNING: Trying full test generation instead...")
-                run_command_with_error_handling(
-                    [sys.executable, "-m", "ai_test_generator.run_ai_generator"],
-                    "Full test case generation"
-                )
-        else:
-            print("No prioritized tests found, generating all test cases...")
-            run_command_with_error_handling(
-                [sys.executable, "-m", "ai_test_generator.run_ai_generator"],
-                "Full test case generation"
-            )
-        
-        # Step 4: Run the generated test cases
-        print("\n[STEP4] Step 4: Running test cases...")
-        if not run_command_with_error_handling(
-            [sys.executable, "test_case_generator/run_tests.py"],
-            "Test execution"
-        ):
-            print("WARNING: Test execution failed, but continuing with pipeline")
-        
-        # Step 5: Analyze test execution logs
-        print("\n[STEP5] Step 5: Analyzing test execution logs...")
-        if not run_command_with_error_handling(
-            [sys.executable, "ai_model/analyze_logs.py"],
-            "Log analysis"
-        ):
-            print("WARNING: Log analysis failed, but continuing with pipeline")
-        
-        # Step 6: Prepare training data for CodeT5 fine-tuning
-        print("\n[STEP6] Step 6: Preparing training data for CodeT5...")
-        if not run_command_with_error_handling(
-            [sys.executable, "src/data/prepare_training_data.py"],
-            "Training data preparation"
-        ):
-            print("WARNING: Training data preparation failed, but continuing with pipeline")
-        
-        # Step 7: Fine-tune CodeT5 model
-        print("\n[STEP7] Step 7: Fine-tuning CodeT5 model...")
-        if not run_command_with_error_handling(
-            [sys.executable, "ai_model/fine_tune_codet5.py"],
-            "CodeT5 fine-tuning"
-        ):
-            print("WARNING: CodeT5 fine-tuning failed, but continuing with pipeline")
-        
-        # Step 8: Generate COMPREHENSIVE Python tests from English descriptions
-        print("\n[STEP8] Step 8: Generating COMPREHENSIVE Python tests from English descriptions...")
-        if not run_command_with_error_handling(
-            [sys.executable, "comprehensive_python_test_generator.py"],
-            "Comprehensive Python test generation from English"
-        ):
-            print("WARNING: Trying basic Python test generation as fallback...")
-            run_command_with_error_handling(
-                [sys.executable, "generate_improved_python_tests.py"],
-                "Basic Python test generation from English"
-            )
-        
-        # Step 9: Train XGBoost model for test prioritization
-        print("\n[STEP9] Step 9: Training XGBoost model for test prioritization...")
-        if not run_command_with_error_handling(
-            [sys.executable, "ai_model/train_model.py"],
-            "XGBoost model training"
-        ):
-            print("WARNING: XGBoost training failed, but continuing with pipeline")
-        
-        # Step 10: Generate comprehensive test report
-        print("\n[STEP10] Step 10: Generating comprehensive test report...")
-        generate_comprehensive_test_report()
-    
+        dag = build_pipeline(force=args.force)
+        dag.run(max_workers=args.workers)
+        dag.print_report()
+
     print("\n[SUCCESS] COMPREHENSIVE PIPELINE COMPLETE!")
     print("Check the following directories for outputs:")
     print("  [FILE] data/processed/comprehensive_test_cases.json (Comprehensive English test descriptions)")
@@ -175,7 +169,7 @@ def generate_comprehensive_test_report():
     try:
         report = {
             "pipeline_summary": {
-                "timestamp": pd.Timestamp.now().isoformat(),
+                "timestamp": datetime.now().isoformat(),
                 "total_endpoints_processed": 0,
                 "comprehensive_test_scenarios_generated": 0,
                 "basic_english_test_cases_generated": 0,
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Parallel Generated Test Runner
+==============================
+
+Runs the generated pytest suites across several worker processes:
+1. Collect the generated test files
+2. Estimate each file's duration from historical latencies in the history store
+3. Balance the files across workers (longest expected file first)
+4. Run one pytest process per worker and merge the JUnit reports into one
+
+Usage:
+    python run_parallel_tests.py [--workers 8] [--report parallel_test_report.xml]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+DEFAULT_TEST_DIRS = ["src/tests/generated", "comprehensive_python_tests"]
+HISTORY_PATH = "ai_model/data/history"
+REPORT_PATH = "parallel_test_report.xml"
+
+# Used when an endpoint has never been seen in the history
+DEFAULT_LATENCY_MS = 500.0
+# Fixed per-test cost (fixtures, request setup, assertions)
+PER_TEST_OVERHEAD_MS = 50.0
+
+TEST_FUNC_RE = re.compile(r"^def (test_\w+)\(", re.MULTILINE)
+URL_RE = re.compile(r"""url\s*=\s*f?['"]([^'"]+)['"]""")
+
+
+def collect_test_files(test_dirs):
+    """Collect test_*.py files from the given directories."""
+    test_files = []
+    for test_dir in test_dirs:
+        if not os.path.isdir(test_dir):
+            print(f"[SKIP] Test directory not found: {test_dir}")
+            continue
+        for name in sorted(os.listdir(test_dir)):
+            if name.startswith("test_") and name.endswith(".py"):
+                test_files.append(os.path.join(test_dir, name))
+    return test_files
+
+
+def path_to_regex(path):
+    """Turn a test URL such as '{base_url}/v1.5/device/{deviceGuid}' into a path regex."""
+    path = urlparse(path).path if path.startswith("http") else path
+    path = path.replace("{base_url}", "")
+    parts = re.split(r"(\{[^}]+\})", path)
+    pattern = "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+    return re.compile(f"^{pattern}/?$")
+
+
+def load_endpoint_latencies(history_path=HISTORY_PATH):
+    """Return the mean historical latency (ms) per URL path."""
+    from ai_model import history_store
+
+    if not history_store.exists(history_path):
+        print(f"[WARNING] History not found at {history_path}, using default latencies")
+        return {}
+
+    df = history_store.load(history_path, columns=["url", "latency_ms"]).dropna()
+    df["path"] = df["url"].map(lambda u: urlparse(str(u)).path)
+    return df.groupby("path")["latency_ms"].mean().to_dict()
+
+
+def estimate_file_duration(test_file, latencies, default_ms):
+    """Estimate a test file's duration as the sum of its tests' expected latencies."""
+    with open(test_file, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    num_tests = len(TEST_FUNC_RE.findall(source))
+    if num_tests == 0:
+        return 0.0
+
+    urls = URL_RE.findall(source)
+    per_test = []
+    for url in urls:
+        regex = path_to_regex(url)
+        matched = [ms for path, ms in latencies.items() if regex.match(path)]
+        per_test.append(sum(matched) / len(matched) if matched else default_ms)
+
+    # Files usually hit a single endpoint; fall back to the default for unmatched tests
+    mean_latency = sum(per_test) / len(per_test) if per_test else default_ms
+    return num_tests * (mean_latency + PER_TEST_OVERHEAD_MS)
+
+
+def balance_files(durations, num_workers):
+    """Assign files to workers, longest first, always to the least-loaded worker."""
+    buckets = [{"files": [], "expected_ms": 0.0} for _ in range(num_workers)]
+    for test_file, duration in sorted(durations.items(), key=lambda x: x[1], reverse=True):
+        bucket = min(buckets, key=lambda b: b["expected_ms"])
+        bucket["files"].append(test_file)
+        bucket["expected_ms"] += duration
+    return [b for b in buckets if b["files"]]
+
+
+def run_workers(buckets, report_dir, extra_args):
+    """Start one pytest process per bucket and wait for all of them."""
+    os.makedirs(report_dir, exist_ok=True)
+    workers = []
+    for i, bucket in enumerate(buckets):
+        junit_path = os.path.join(report_dir, f"worker_{i}.xml")
+        log_path = os.path.join(report_dir, f"worker_{i}.log")
+        command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                   f"--junitxml={junit_path}", *extra_args, *bucket["files"]]
+        log_file = open(log_path, "w", encoding="utf-8")
+        process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+        workers.append({"process": process, "junit": junit_path, "log": log_file,
+                        "log_path": log_path, "start": time.time()})
+        print(f"[RUN] Worker {i}: {len(bucket['files'])} files, "
+              f"expected {bucket['expected_ms'] / 1000:.1f}s")
+
+    for i, worker in enumerate(workers):
+        returncode = worker["process"].wait()
+        worker["log"].close()
+        worker["returncode"] = returncode
+        print(f"[DONE] Worker {i} finished in {time.time() - worker['start']:.1f}s "
+              f"(exit code {returncode}, log: {worker['log_path']})")
+    return workers
+
+
+def merge_junit_reports(junit_paths, output_path):
+    """Merge per-worker JUnit XML files into a single <testsuites> report."""
+    merged = ET.Element("testsuites")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    total_time = 0.0
+
+    for junit_path in junit_paths:
+        if not os.path.exists(junit_path):
+            print(f"[WARNING] Missing worker report: {junit_path}")
+            continue
+        root = ET.parse(junit_path).getroot()
+        suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+        for suite in suites:
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            total_time += float(suite.get("time", 0))
+            merged.append(suite)
+
+    for key, value in totals.items():
+        merged.set(key, str(value))
+    merged.set("time", f"{total_time:.3f}")
+
+    ET.ElementTree(merged).write(output_path, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run generated pytest suites in parallel worker processes")
+    parser.add_argument("--dirs", nargs="+", default=DEFAULT_TEST_DIRS,
+                        help="Directories containing generated test files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="Number of pytest worker processes")
+    parser.add_argument("--history", default=HISTORY_PATH,
+                        help="History store (or legacy CSV) used to estimate durations")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help="Path of the merged JUnit XML report")
+    parser.add_argument("--report-dir", default="parallel_test_reports",
+                        help="Directory for per-worker reports and logs")
+    args, pytest_args = parser.parse_known_args()
+
+    print("=" * 60)
+    print("PARALLEL GENERATED TEST RUN")
+    print("=" * 60)
+
+    test_files = collect_test_files(args.dirs)
+    if not test_files:
+        print("[FAIL] No generated test files found.")
+        return 1
+
+    latencies = load_endpoint_latencies(args.history)
+    default_ms = (sorted(latencies.values())[len(latencies) // 2]
+                  if latencies else DEFAULT_LATENCY_MS)
+    durations = {f: estimate_file_duration(f, latencies, default_ms) for f in test_files}
+
+    buckets = balance_files(durations, max(1, args.workers))
+    print(f"[LOAD] {len(test_files)} test files across {len(buckets)} workers")
+
+    start = time.time()
+    workers = run_workers(buckets, args.report_dir, pytest_args)
+    totals = merge_junit_reports([w["junit"] for w in workers], args.report)
+    elapsed = time.time() - start
+
+    print(f"\n[STATS] Wall-clock: {elapsed:.1f}s "
+          f"(sequential estimate {sum(durations.values()) / 1000:.1f}s)")
+    print(f"  • Tests: {totals['tests']}")
+    print(f"  • Failures: {totals['failures']}")
+    print(f"  • Errors: {totals['errors']}")
+    print(f"  • Skipped: {totals['skipped']}")
+    print(f"[FILE] Merged report: {args.report}")
+
+    return 0 if all(w["returncode"] in (0, 5) for w in workers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Import-time benchmark for the pipeline's CLI entry points.
+
+Runs `python -X importtime` on each entry point in a fresh interpreter and
+reports its cumulative import time and its slowest imports. It fails if an
+entry point goes over its budget, or if it pulls in a heavy library
+(torch, transformers, pandas, ...) at import time that it should only load
+on use.
+
+Usage (from the repository root):
+    python scripts/benchmark_import_time.py [--repeat 3] [--scale 1.0]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "transformers", "pandas", "numpy", "sklearn", "scipy", "xgboost", "pyarrow", "requests"]
+
+# entry point -> import-time budget (ms). Entry points are modules, or script
+# paths for files outside a package.
+ENTRY_POINTS = {
+    "ai_test_generator.ai_test_generator": 150,
+    "ai_test_generator.run_ai_generator": 150,
+    "ai_test_generator.fuzzer": 150,
+    "test_case_generator.run_tests": 150,
+    "test_case_generator.scheduler": 100,
+    "run_parallel_tests": 100,
+    "run_improved_pipeline": 150,
+    "run_comprehensive_tests": 100,
+    "pipeline_dag": 100,
+    "deduplicate_prioritized_tests": 100,
+    "comprehensive_test_generator": 100,
+    "comprehensive_python_test_generator": 100,
+    "scripts/split_long_scripts.py": 100,
+}
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_statement(entry_point):
+    if entry_point.endswith(".py"):
+        directory, filename = os.path.split(entry_point)
+        return f"import sys; sys.path.insert(0, {directory!r}); import {filename[:-3]}"
+    return f"import {entry_point}"
+
+
+def measure(entry_point):
+    """Return (cumulative ms, {module: cumulative ms}) for one fresh import of entry_point."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", import_statement(entry_point)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            _, cumulative_us, indent, module = match.groups()
+            # Top-level imports (no extra indent) make up the total
+            modules[module] = (int(cumulative_us) / 1000, len(indent) == 1)
+    # The interpreter's own site imports are not part of the entry point
+    total = sum(ms for module, (ms, top_level) in modules.items()
+                if top_level and module not in ("site", "encodings"))
+    return total, {module: ms for module, (ms, _) in modules.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard CLI startup latency with python -X importtime")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point (best is reported)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2.0 on slow CI machines")
+    parser.add_argument("--top", type=int, default=3, help="Slowest imports to show per entry point")
+    args = parser.parse_args()
+
+    print(f"{'entry point':<42} {'import (ms)':>11} {'budget':>7}  status")
+    print("-" * 75)
+    failures = 0
+    for entry_point, budget in ENTRY_POINTS.items():
+        budget *= args.scale
+        try:
+            runs = [measure(entry_point) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{entry_point:<42} {'-':>11} {budget:>7.0f}  ERROR: {e}")
+            failures += 1
+            continue
+
+        total, modules = min(runs, key=lambda run: run[0])
+        heavy = [m for m in HEAVY_MODULES if m in modules]
+        status = "ok"
+        if heavy:
+            status = f"FAIL: imports {', '.join(heavy)} at load"
+        elif total > budget:
+            status = "FAIL: over budget"
+        failures += status != "ok"
+        print(f"{entry_point:<42} {total:>11.1f} {budget:>7.0f}  {status}")
+
+        if status != "ok":
+            slowest = sorted(modules.items(), key=lambda x: x[1], reverse=True)[:args.top]
+            for module, ms in slowest:
+                print(f"    {module:<38} {ms:>11.1f}")
+
+    print(f"\n{len(ENTRY_POINTS) - failures}/{len(ENTRY_POINTS)} entry points within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
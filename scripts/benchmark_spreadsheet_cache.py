@@ -0,0 +1,66 @@
+"""
+Spreadsheet cache benchmark: cold parse vs warm cache load.
+
+For each spreadsheet, times a plain pandas parse (what every run paid before
+the cache), the first cached read (parse + Parquet write) and warm reads from
+the cache, and checks that the cached DataFrame equals the parsed one. The
+cache is written to a temporary directory, so the real cache is untouched.
+
+Usage (from the repository root):
+    python scripts/benchmark_spreadsheet_cache.py [files ...] [--repeat 5]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spreadsheet_cache import _parse, read_spreadsheet
+
+DEFAULT_FILES = ["src/data/processed/*.xlsx", "data/raw/*.xlsx", "test_case_generator/data/*.xlsx"]
+
+
+def timed(fn, repeat):
+    """Median ms over repeat calls, with the last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold xlsx/csv parsing with warm Parquet cache loads")
+    parser.add_argument("files", nargs="*", help="Spreadsheets to benchmark (default: the repo's .xlsx inventories)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    files = args.files or sorted(f for pattern in DEFAULT_FILES for f in glob.glob(pattern))
+    if not files:
+        print("No spreadsheets found")
+        return 1
+
+    print(f"{'file':<36} {'rows':>6} {'parse (ms)':>11} {'first (ms)':>11} {'warm (ms)':>10} {'speedup':>8}  status")
+    print("-" * 96)
+    failures = 0
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for path in files:
+            cold, parsed = timed(lambda: _parse(path), args.repeat)
+            first, _ = timed(lambda: read_spreadsheet(path, cache_dir), 1)
+            warm, cached = timed(lambda: read_spreadsheet(path, cache_dir), args.repeat)
+
+            status = "ok" if cached.equals(parsed) else "FAIL: cached frame differs"
+            failures += status != "ok"
+            print(f"{os.path.basename(path)[:36]:<36} {len(parsed):>6} {cold:>11.1f} {first:>11.1f} "
+                  f"{warm:>10.1f} {cold / warm:>7.1f}x  {status}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Parquet cache for Excel/CSV test inventories.
+
+Parsing .xlsx files with openpyxl is slow and was repeated on every run. The first read of a
+spreadsheet stores its DataFrame as Parquet, and later reads load that copy:
+
+    data/spreadsheet_cache/<path key>.parquet   the parsed sheet
+    data/spreadsheet_cache/<path key>.json      source path, mtime, size, sha256
+
+A matching mtime and size is trusted as is. If either changed, the file is
+hashed, and the cache is still used when only the timestamp moved (a copy or
+checkout of the same content). Sheets Parquet cannot store (mixed-type columns,
+non-string headers) are returned uncached.
+
+Usage:
+    from spreadsheet_cache import read_spreadsheet
+    df = read_spreadsheet("src/data/processed/_Windows.xlsx")
+
+    python spreadsheet_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+CACHE_DIR = "data/spreadsheet_cache"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _cache_paths(path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(cache_dir, key)
+    return base + ".parquet", base + ".json"
+
+
+def _parse(path):
+    import pandas as pd
+
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    if path.endswith(".xlsx"):
+        return pd.read_excel(path)
+    raise ValueError(f"Unsupported file format: {path}")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def read_spreadsheet(path, cache_dir=CACHE_DIR):
+    """DataFrame of a .csv/.xlsx file, from the Parquet cache when the file is unchanged."""
+    import pandas as pd
+
+    stat = os.stat(path)
+    parquet_path, meta_path = _cache_paths(path, cache_dir)
+    meta = _read_meta(meta_path)
+
+    if meta and os.path.exists(parquet_path):
+        if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+            return pd.read_parquet(parquet_path)
+        if meta["size"] == stat.st_size:
+            sha256 = file_sha256(path)
+            if sha256 == meta["sha256"]:
+                # Same content, new timestamp: refresh the key so the next read skips hashing
+                _write_meta(meta_path, dict(meta, mtime_ns=stat.st_mtime_ns))
+                return pd.read_parquet(parquet_path)
+
+    df = _parse(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # The data is written first, so a matching .json always has its .parquet
+        tmp_path = parquet_path + ".tmp"
+        df.to_parquet(tmp_path, index=True)
+        os.replace(tmp_path, parquet_path)
+        _write_meta(meta_path, {
+            "source": os.path.abspath(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": file_sha256(path),
+        })
+    except (OSError, ValueError, TypeError, ImportError) as e:
+        # pyarrow errors subclass ValueError/TypeError
+        print(f"[WARNING] Not caching {path}: {e}")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the Parquet cache of parsed spreadsheets")
+    parser.add_argument("command", choices=["clear", "list"])
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "clear":
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        print(f"Cleared {args.cache_dir}")
+        return 0
+
+    if not os.path.isdir(args.cache_dir):
+        print(f"{args.cache_dir} is empty")
+        return 0
+    for name in sorted(os.listdir(args.cache_dir)):
+        if name.endswith(".json"):
+            meta = _read_meta(os.path.join(args.cache_dir, name))
+            if meta:
+                print(f"{name[:-5]}  {meta['size']:>10} B  {meta['source']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
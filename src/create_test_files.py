@@ -4,8 +4,12 @@ import os
 from pathlib import Path
 import logging
 import re
+import sys
 from typing import Any
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_test_generator.schema_compiler import SchemaCompiler
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -64,47 +68,37 @@ def get_schema_for_endpoint(swagger, path, method):
             body_schema = content['application/json'].get('schema')
     return body_schema, parameters
 
-def fill_schema(schema, definitions=None):
-    """Recursively fill a schema with user values or dummy data."""
-    if not schema:
-        return None
-    if definitions is None:
-        definitions = {}
-    if '$ref' in schema:
-        ref = schema['$ref']
-        ref_name = ref.split('/')[-1]
-        schema = definitions.get(ref_name, {})
+def _user_value_leaf(schema, field_name=None):
+    """Fixed dummy values: first enum value, "string", 1 or True."""
     t = schema.get('type')
-    if t == 'object' or ('properties' in schema):
-        result = {}
-        for prop, prop_schema in schema.get('properties', {}).items():
-            # Use user value if available
-            if prop in USER_VALUES:
-                result[prop] = USER_VALUES[prop]
-            else:
-                result[prop] = fill_schema(prop_schema, definitions)
-        # Fill required fields if missing
-        for req in schema.get('required', []):
-            if req not in result:
-                if req in USER_VALUES:
-                    result[req] = USER_VALUES[req]
-                else:
-                    result[req] = fill_schema(schema['properties'][req], definitions)
-        return result
-    elif t == 'array':
-        item_schema = schema.get('items', {})
-        return [fill_schema(item_schema, definitions)]
-    elif t == 'string':
-        # Use user value if available
-        if 'enum' in schema:
-            return schema['enum'][0]
-        return "string"
+    if t == 'string':
+        value = schema['enum'][0] if 'enum' in schema else "string"
     elif t == 'number' or t == 'integer':
-        return 1
+        value = 1
     elif t == 'boolean':
-        return True
+        value = True
     else:
+        value = None
+    return lambda ctx: value
+
+_NO_DEFINITIONS = {}
+# id(definitions) -> (definitions, compiler), so each swagger's schemas are compiled once
+_compilers = {}
+
+def _compiler_for(definitions):
+    entry = _compilers.get(id(definitions))
+    if entry is None or entry[0] is not definitions:
+        compiler = SchemaCompiler({'definitions': definitions}, leaf_factory=_user_value_leaf, overrides=USER_VALUES)
+        entry = _compilers[id(definitions)] = (definitions, compiler)
+    return entry[1]
+
+def fill_schema(schema, definitions=None):
+    """Fill a schema with user values or dummy data, using a builder compiled once per schema."""
+    if not schema:
         return None
+    if definitions is None:
+        definitions = _NO_DEFINITIONS
+    return _compiler_for(definitions).compile(schema)()
 
 def format_test_case(test_case: dict, swagger: dict) -> str:
     input_lines = test_case['input'].split('\n')
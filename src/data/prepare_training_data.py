@@ -5,13 +5,14 @@ import os
 LOG_PATH = "test_case_generator/data/test_execution_log.json"
 OUTPUT_PATH = "src/data/training_dataset.json"
 
-def main():
-    if not os.path.exists(LOG_PATH):
-        print(f"Log file not found: {LOG_PATH}")
-        return
+def main(logs=None):
+    if logs is None:
+        if not os.path.exists(LOG_PATH):
+            print(f"Log file not found: {LOG_PATH}")
+            return
 
-    with open(LOG_PATH) as f:
-        logs = json.load(f)
+        with open(LOG_PATH) as f:
+            logs = json.load(f)
 
     training_data = []
     for entry in logs:
@@ -23,6 +24,7 @@ def main():
     with open(OUTPUT_PATH, "w") as f:
         json.dump(training_data, f, indent=2)
     print(f"Saved {len(training_data)} training pairs to {OUTPUT_PATH}")
+    return training_data
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
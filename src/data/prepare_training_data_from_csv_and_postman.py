@@ -1,10 +1,15 @@
-import csv
 import json
 import re
-import pandas as pd
+import numpy as np
 import os
+import sys
 import glob
 from collections import defaultdict
+from scipy import sparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from postman_stream import iter_collection_items
+from spreadsheet_cache import read_spreadsheet
 
 # Process all CSV files in the raw directory
 RAW_DATA_DIR = 'data/raw'
@@ -12,88 +17,104 @@ POSTMAN_PATH = 'data/raw/rGuest Pay Agent.postman_collection 1.json'
 OUTPUT_PATH = 'src/data/test_case_training.jsonl'
 
 # Extract endpoints from Postman
-def extract_postman_endpoints(postman_json):
-    endpoints = []
-    def walk_items(items, parent_url=""):
-        for item in items:
-            if 'request' in item:
-                method = item['request']['method']
-                url = item['request']['url']
-                if isinstance(url, dict):
-                    raw_url = url.get('raw', '')
-                    path = '/' + '/'.join(url.get('path', []))
-                else:
-                    raw_url = url
-                    path = url
-                params = []
-                if 'query' in url and isinstance(url['query'], list):
-                    params = [q['key'] for q in url['query']]
-                if 'body' in item['request'] and 'formdata' in item['request']['body']:
-                    params += [f["key"] for f in item['request']['body']['formdata']]
-                
-                # Extract path variables from raw_url
-                if raw_url:
-                    path_params = re.findall(r'\{\{(.*?)\}\}', raw_url)
-                    params.extend(path_params)
-
-                endpoints.append({
-                    'method': method,
-                    'raw_url': raw_url,
-                    'path': path,
-                    'params': params,
-                    'name': item.get('name', ''),
-                    'description': item.get('request', {}).get('description', '')
-                })
-            if 'item' in item:
-                walk_items(item['item'], parent_url)
-    walk_items(postman_json['item'])
-    return endpoints
+def endpoint_from_item(item):
+    method = item['request']['method']
+    url = item['request']['url']
+    if isinstance(url, dict):
+        raw_url = url.get('raw', '')
+        path = '/' + '/'.join(url.get('path', []))
+    else:
+        raw_url = url
+        path = url
+    params = []
+    if 'query' in url and isinstance(url['query'], list):
+        params = [q['key'] for q in url['query']]
+    if 'body' in item['request'] and 'formdata' in item['request']['body']:
+        params += [f["key"] for f in item['request']['body']['formdata']]
 
-# Helper: match test case to endpoint by keyword
-def match_endpoint(text_to_match, endpoints):
-    text_to_match_lower = text_to_match.lower()
-    best_match = None
-    max_score = 0
+    # Extract path variables from raw_url
+    if raw_url:
+        path_params = re.findall(r'\{\{(.*?)\}\}', raw_url)
+        params.extend(path_params)
 
-    # Create a set of words from the text to match
-    text_words = set(re.findall(r'\w+', text_to_match_lower))
-    if not text_words:
-        return None
+    return {
+        'method': method,
+        'raw_url': raw_url,
+        'path': path,
+        'params': params,
+        'name': item.get('name', ''),
+        'description': item.get('request', {}).get('description', '')
+    }
 
-    for ep in endpoints:
-        score = 0
-        
-        # 1. Match against endpoint name (high weight)
-        ep_name_words = set(re.findall(r'\w+', ep.get('name', '').lower()))
-        common_name_words = text_words.intersection(ep_name_words)
-        score += len(common_name_words) * 3
-
-        # 2. Match against endpoint path (medium weight)
-        ep_path_words = set(re.findall(r'\w+', ep.get('path', '').lower()))
-        common_path_words = text_words.intersection(ep_path_words)
-        score += len(common_path_words) * 2
-        
-        # 3. Match against description (low weight)
-        ep_desc_words = set(re.findall(r'\w+', ep.get('description', '').lower()))
-        common_desc_words = text_words.intersection(ep_desc_words)
-        score += len(common_desc_words) * 1
+def extract_postman_endpoints(postman_path):
+    """Endpoints of every request in a collection file, streamed item by item."""
+    return [endpoint_from_item(item) for _, item in iter_collection_items(postman_path) if 'request' in item]
+
+TOKEN_RE = re.compile(r'\w+')
+# Score per word shared with the endpoint's name, path and description
+FIELD_WEIGHTS = {'name': 3, 'path': 2, 'description': 1}
+# Only return a match if there's a reasonable score
+MIN_SCORE = 1
+
+class EndpointIndex:
+    """
+    Weighted inverted index of Postman endpoints: token -> endpoints.
+
+    Built once; a batch of texts is scored with one sparse product of their
+    token sets against the token x endpoint weight matrix.
+    """
+
+    def __init__(self, endpoints):
+        self.endpoints = list(endpoints)
+        self.vocabulary = {}
+        rows, cols, weights = [], [], []
+        for col, ep in enumerate(self.endpoints):
+            ep_weights = defaultdict(int)
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in set(TOKEN_RE.findall((ep.get(field) or '').lower())):
+                    ep_weights[token] += weight
+            for token, weight in ep_weights.items():
+                rows.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                cols.append(col)
+                weights.append(weight)
+        self.weights = sparse.csr_matrix((weights, (rows, cols)),
+                                         shape=(len(self.vocabulary), len(self.endpoints)))
+
+    def match_many(self, texts):
+        """Best endpoint (or None) for each text, scored in one pass."""
+        if not self.endpoints:
+            return [None] * len(texts)
 
-        if score > max_score:
-            max_score = score
-            best_match = ep
+        # One row of distinct known tokens per text
+        indptr, indices = [0], []
+        vocabulary = self.vocabulary
+        for text in texts:
+            tokens = {vocabulary.get(token) for token in TOKEN_RE.findall(text.lower())}
+            tokens.discard(None)
+            indices.extend(tokens)
+            indptr.append(len(indices))
+        present = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr),
+                                    shape=(len(texts), len(vocabulary)))
 
-    # Only return a match if there's a reasonable score
-    if max_score > 1:
-        return best_match
-    return None
+        scores = (present @ self.weights).toarray()
+        # argmax keeps the first endpoint among equal scores
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(texts)), best]
+        return [self.endpoints[i] if score > MIN_SCORE else None for i, score in zip(best, best_scores)]
+
+    def match(self, text):
+        return self.match_many([text])[0]
+
+# Helper: match test case to endpoint by keyword
+def match_endpoint(text_to_match, endpoints):
+    """Match one text; build an EndpointIndex once when matching many."""
+    return EndpointIndex(endpoints).match(text_to_match)
 
 def load_csv_file(file_path):
     """Load CSV or Excel file and return DataFrame"""
     try:
-        if file_path.endswith('.csv'):
-            return pd.read_csv(file_path)
-        elif file_path.endswith('.xlsx'):
-            return pd.read_excel(file_path)
+        if file_path.endswith(('.csv', '.xlsx')):
+            return read_spreadsheet(file_path)
         else:
             print(f"Unsupported file format: {file_path}")
             return None
@@ -101,6 +122,12 @@ def load_csv_file(file_path):
         print(f"Error loading {file_path}: {e}")
         return None
 
+def _non_blank(column):
+    """Column values, with missing and whitespace-only cells as NaN."""
+    values = column.where(column.notna()).astype(object)
+    blank = values.notna() & (values.astype(str).str.strip() == '')
+    return values.mask(blank)
+
 def main():
     # Test cases to exclude
     exclude_test_cases = [
@@ -121,9 +148,8 @@ def main():
         print(f"  - {os.path.basename(file)}")
 
     # Read Postman
-    with open(POSTMAN_PATH, encoding='utf-8') as f:
-        postman = json.load(f)
-    endpoints = extract_postman_endpoints(postman)
+    endpoints = extract_postman_endpoints(POSTMAN_PATH)
+    index = EndpointIndex(endpoints)
 
     # Prepare output
     output = []
@@ -137,20 +163,21 @@ def main():
         if df is None:
             continue
             
-        current_scenario = None
         file_match_count = 0
         file_no_match_count = 0
-        
-        for idx, row in df.iterrows():
-            scenario = row['Test Scenarios'] if pd.notna(row['Test Scenarios']) and row['Test Scenarios'].strip() else current_scenario
-            test_case = row['Test Case'] if pd.notna(row['Test Case']) and row['Test Case'].strip() else None
-            if not test_case or test_case in exclude_test_cases:
-                continue
-            current_scenario = scenario
-            
-            # Try to match endpoint based on scenario and test case text
-            match_text = f"{scenario} {test_case}"
-            endpoint = match_endpoint(match_text, endpoints)
+
+        scenarios = _non_blank(df['Test Scenarios'])
+        test_cases = _non_blank(df['Test Case'])
+        keep = test_cases.notna() & ~test_cases.isin(exclude_test_cases)
+        # Blank scenarios inherit the scenario of the previous kept row
+        scenarios = scenarios[keep].ffill().fillna('None')
+        test_cases = test_cases[keep]
+
+        # Try to match endpoints based on scenario and test case text, all rows at once
+        match_texts = (scenarios + ' ' + test_cases).tolist()
+        matches = index.match_many(match_texts)
+
+        for scenario, test_case, endpoint in zip(scenarios, test_cases, matches):
             if endpoint:
                 file_match_count += 1
                 api_str = f"{endpoint['method']} {endpoint['raw_url']}"
@@ -1,4 +1,7 @@
 # src/evaluate_trained_model.py
+import os
+import sys
+import time
 import torch
 from models.codet5 import CodeT5TestGenerator
 from transformers import T5Tokenizer, T5ForConditionalGeneration
@@ -9,17 +12,41 @@ from typing import List, Dict, Any
 import re
 from difflib import SequenceMatcher
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.decoding_policy import POLICIES, DecodingPolicy
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+GENERATION_KWARGS = dict(
+    num_beams=5,
+    early_stopping=True,
+    no_repeat_ngram_size=3,
+    do_sample=True,
+    top_k=50,
+    top_p=0.95,
+    temperature=0.7,
+    length_penalty=1.0,
+    repetition_penalty=1.2
+)
+# Scenario type the decoding policy records evaluation generations under
+SCENARIO_TYPE = "evaluation"
+
 class ModelEvaluator:
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, decoding: str = None):
         """
         Initialize model evaluator.
         
         Args:
             model_path: Path to the trained model checkpoint
+            decoding: Optional decoding policy name (see ai_model/decoding_policy.py); when set,
+                generations use it and their cost and similarity are recorded in the policy stats
         """
+        if decoding is not None and decoding not in POLICIES:
+            raise ValueError(f"decoding must be one of {list(POLICIES)}, got {decoding!r}")
+        self.decoding = decoding
+        self.decoding_policy = DecodingPolicy.load() if decoding else None
+        self._last_decoding = None
         self.model_path = Path(model_path)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
@@ -43,23 +70,22 @@ class ModelEvaluator:
         )
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         
+        kwargs = dict(GENERATION_KWARGS, max_length=max_length)
+        if self.decoding_policy is not None:
+            _, kwargs = self.decoding_policy.choose(SCENARIO_TYPE, base_kwargs=kwargs, policy=self.decoding)
+        
+        start = time.perf_counter()
         with torch.no_grad():
             generated_ids = self.model.generate(
                 input_ids=inputs['input_ids'],
                 attention_mask=inputs['attention_mask'],
-                max_length=max_length,
-                num_beams=5,
-                early_stopping=True,
-                no_repeat_ngram_size=3,
-                do_sample=True,
-                top_k=50,
-                top_p=0.95,
-                temperature=0.7,
-                length_penalty=1.0,
-                repetition_penalty=1.2
+                **kwargs
             )
         
         generated_text = self.tokenizer.decode(generated_ids[0], skip_special_tokens=True)
+        # Cost of this generation, recorded with its quality once that is known
+        output_tokens = int((generated_ids[0] != self.tokenizer.pad_token_id).sum())
+        self._last_decoding = (output_tokens, time.perf_counter() - start, kwargs['max_length'])
         return generated_text
     
     def calculate_similarity(self, text1: str, text2: str) -> float:
@@ -91,6 +117,10 @@ class ModelEvaluator:
         
         # Calculate metrics
         similarity = self.calculate_similarity(generated_output, expected_output)
+        if self.decoding_policy is not None:
+            output_tokens, seconds, max_length = self._last_decoding
+            self.decoding_policy.record(SCENARIO_TYPE, self.decoding, output_tokens, seconds,
+                                        max_length=max_length, quality=similarity)
         
         expected_tests = self.extract_test_functions(expected_output)
         generated_tests = self.extract_test_functions(generated_output)
@@ -154,6 +184,10 @@ class ModelEvaluator:
             total_test_coverage += result['test_coverage']
             total_assertion_coverage += result['assertion_coverage']
         
+        if self.decoding_policy is not None:
+            self.decoding_policy.save()
+            logger.info(f"Decoding policy stats saved to: {self.decoding_policy.stats_path}")
+        
         # Calculate averages
         avg_similarity = total_similarity / len(results)
         avg_test_coverage = total_test_coverage / len(results)
@@ -0,0 +1,247 @@
+# payload_benchmark.py
+"""
+Payload-size scaling benchmark.
+
+For every POST/PUT endpoint with a request body, sends bodies of
+geometrically growing size (1 KB -> 10 MB by default), built from the
+endpoint's own schema with its strings stretched to the target size. Each
+step records median latency, throughput and status. Latency grows with body
+size even on a linear endpoint, so the knee is where the cost per byte jumps
+instead: the first size whose throughput falls below `--knee-fraction` of the
+best throughput seen at smaller sizes, or whose request fails (5xx, 413 or
+no response).
+
+Curves are stored in the history store (one row per endpoint and build), and
+`--compare BUILD` reports endpoints whose latency or knee regressed against
+that build.
+
+Usage:
+    python -m test_case_generator.payload_benchmark --build $(git rev-parse --short HEAD)
+    python -m test_case_generator.payload_benchmark --compare 1a2b3c4 --build 5d6e7f8
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import BASE_URL
+from ai_test_generator.ai_test_generator import fill_path_params
+from ai_test_generator.schema_compiler import SchemaCompiler, request_body_schema
+
+SWAGGER_PATH = "test_case_generator/data/swagger.json"
+MIN_SIZE = 1024
+MAX_SIZE = 10 * 1024 * 1024
+GROWTH = 2
+REPEATS = 3
+# Throughput below this fraction of the running peak marks the knee
+KNEE_FRACTION = 0.5
+# Latency increase at a shared size, or knee drop, that counts as a regression
+REGRESSION_THRESHOLD = 0.2
+
+
+def size_steps(min_size=MIN_SIZE, max_size=MAX_SIZE, growth=GROWTH):
+    """Geometric body sizes from min_size up to and including max_size."""
+    sizes = []
+    size = min_size
+    while size < max_size:
+        sizes.append(int(size))
+        size *= growth
+    sizes.append(max_size)
+    return sizes
+
+
+def sized_body(builder, target_bytes, seed=0):
+    """
+    JSON body of about target_bytes built from the schema, or None if it cannot grow.
+
+    Body size is linear in the generated string length, so two probe builds
+    give the string length that hits the target. Schemas without strings get
+    a padding field instead.
+    """
+    base = len(json.dumps(builder(seed=seed, string_length=0)))
+    per_1000 = len(json.dumps(builder(seed=seed, string_length=1000))) - base
+    if per_1000 > 0:
+        string_length = max(0, (target_bytes - base) * 1000 // per_1000)
+        return json.dumps(builder(seed=seed, string_length=string_length))
+
+    payload = builder(seed=seed)
+    if not isinstance(payload, dict):
+        return None
+    payload["padding"] = ""
+    overhead = len(json.dumps(payload))
+    payload["padding"] = "x" * max(0, target_bytes - overhead)
+    return json.dumps(payload)
+
+
+def find_knee(sizes, throughputs, statuses, knee_fraction=KNEE_FRACTION):
+    """
+    First size that failed, or whose throughput dropped below knee_fraction x the running peak.
+
+    Throughput rises while fixed per-request overhead dominates and levels off
+    while latency is linear in size, so a drop means the per-byte cost grew.
+    """
+    peak = 0.0
+    for size, throughput, status in zip(sizes, throughputs, statuses):
+        if status is None or status >= 500 or status == 413:
+            return size
+        if peak and throughput < knee_fraction * peak:
+            return size
+        peak = max(peak, throughput)
+    return None
+
+
+def benchmark_endpoint(session, method, url, builder, sizes, repeats=REPEATS, timeout=60,
+                       knee_fraction=KNEE_FRACTION):
+    """Ramp body size for one endpoint; stops after the first failing size."""
+    curve = {"size_bytes": [], "latency_ms": [], "throughput_mbps": [], "status_code": []}
+    # Untimed warm-up, so connection setup is not counted against the smallest size
+    warmup = sized_body(builder, sizes[0]) if sizes else None
+    if warmup is not None:
+        try:
+            session.request(method, url, data=warmup.encode("utf-8"), timeout=timeout,
+                            headers={"Content-Type": "application/json"})
+        except Exception:
+            pass
+
+    for target in sizes:
+        body = sized_body(builder, target)
+        if body is None:
+            break
+        data = body.encode("utf-8")
+
+        timings = []
+        status = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, data=data, timeout=timeout,
+                                           headers={"Content-Type": "application/json"})
+                status = response.status_code
+            except Exception:
+                status = None
+            timings.append((time.perf_counter() - start) * 1000)
+            if status is None:
+                break
+
+        latency = statistics.median(timings)
+        curve["size_bytes"].append(len(data))
+        curve["latency_ms"].append(round(latency, 2))
+        curve["throughput_mbps"].append(round(len(data) / 1024 / 1024 / (latency / 1000), 3))
+        curve["status_code"].append(status)
+        print(f"  {len(data) / 1024:>10.0f} KB  {latency:>9.1f} ms  "
+              f"{curve['throughput_mbps'][-1]:>8.2f} MB/s  -> {status}", flush=True)
+        if status is None or status >= 500 or status == 413:
+            break
+
+    curve["knee_bytes"] = find_knee(curve["size_bytes"], curve["throughput_mbps"], curve["status_code"],
+                                   knee_fraction)
+    return curve
+
+
+def compare_builds(curves, baseline_build, build, threshold=REGRESSION_THRESHOLD):
+    """Endpoints whose latency at shared sizes or whose knee regressed from baseline_build to build."""
+    latest = {}
+    for _, row in curves.iterrows():
+        # Rows are oldest first, so the last run of each build wins
+        latest[(row["build"], row["method"], row["endpoint"])] = row
+
+    regressions = []
+    for (row_build, method, endpoint), row in latest.items():
+        if row_build != build or (baseline_build, method, endpoint) not in latest:
+            continue
+        base = latest[(baseline_build, method, endpoint)]
+        # Compare at the sizes both runs reached, by step index (same ramp settings)
+        worst = 0.0
+        for old, new in zip(base["latency_ms"], row["latency_ms"]):
+            if old:
+                worst = max(worst, new / old - 1)
+        old_knee, new_knee = _knee(base["knee_bytes"]), _knee(row["knee_bytes"])
+        if old_knee is None:
+            knee_dropped = new_knee is not None
+        else:
+            knee_dropped = new_knee is not None and new_knee < old_knee * (1 - threshold)
+        if worst > threshold or knee_dropped:
+            regressions.append((method, endpoint, worst, old_knee, new_knee))
+    return regressions
+
+
+def _knee(value):
+    """Knee size in bytes, or None for no knee (stored as null, read back as NaN)."""
+    return None if value is None or value != value else int(value)
+
+
+def current_build():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return datetime.now().strftime("%Y%m%dT%H%M%S")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp request body size per POST/PUT endpoint and find the knee")
+    parser.add_argument("--swagger", default=SWAGGER_PATH, help="Swagger/OpenAPI specification")
+    parser.add_argument("--build", default=None, help="Build label stored with the curves (default: git HEAD)")
+    parser.add_argument("--min-kb", type=float, default=MIN_SIZE / 1024, help="Smallest body size in KB")
+    parser.add_argument("--max-kb", type=float, default=MAX_SIZE / 1024, help="Largest body size in KB")
+    parser.add_argument("--growth", type=float, default=GROWTH, help="Size multiplier between steps")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Requests per size (median is kept)")
+    parser.add_argument("--knee-fraction", type=float, default=KNEE_FRACTION,
+                        help="Throughput fraction of the running peak below which the knee is marked")
+    parser.add_argument("--endpoint", action="append", help="Only benchmark these paths (repeatable)")
+    parser.add_argument("--compare", metavar="BASELINE_BUILD",
+                        help="Report regressions of --build against this build instead of benchmarking")
+    args = parser.parse_args(argv)
+
+    from ai_model import history_store
+
+    build = args.build or current_build()
+    if args.compare:
+        regressions = compare_builds(history_store.read_curves(), args.compare, build)
+        if not regressions:
+            print(f"✅ No payload-size regressions in {build} against {args.compare}")
+            return 0
+        for method, endpoint, worst, old_knee, new_knee in regressions:
+            print(f"❌ {method} {endpoint}: latency +{worst:.0%}, knee {old_knee} -> {new_knee} bytes")
+        return 1
+
+    import requests
+
+    with open(args.swagger, "r") as f:
+        spec = json.load(f)
+    compiler = SchemaCompiler(spec)
+    sizes = size_steps(int(args.min_kb * 1024), int(args.max_kb * 1024), args.growth)
+
+    curves = []
+    with requests.Session() as session:
+        for path, path_item in spec.get("paths", {}).items():
+            if args.endpoint and path not in args.endpoint:
+                continue
+            for method, operation in path_item.items():
+                if method.lower() not in ("post", "put") or not isinstance(operation, dict):
+                    continue
+                schema = request_body_schema(operation)
+                if not schema:
+                    continue
+                url = BASE_URL + fill_path_params(path, operation)
+                print(f"📈 {method.upper()} {path}")
+                curve = benchmark_endpoint(session, method.upper(), url, compiler.compile(schema), sizes,
+                                           args.repeats, knee_fraction=args.knee_fraction)
+                knee = curve["knee_bytes"]
+                print(f"  knee: {f'{knee / 1024:.0f} KB' if knee else 'none up to the largest size'}")
+                curves.append(dict(curve, build=build, method=method.upper(), endpoint=path,
+                                   timestamp=datetime.now()))
+
+    rows = history_store.append_curves(curves)
+    print(f"✅ Stored {rows} payload-size curves for build {build} in {history_store.CURVES_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,61 +1,125 @@
 # run_tests.py
+import argparse
 import json
 import time
-import requests
 import os
-import pandas as pd
 import sys
 
 # Add config path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config import BASE_URL, GATEWAY_ID, INDUSTRY_TYPE, CHECK_ID
+from test_case_generator import scheduler
 
 # File paths
 INPUT_FILE = "test_case_generator/data/generated_tests.json"
 OUTPUT_FILE = "test_case_generator/data/test_execution_log.json"
+STREAM_FILE = "test_case_generator/data/test_execution_stream.jsonl"
 
 def load_tests(input_file):
     if input_file.endswith(".json"):
         with open(input_file, "r") as f:
             return json.load(f)
-    elif input_file.endswith(".csv"):
-        return pd.read_csv(input_file).to_dict(orient="records")
-    elif input_file.endswith(".xlsx"):
-        return pd.read_excel(input_file).to_dict(orient="records")
+    elif input_file.endswith(".jsonl"):
+        # Read lazily, so large fuzz case files stream into run_tests
+        return _iter_jsonl(input_file)
+    elif input_file.endswith((".csv", ".xlsx")):
+        from spreadsheet_cache import read_spreadsheet
+        return read_spreadsheet(input_file).to_dict(orient="records")
     else:
         raise ValueError("Unsupported file format.")
 
-def run_tests(test_cases):
-    results = []
+def _iter_jsonl(input_file):
+    with open(input_file, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
 
-    for test in test_cases:
-        method = test.get("method", "GET").upper()
-        endpoint = test.get("url") or test.get("endpoint")
-        payload = test.get("payload", {})
+def apply_defaults(payload):
+    """Fill the shared gateway/industry/check ids into a payload and its "request" object."""
+    payload.setdefault("gatewayId", GATEWAY_ID)
+    payload.setdefault("industryType", INDUSTRY_TYPE)
+    payload.setdefault("checkId", CHECK_ID)
 
-        if not endpoint:
-            print("Skipping test with no endpoint.")
-            continue
+    if "request" not in payload:
+        payload["request"] = {}
+    payload["request"].setdefault("gatewayId", GATEWAY_ID)
+    payload["request"].setdefault("industryType", INDUSTRY_TYPE)
+    payload["request"].setdefault("checkId", CHECK_ID)
+
+def is_failure(test, status):
+    """
+    Whether a response fails the test case.
+
+    No response and 5xx always fail. A case with an expected_status fails when
+    the status class differs (a 2xx for an invalid fuzz value, a 4xx for a valid
+    one); a fuzz case the spec says nothing about only fails on those; any other
+    case fails on 4xx too.
+    """
+    if status is None or status >= 500:
+        return True
+    expected = test.get("expected_status")
+    if expected is not None:
+        return status // 100 != expected // 100
+    if "fuzz" in test:
+        return False
+    return status >= 400
+
+def prepare_request(test):
+    """Resolve a test case into (method, url, payload), or None if it has no endpoint."""
+    method = test.get("method", "GET").upper()
+    endpoint = test.get("url") or test.get("endpoint")
+    payload = test.get("payload", {})
 
-        # Replace placeholders in path
-        if isinstance(payload, dict):
-            for key, val in payload.items():
-                placeholder = f"{{{key}}}"
-                endpoint = endpoint.replace(placeholder, str(val))
+    if not endpoint:
+        return None
 
-        url = endpoint if endpoint.startswith("http") else BASE_URL + endpoint
+    # Replace placeholders in path
+    if isinstance(payload, dict):
+        for key, val in payload.items():
+            placeholder = f"{{{key}}}"
+            endpoint = endpoint.replace(placeholder, str(val))
 
-        # Enrich payload with shared defaults
-        if isinstance(payload, dict):
-            payload.setdefault("gatewayId", GATEWAY_ID)
-            payload.setdefault("industryType", INDUSTRY_TYPE)
-            payload.setdefault("checkId", CHECK_ID)
+    url = endpoint if endpoint.startswith("http") else BASE_URL + endpoint
 
-            if "request" not in payload:
-                payload["request"] = {}
-            payload["request"].setdefault("gatewayId", GATEWAY_ID)
-            payload["request"].setdefault("industryType", INDUSTRY_TYPE)
-            payload["request"].setdefault("checkId", CHECK_ID)
+    # Enrich payload with shared defaults. Fuzz cases got them in their base payload before
+    # mutating (see ai_test_generator/fuzzer.py); filling them here would undo missing_required
+    # and other mutations of these fields.
+    if isinstance(payload, dict) and "fuzz" not in test:
+        apply_defaults(payload)
+
+    return method, url, payload
+
+def run_tests(test_cases, budget_s=None, max_failures=None, stream_file=None, collect=True):
+    """
+    Execute test cases in the given order.
+
+    Args:
+        test_cases: Iterable of test case dicts
+        budget_s: Optional wall-clock budget in seconds; remaining tests are skipped once spent
+        max_failures: Optional number of failures after which execution stops
+        stream_file: Optional JSONL path; each result is appended as soon as it completes
+        collect: Keep results in memory and return them; turn off for long streamed runs
+    """
+    import requests
+
+    results = []
+    failures = 0
+    run_start = time.time()
+    stream = None
+    if stream_file:
+        os.makedirs(os.path.dirname(stream_file) or ".", exist_ok=True)
+        stream = open(stream_file, "w")
+
+    for test in test_cases:
+        if budget_s is not None and time.time() - run_start >= budget_s:
+            print(f"⏱️  Time budget of {budget_s:.0f}s spent, stopping.")
+            break
+
+        request = prepare_request(test)
+        if request is None:
+            print("Skipping test with no endpoint.")
+            continue
+        method, url, payload = request
 
         # Send request and log results
         try:
@@ -69,15 +133,36 @@ def run_tests(test_cases):
             status = None
             error = str(e)
 
-        results.append({
+        result = {
             "method": method,
             "url": url,
             "payload": payload,
             "status_code": status,
             "latency_ms": round(latency, 2) if latency else None,
             "error": error
-        })
+        }
+        if test.get("risk_score") is not None:
+            result["risk_score"] = test["risk_score"]
+        if test.get("expected_status") is not None:
+            result["expected_status"] = test["expected_status"]
+        if collect:
+            results.append(result)
+
+        failed = is_failure(test, status)
+        print(f"{'❌' if failed else '✅'} {method} {url} -> {status} "
+              f"({result['latency_ms']} ms, +{time.time() - run_start:.1f}s)", flush=True)
+        if stream:
+            stream.write(json.dumps(result) + "\n")
+            stream.flush()
+
+        if failed:
+            failures += 1
+            if max_failures is not None and failures >= max_failures:
+                print(f"🛑 Reached {failures} failures, stopping.")
+                break
 
+    if stream:
+        stream.close()
     return results
 
 def save_results(results, output_file):
@@ -86,7 +171,54 @@ def save_results(results, output_file):
         json.dump(results, f, indent=2)
     print(f"✅ Saved test results to {output_file}")
 
+def load_risk_scorer():
+    """Online risk scorer, or None when no model is trained or xgboost is missing."""
+    try:
+        from ai_model.risk_scorer import get_scorer
+    except ImportError:
+        return None
+    return get_scorer()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Execute generated API test cases")
+    parser.add_argument("--input", default=INPUT_FILE, help="Test cases file (.json, .jsonl, .csv or .xlsx)")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Execution log output file")
+    parser.add_argument("--schedule", choices=["spec", "risk"], default="spec",
+                        help="Execution order: spec order, or descending risk per unit of expected latency")
+    parser.add_argument("--budget", help="Wall-clock time budget, e.g. 90s, 5m, 1h")
+    parser.add_argument("--max-failures", type=int, help="Stop after this many failures")
+    parser.add_argument("--stream", default=STREAM_FILE, help="JSONL file that results are streamed to")
+    parser.add_argument("--prioritized", default=scheduler.PRIORITIZED_FILE,
+                        help="Risk scores used by --schedule risk")
+    parser.add_argument("--history", default=scheduler.HISTORY_FILE,
+                        help="Historical latencies used by --schedule risk and --budget")
+    args = parser.parse_args(argv)
+
+    test_cases = load_tests(args.input)
+    budget_s = scheduler.parse_budget(args.budget) if args.budget else None
+
+    if args.schedule == "risk":
+        def key_fn(test):
+            # prepare_request only fills defaults, so resolving twice is harmless
+            request = prepare_request(test)
+            return request[:2] if request else (test.get("method", "GET"), "")
+
+        scheduled = scheduler.risk_order(
+            test_cases,
+            key_fn,
+            scheduler.load_risk_scores(args.prioritized),
+            scheduler.load_expected_latencies(args.history),
+            scorer=load_risk_scorer(),
+        )
+        if budget_s is not None:
+            selected = scheduler.within_budget(scheduled, budget_s)
+            print(f"Scheduled {len(selected)}/{len(scheduled)} tests within a {budget_s:.0f}s budget")
+            scheduled = selected
+        test_cases = [test for test, _, _ in scheduled]
+
+    results = run_tests(test_cases, budget_s=budget_s, max_failures=args.max_failures,
+                        stream_file=args.stream)
+    save_results(results, args.output)
+
 if __name__ == "__main__":
-    test_cases = load_tests(INPUT_FILE)
-    results = run_tests(test_cases)
-    save_results(results, OUTPUT_FILE)
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,114 @@
+# scheduler.py
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+PRIORITIZED_FILE = "ai_model/data/prioritized_tests.json"
+HISTORY_FILE = "ai_model/data/history"
+
+# Used when an endpoint has never been executed before
+DEFAULT_LATENCY_MS = 500.0
+
+_BUDGET_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+_BUDGET_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_budget(budget):
+    """Parse a time budget such as '90s', '5m' or '1.5h' into seconds."""
+    match = _BUDGET_RE.match(str(budget))
+    if not match:
+        raise ValueError(f"Invalid time budget: {budget!r} (expected e.g. '300s', '5m', '1h')")
+    value, unit = match.groups()
+    return float(value) * _BUDGET_UNITS[unit or "s"]
+
+
+def _key(method, url):
+    """(METHOD, path) key, so scores match regardless of host/port."""
+    return method.upper(), urlparse(url).path or url
+
+
+def load_risk_scores(prioritized_file=PRIORITIZED_FILE):
+    """Load the highest risk_score per (method, path) from prioritized_tests.json."""
+    if not os.path.exists(prioritized_file):
+        print(f"[WARNING] Prioritized tests not found at {prioritized_file}, risk defaults apply")
+        return {}
+    with open(prioritized_file, "r", encoding="utf-8") as f:
+        prioritized = json.load(f)
+
+    risk = {}
+    for item in prioritized:
+        key = _key(item.get("method", "GET"), item.get("url", ""))
+        risk[key] = max(risk.get(key, 0.0), float(item.get("risk_score", 0.0)))
+    return risk
+
+
+def load_expected_latencies(history_file=HISTORY_FILE):
+    """Mean historical latency (ms) per (method, path)."""
+    from ai_model import history_store
+
+    if not history_store.exists(history_file):
+        print(f"[WARNING] History not found at {history_file}, latency defaults apply")
+        return {}
+
+    df = history_store.load(history_file, columns=["method", "url", "latency_ms"]).dropna()
+    df["path"] = df["url"].map(lambda u: urlparse(str(u)).path)
+    means = df.groupby([df["method"].astype(str).str.upper(), "path"])["latency_ms"].mean()
+    return means.to_dict()
+
+
+def risk_order(test_cases, key_fn, risk_scores, latencies, scorer=None):
+    """
+    Order test cases by descending risk per unit of expected latency.
+
+    Risk comes from the test's own risk_score, then prioritized_tests.json,
+    then the online scorer, then the average known risk.
+
+    Args:
+        test_cases: Iterable of test case dicts
+        key_fn: Returns (method, url) for a test case
+        risk_scores: {(METHOD, path): risk_score}
+        latencies: {(METHOD, path): expected latency in ms}
+        scorer: Optional ai_model.risk_scorer.RiskScorer for unscored tests
+
+    Returns:
+        List of (test_case, risk, expected_latency_ms), highest priority first
+    """
+    # Unknown endpoints get the average known risk/latency instead of sinking to the bottom
+    default_risk = sum(risk_scores.values()) / len(risk_scores) if risk_scores else 0.5
+    default_latency = (sum(latencies.values()) / len(latencies)) if latencies else DEFAULT_LATENCY_MS
+
+    scheduled = []
+    for test in test_cases:
+        method, url = key_fn(test)
+        key = _key(method, url)
+        if test.get("risk_score") is not None:
+            risk = float(test["risk_score"])
+        elif key in risk_scores:
+            risk = risk_scores[key]
+        elif scorer is not None:
+            risk = scorer.score(method, url)
+        else:
+            risk = default_risk
+        latency = max(latencies.get(key, default_latency), 1.0)
+        scheduled.append((test, risk, latency))
+
+    scheduled.sort(key=lambda x: x[1] / x[2], reverse=True)
+    return scheduled
+
+
+def within_budget(scheduled, budget_s):
+    """
+    Fill the budget greedily in schedule order.
+
+    A test whose expected latency no longer fits is skipped, and later (cheaper)
+    tests that still fit are kept, so the result is not just a prefix.
+    """
+    selected = []
+    expected_ms = 0.0
+    for test, risk, latency in scheduled:
+        if expected_ms + latency > budget_s * 1000:
+            continue
+        selected.append((test, risk, latency))
+        expected_ms += latency
+    return selected
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.data_parallel import (GLOBAL_BATCH_SIZE, PER_DEVICE_BATCH_SIZE, batch_layout, threads_per_process,
+                                   world_size)
+
+
+@pytest.mark.parametrize("processes, layout", [
+    (1, (16, 4)),
+    (2, (16, 2)),
+    (4, (16, 1)),
+    (8, (8, 1)),
+    (16, (4, 1)),
+    (64, (1, 1)),
+])
+def test_batch_layout_keeps_global_batch(processes, layout):
+    per_device, accumulation = batch_layout(processes)
+
+    assert (per_device, accumulation) == layout
+    assert per_device * accumulation * processes == GLOBAL_BATCH_SIZE == 64
+    assert per_device <= PER_DEVICE_BATCH_SIZE
+
+
+@pytest.mark.parametrize("processes", [0, -1, 3, 5, 6, 7, 12, 65, 128])
+def test_batch_layout_rejects_non_divisors(processes):
+    with pytest.raises(ValueError, match="divisor of 64"):
+        batch_layout(processes)
+
+
+def test_threads_split_the_cores(monkeypatch):
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+
+    assert [threads_per_process(p) for p in (1, 2, 4, 8, 16)] == [8, 4, 2, 1, 1]
+
+    monkeypatch.setattr(os, "cpu_count", lambda: None)
+    assert threads_per_process(2) == 1
+
+
+def test_omp_num_threads_takes_precedence(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    monkeypatch.setenv("OMP_NUM_THREADS", "3")
+
+    assert [threads_per_process(p) for p in (1, 2, 8)] == [3, 3, 3]
+
+    # Set but empty: treated as unset
+    monkeypatch.setenv("OMP_NUM_THREADS", "")
+    assert threads_per_process(2) == 4
+
+
+def test_world_size(monkeypatch):
+    monkeypatch.delenv("WORLD_SIZE", raising=False)
+    assert world_size() == 1
+
+    monkeypatch.setenv("WORLD_SIZE", "4")
+    assert world_size() == 4
@@ -0,0 +1,136 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import deduplicate_prioritized_tests as dedup
+
+
+def make_records(n=300, endpoints=60, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        e = rng.randrange(endpoints)
+        records.append({
+            "method": "POST" if e % 3 else "GET",
+            "url": f"http://localhost:8502/v1.5/resource/{e}",
+            # Two decimals, so equal risk scores (within and across endpoints) are common
+            "risk_score": round(rng.random(), 2),
+            "row": i,
+        })
+    return records
+
+
+def in_memory_dedup(records, top_k=None):
+    """The original json.load implementation: first highest-risk record per endpoint, stable sort by risk."""
+    best = {}
+    for record in records:
+        key = (record["method"], record["url"])
+        if key not in best or record["risk_score"] > best[key]["risk_score"]:
+            best[key] = record
+    ranked = sorted(best.values(), key=lambda t: t["risk_score"], reverse=True)
+    return ranked[:top_k] if top_k is not None else ranked
+
+
+def write(path, records, jsonl):
+    with open(path, "w", encoding="utf-8") as f:
+        if jsonl:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+        else:
+            json.dump(records, f, indent=2)
+
+
+@pytest.fixture
+def spills(monkeypatch):
+    """Force external sorting with a tiny run size and count the runs spilled to disk."""
+    monkeypatch.setattr(dedup, "SORT_RUN_SIZE", 7)
+    spilled = []
+    spill_run = dedup._spill_run
+
+    def counting_spill(run, tmp_dir):
+        spilled.append(len(run))
+        return spill_run(run, tmp_dir)
+
+    monkeypatch.setattr(dedup, "_spill_run", counting_spill)
+    return spilled
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_external_sort_matches_in_memory_dedup(tmp_path, spills, suffix):
+    records = make_records()
+    input_file = tmp_path / f"prioritized_tests{suffix}"
+    output_file = tmp_path / f"deduplicated{suffix}"
+    write(input_file, records, jsonl=suffix == ".jsonl")
+
+    result = dedup.deduplicate_prioritized_tests(str(input_file), str(output_file))
+
+    expected = in_memory_dedup(records)
+    assert list(dedup.iter_records(str(output_file))) == expected
+    assert result == {"original": len(records), "unique": len(expected), "written": len(expected)}
+    assert len(spills) > 1 and max(spills) <= 7
+    # Sorted runs are removed once merged, and so is the temp output
+    assert sorted(os.listdir(tmp_path)) == sorted([input_file.name, output_file.name])
+
+
+def test_top_k(tmp_path):
+    records = make_records()
+    input_file = tmp_path / "prioritized_tests.json"
+    output_file = tmp_path / "top.json"
+    write(input_file, records, jsonl=False)
+
+    result = dedup.deduplicate_prioritized_tests(str(input_file), str(output_file), top_k=10)
+
+    assert result["written"] == 10
+    assert list(dedup.iter_records(str(output_file))) == in_memory_dedup(records, top_k=10)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, 1 << 16])
+def test_iter_records_across_buffer_edges(tmp_path, chunk_size):
+    records = make_records(n=40)
+    path = tmp_path / "records.json"
+    write(path, records, jsonl=False)
+
+    assert list(dedup.iter_records(str(path), chunk_size=chunk_size)) == records
+
+
+def test_in_place_replace_keeps_backup(tmp_path, spills):
+    records = make_records()
+    input_file = tmp_path / "prioritized_tests.json"
+    write(input_file, records, jsonl=False)
+    original = input_file.read_bytes()
+
+    dedup.deduplicate_prioritized_tests(str(input_file))
+
+    backup_file = tmp_path / "prioritized_tests.json.backup"
+    assert backup_file.read_bytes() == original
+    assert list(dedup.iter_records(str(input_file))) == in_memory_dedup(records)
+    # The output was renamed over the input, so the backup link still holds the old file
+    assert not os.path.samefile(input_file, backup_file)
+    assert sorted(os.listdir(tmp_path)) == ["prioritized_tests.json", "prioritized_tests.json.backup"]
+
+
+def test_no_backup(tmp_path):
+    input_file = tmp_path / "prioritized_tests.jsonl"
+    write(input_file, make_records(n=20), jsonl=True)
+
+    dedup.deduplicate_prioritized_tests(str(input_file), backup_original=False)
+
+    assert os.listdir(tmp_path) == ["prioritized_tests.jsonl"]
+
+
+def test_failed_write_leaves_output_untouched(tmp_path):
+    output_file = tmp_path / "deduplicated.json"
+    output_file.write_text("previous")
+
+    def records():
+        yield {"method": "GET", "url": "/a", "risk_score": 1.0}
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        dedup._write_atomically(records(), str(output_file))
+
+    assert output_file.read_text() == "previous"
+    assert os.listdir(tmp_path) == ["deduplicated.json"]
@@ -0,0 +1,93 @@
+import os
+import random
+import re
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data.prepare_training_data_from_csv_and_postman import EndpointIndex, match_endpoint
+
+
+def pairwise_match(text_to_match, endpoints):
+    """The matcher EndpointIndex replaced: every text scored against every endpoint."""
+    text_words = set(re.findall(r'\w+', text_to_match.lower()))
+    if not text_words:
+        return None
+    best_match, max_score = None, 0
+    for ep in endpoints:
+        score = len(text_words & set(re.findall(r'\w+', ep.get('name', '').lower()))) * 3
+        score += len(text_words & set(re.findall(r'\w+', ep.get('path', '').lower()))) * 2
+        score += len(text_words & set(re.findall(r'\w+', ep.get('description', '').lower())))
+        if score > max_score:
+            max_score, best_match = score, ep
+    return best_match if max_score > 1 else None
+
+
+def endpoint(name, path, description=""):
+    return {"method": "POST", "name": name, "path": path, "description": description}
+
+
+ENDPOINTS = [
+    endpoint("Sale", "/v1.5/transaction/sale/{deviceGuid}", "Card sale"),
+    endpoint("Refund", "/v1.5/transaction/refund/{transactionId}", "Refund a sale"),
+    endpoint("Void", "/v1.5/transaction/void/{transactionId}"),
+    endpoint("Device status", "/v1.5/device/{deviceGuid}/status", "Status of the device"),
+    # Same words as Device status, so the earlier one wins every tie between them
+    endpoint("Device status", "/v1.5/device/{deviceGuid}/status", "Status of the device"),
+    endpoint("Get token", "/v1.5/token/{token}", "Token for a card"),
+]
+
+ROWS = [
+    "Verify sale with a valid card",
+    "Refund the sale transaction",
+    "void",                                     # one name word: 3
+    "Check device status",                      # tie between the two identical endpoints
+    "transaction",                              # path word shared by three endpoints: tie, first wins
+    "card",                                     # Sale and Get token both score 1 (description): below threshold
+    "Nothing in common here",                   # no shared words
+    "",                                         # no words at all
+    "!!! ---",
+    "TOKEN Token token",                        # case and repeats count once
+    "sale refund void",                         # every transaction endpoint scores 5: first wins
+]
+
+
+@pytest.mark.parametrize("text", ROWS)
+def test_matches_pairwise(text):
+    index = EndpointIndex(ENDPOINTS)
+
+    expected = pairwise_match(text, ENDPOINTS)
+    assert index.match(text) is expected
+    assert match_endpoint(text, ENDPOINTS) is expected
+
+
+def test_ties_and_misses():
+    matches = EndpointIndex(ENDPOINTS).match_many(["Check device status", "transaction", "card", "", "void"])
+
+    assert matches == [ENDPOINTS[3], ENDPOINTS[0], None, None, ENDPOINTS[2]]
+    assert matches[0] is ENDPOINTS[3]
+
+
+def test_match_many_matches_pairwise_on_random_rows():
+    rng = random.Random(0)
+    words = ["sale", "refund", "void", "device", "status", "token", "card", "transaction", "v1", "5",
+             "deviceguid", "the", "of", "a", "batch", "settle", "check", "tip"]
+
+    def text(n):
+        return " ".join(rng.choice(words).capitalize() if rng.random() < 0.3 else rng.choice(words)
+                        for _ in range(n))
+
+    endpoints = [endpoint(text(rng.randint(0, 2)), "/" + "/".join(text(rng.randint(0, 3)).split()),
+                          text(rng.randint(0, 4))) for _ in range(15)]
+    rows = [text(rng.randint(0, 6)) for _ in range(300)]
+
+    matches = EndpointIndex(endpoints).match_many(rows)
+
+    # By identity, so equal endpoints still have to be the same one
+    assert [id(m) for m in matches] == [id(pairwise_match(r, endpoints)) for r in rows]
+    assert any(m is None for m in matches) and any(m is not None for m in matches)
+
+
+def test_no_endpoints():
+    assert EndpointIndex([]).match_many(["sale", ""]) == [None, None]
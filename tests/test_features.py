@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model.features import FeatureEncoder, PathTemplateMatcher, bucket_latency
+
+TEMPLATES = [
+    "/v1.5/device/{deviceGuid}",
+    "/v1.5/device/{deviceGuid}/status",
+    "/v1.5/device/settings",
+    "/v1.5/transaction/{transactionId}/refund",
+    "/v1.5/transaction/{transactionId}/{action}",
+    "/v1.5/{resource}/{id}/refund",
+    "/v1.5/token/{token}",
+    "/v1.5/token/{tokenId}",
+]
+
+GUID = "f7da845e-1c2b-4d3e-8f90-0a1b2c3d4e5f"
+
+
+@pytest.mark.parametrize("url, template", [
+    (f"http://localhost:8502/v1.5/device/{GUID}", "/v1.5/device/{deviceGuid}"),
+    (f"/v1.5/device/{GUID}/status?verbose=1", "/v1.5/device/{deviceGuid}/status"),
+    # A literal segment beats a {param} in the same position
+    ("http://localhost:8502/v1.5/device/settings", "/v1.5/device/settings"),
+    ("/v1.5/transaction/123/refund", "/v1.5/transaction/{transactionId}/refund"),
+    ("/v1.5/transaction/123/void", "/v1.5/transaction/{transactionId}/{action}"),
+    # More literal segments win even when the literal comes later in the path
+    ("/v1.5/check/123/refund", "/v1.5/{resource}/{id}/refund"),
+    # Equally literal templates: the first one in the spec wins
+    ("/v1.5/token/abc", "/v1.5/token/{token}"),
+])
+def test_prefers_most_literal_template(url, template):
+    assert PathTemplateMatcher(TEMPLATES).match(url) == template
+
+
+@pytest.mark.parametrize("url, normalized", [
+    # Too deep or too shallow for every template
+    (f"/v1.5/device/{GUID}/status/history", f"/v1.5/device/{{id}}/status/history"),
+    ("/v1.5", "/v1.5"),
+    # No template at all: identifier-looking segments are replaced
+    ("http://localhost:8502/v2/orders/12345/items", "/v2/orders/{id}/items"),
+    ("/v2/cards/4111111111111111ABCD", "/v2/cards/{id}"),
+    ("/v2/cards/visa", "/v2/cards/visa"),
+])
+def test_unmatched_paths(url, normalized):
+    assert PathTemplateMatcher(TEMPLATES).match(url) == normalized
+
+
+def test_no_templates():
+    assert PathTemplateMatcher().match(f"/v1.5/device/{GUID}") == "/v1.5/device/{id}"
+
+
+def test_from_swagger_prefixes_base_path(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps({"basePath": "/v1.5/", "paths": {"/device/{deviceGuid}": {}}}))
+
+    matcher = PathTemplateMatcher.from_swagger(str(path))
+
+    assert matcher.match(f"http://host/v1.5/device/{GUID}") == "/v1.5/device/{deviceGuid}"
+
+
+def history():
+    rows = []
+    for run in range(6):
+        for url, latency, error in [
+            (f"/v1.5/device/{GUID}", 120 + run * 10, run % 3 == 0),
+            ("/v1.5/transaction/42/refund", 900 + run * 100, run % 2 == 0),
+            ("/v2/unknown/7", 3000, True),
+        ]:
+            rows.append({
+                "method": "POST" if "refund" in url else "GET",
+                "url": url,
+                "latency_ms": latency,
+                "latency_bucket": bucket_latency(latency),
+                "is_error": int(error),
+                "timestamp": f"2025-06-{run + 1:02d}T10:00:00",
+            })
+    return pd.DataFrame(rows)
+
+
+def test_encoder_save_load_round_trip(tmp_path):
+    encoder = FeatureEncoder(templates=TEMPLATES, n_features=64, window=4)
+    train = history()
+    fitted = encoder.fit_transform(train)
+    assert fitted.shape == (len(train), encoder.width)
+
+    path = str(tmp_path / "encoder.json")
+    encoder.save(path)
+    loaded = FeatureEncoder.load(path)
+
+    assert loaded.matcher.templates == TEMPLATES
+    assert (loaded.n_features, loaded.window) == (64, 4)
+    assert loaded.aggregates == encoder.aggregates
+    assert loaded.defaults == encoder.defaults
+
+    score = pd.concat([train.tail(3), pd.DataFrame([{
+        "method": "DELETE", "url": "/v3/new/endpoint", "latency_bucket": "unknown",
+    }])], ignore_index=True)
+    before, after = encoder.transform(score), loaded.transform(score)
+    assert before.shape == after.shape == (4, encoder.width)
+    assert (before != after).nnz == 0
+
+
+def test_load_rejects_one_hot_encoder(tmp_path):
+    path = tmp_path / "encoder.json"
+    path.write_text(json.dumps({"columns": ["method_GET"]}))
+
+    with pytest.raises(ValueError):
+        FeatureEncoder.load(str(path))
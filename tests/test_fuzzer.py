@@ -0,0 +1,107 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_test_generator.fuzzer import iter_cases
+from test_case_generator.run_tests import is_failure
+
+SIZE_STEPS = [(3, 20)]
+
+
+def body_operation(ref):
+    return {"parameters": [{"in": "body", "name": "body", "required": True, "schema": {"$ref": ref}}]}
+
+
+SPEC = {
+    "swagger": "2.0",
+    "paths": {
+        "/payments": {"post": body_operation("#/definitions/Payment")},
+        "/payments/{transactionId}/refund": {
+            "post": {"parameters": [
+                {"in": "path", "name": "transactionId", "required": True, "type": "string"},
+                {"in": "body", "name": "body", "schema": {"$ref": "#/definitions/Refund"}},
+            ]},
+        },
+        "/status": {"get": {"parameters": []}},
+        "/devices": {"put": body_operation("#/definitions/Device")},
+        "/cards": {"post": body_operation("#/definitions/Card")},
+    },
+    "definitions": {
+        "Payment": {
+            "type": "object",
+            "required": ["amount", "currency"],
+            "properties": {
+                "amount": {"type": "number", "minimum": 0.01, "maximum": 10000},
+                "currency": {"type": "string", "enum": ["USD", "EUR"]},
+                "email": {"type": "string", "format": "email"},
+                "items": {"type": "array", "items": {"$ref": "#/definitions/Item"}},
+            },
+        },
+        "Item": {
+            "type": "object",
+            "properties": {"sku": {"type": "string", "minLength": 3, "maxLength": 8},
+                           "quantity": {"type": "integer", "minimum": 1}},
+        },
+        "Refund": {"type": "object", "required": ["reason"],
+                   "properties": {"reason": {"type": "string", "pattern": "^[A-Z]+$"}}},
+        "Device": {"type": "object", "properties": {"deviceGuid": {"type": "string"},
+                                                    "enabled": {"type": "boolean"}}},
+        "Card": {"type": "object", "properties": {"number": {"type": "string", "maxLength": 19},
+                                                  "expiry": {"type": "string", "format": "date"}}},
+    },
+}
+
+
+def test_same_cases_for_any_worker_count():
+    single = list(iter_cases(SPEC, seed=42, workers=1, size_steps=SIZE_STEPS))
+    pooled = list(iter_cases(SPEC, seed=42, workers=3, size_steps=SIZE_STEPS))
+
+    assert single == pooled
+    assert {case["endpoint"] for case in single} == {"/payments", "/payments/{transactionId}/refund",
+                                                    "/devices", "/cards"}
+    # Operations come out in spec order
+    endpoints = [case["endpoint"] for case in single]
+    assert endpoints == sorted(endpoints, key=list(SPEC["paths"]).index)
+
+
+def test_seed_changes_cases():
+    assert list(iter_cases(SPEC, seed=1, workers=1, size_steps=SIZE_STEPS)) != \
+        list(iter_cases(SPEC, seed=2, workers=1, size_steps=SIZE_STEPS))
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_max_cases(workers):
+    everything = list(iter_cases(SPEC, seed=42, workers=1, size_steps=SIZE_STEPS))
+
+    assert list(iter_cases(SPEC, seed=42, workers=workers, size_steps=SIZE_STEPS, max_cases=5)) == everything[:5]
+
+
+def fuzz_case(expected_status):
+    return {"method": "POST", "url": "http://localhost/payments", "expected_status": expected_status,
+            "fuzz": {"seed": 0, "kind": "above_maximum", "field": ["amount"]}}
+
+
+@pytest.mark.parametrize("test, status, failed", [
+    # No response and 5xx always fail
+    (fuzz_case(400), None, True),
+    (fuzz_case(None), None, True),
+    (fuzz_case(None), 500, True),
+    (fuzz_case(200), 503, True),
+    # An invalid value must be rejected with a 4xx
+    (fuzz_case(400), 400, False),
+    (fuzz_case(400), 422, False),
+    (fuzz_case(400), 200, True),
+    # A valid value must be accepted
+    (fuzz_case(200), 201, False),
+    (fuzz_case(200), 400, True),
+    # The spec does not say; only no response and 5xx fail
+    (fuzz_case(None), 200, False),
+    (fuzz_case(None), 400, False),
+    # Plain test cases fail on any 4xx
+    ({"method": "GET", "url": "http://localhost/status"}, 200, False),
+    ({"method": "GET", "url": "http://localhost/status"}, 404, True),
+])
+def test_is_failure(test, status, failed):
+    assert is_failure(test, status) is failed
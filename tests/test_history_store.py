@@ -0,0 +1,137 @@
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_model import history_store, ingest_runs
+
+POSTMAN_EXPORT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "src", "data", "processed", "rGuest Pay Agent.postman_test_run.json")
+
+
+def days_ago(n, hour=10):
+    return (date.today() - timedelta(days=n)).isoformat() + f"T{hour:02d}:00:00"
+
+
+def rows(timestamps, url="http://localhost:8502/v1.5/device/abc"):
+    return pd.DataFrame([{
+        "method": "GET",
+        "url": url,
+        "status_code": 200 if i % 2 else 500,
+        "latency_ms": 100.0 + i,
+        "is_error": 0 if i % 2 else 1,
+        "latency_bucket": "fast",
+        "timestamp": ts,
+        "payload": json.dumps({"n": i}) if i % 3 else None,
+    } for i, ts in enumerate(timestamps)])
+
+
+def plain(df):
+    """Rows as comparable tuples, ignoring dtypes and order."""
+    columns = ["method", "url", "status_code", "latency_ms", "is_error", "latency_bucket", "timestamp", "payload"]
+    df = df[columns].astype(object).where(df[columns].notna(), None)
+    df["timestamp"] = [pd.Timestamp(t).isoformat() for t in df["timestamp"]]
+    return sorted(map(tuple, df.itertuples(index=False)), key=repr)
+
+
+def part_files(history_dir):
+    return sorted(os.path.relpath(os.path.join(d, f), history_dir)
+                  for d, _, files in os.walk(history_dir) for f in files if f.endswith(".parquet"))
+
+
+def test_append_then_read(tmp_path):
+    history_dir = str(tmp_path / "history")
+    df = rows([days_ago(2), days_ago(2, 11), days_ago(0)])
+
+    assert history_store.append(df, history_dir) == 3
+
+    assert plain(history_store.read(history_dir)) == plain(df)
+    # One part file per run date
+    assert [os.path.dirname(p) for p in part_files(history_dir)] == [
+        f"run_date={(date.today() - timedelta(days=2)).isoformat()}",
+        f"run_date={date.today().isoformat()}",
+    ]
+    assert list(history_store.read(history_dir, columns=["url"]).columns) == ["url"]
+
+
+def test_read_empty_store(tmp_path):
+    assert history_store.read(str(tmp_path / "missing")).empty
+    assert history_store.append(rows([]), str(tmp_path / "history")) == 0
+
+
+def test_filter_by_run_date(tmp_path):
+    history_dir = str(tmp_path / "history")
+    history_store.append(rows([days_ago(10), days_ago(3), days_ago(1), days_ago(0)]), history_dir)
+
+    assert len(history_store.read(history_dir, days=1)) == 1
+    assert len(history_store.read(history_dir, days=2)) == 2
+    assert len(history_store.read(history_dir, days=4)) == 3
+    assert len(history_store.read(history_dir, since=date.today() - timedelta(days=10))) == 4
+    assert sorted(history_store.load(history_dir, days=4)["run_date"]) == [
+        (date.today() - timedelta(days=n)).isoformat() for n in (3, 1, 0)
+    ]
+
+
+def test_compact_keeps_every_row(tmp_path):
+    history_dir = str(tmp_path / "history")
+    batches = [rows([days_ago(5, hour), days_ago(5, hour + 1)]) for hour in (8, 10, 12)]
+    batches.append(rows([days_ago(0), days_ago(0, 11)]))
+    for batch in batches:
+        history_store.append(batch, history_dir)
+    before = history_store.read(history_dir)
+    assert len(part_files(history_dir)) == 4
+
+    assert history_store.compact(history_dir, older_than_days=1) == 1
+
+    assert plain(history_store.read(history_dir)) == plain(before) == plain(pd.concat(batches))
+    old, today = (date.today() - timedelta(days=5)).isoformat(), date.today().isoformat()
+    files = part_files(history_dir)
+    assert len(files) == 2
+    assert files[0].startswith(f"run_date={old}{os.sep}compacted-")
+    assert files[1].startswith(f"run_date={today}{os.sep}part-")
+    # Nothing left to merge
+    assert history_store.compact(history_dir, older_than_days=1) == 0
+
+
+def newman_report(path, collection_id, started_ms, codes):
+    report = {
+        "collection": {"info": {"_postman_id": collection_id, "name": "Synthetic"}},
+        "run": {"timings": {"started": started_ms}, "executions": [{
+            "item": {"id": f"item-{i}", "name": f"request {i}"},
+            "request": {"method": "POST", "url": {"raw": f"http://localhost:8502/v1.5/pay/{i}"}},
+            "response": {"code": code, "responseTime": 50 + i},
+            "assertions": [{"assertion": "status"}, {"assertion": "body", "error": {"message": "bad"}}],
+        } for i, code in enumerate(codes)]},
+    }
+    path.write_text(json.dumps(report))
+    return str(path)
+
+
+def test_run_ids_after_ingest(tmp_path):
+    history_dir = str(tmp_path / "history")
+    # Rows from local runs, written before run IDs were recorded
+    local = rows([days_ago(1)])
+    legacy = pa.Table.from_pandas(local.assign(timestamp=pd.to_datetime(local["timestamp"])), preserve_index=False)
+    os.makedirs(os.path.join(history_dir, f"run_date={days_ago(1)[:10]}"))
+    pq.write_table(legacy, os.path.join(history_dir, f"run_date={days_ago(1)[:10]}", "part-legacy.parquet"))
+    assert history_store.run_ids(history_dir) == set()
+
+    newman = newman_report(tmp_path / "newman.json", "c-1", 1718200000000, [200, 500])
+    assert ingest_runs.ingest([newman, POSTMAN_EXPORT], history_dir) == (2, 2 + 32)
+
+    ids = history_store.run_ids(history_dir)
+    assert ids == {"4989a6bc-22fc-447c-8e86-05f26d7fb8d6", next(i for i in ids if i.startswith("c-1@"))}
+
+    stored = history_store.read(history_dir)
+    assert stored["run_id"].isna().sum() == 1
+    newman_rows = stored[stored["run_id"].astype(str).str.startswith("c-1@")]
+    assert list(newman_rows["assertions_failed"]) == [1, 1]
+
+    # Re-ingesting the same exports adds nothing
+    assert ingest_runs.ingest([newman, POSTMAN_EXPORT], history_dir) == (0, 0)
+    assert len(history_store.read(history_dir)) == len(stored)
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from test_case_generator.payload_benchmark import MAX_SIZE, MIN_SIZE, find_knee, size_steps
+
+SIZES = [1, 2, 4, 8, 16, 32]
+
+
+@pytest.mark.parametrize("throughputs, statuses, knee", [
+    # Throughput drop below half the running peak
+    ([1.0, 2.0, 4.0, 4.0, 1.9, 1.0], [200] * 6, 16),
+    # The peak is running: a later, higher peak raises the bar
+    ([1.0, 4.0, 2.1, 8.0, 3.9, 3.0], [200] * 6, 16),
+    # Exactly half the peak is not below it
+    ([1.0, 2.0, 4.0, 2.0, 2.0, 2.0], [200] * 6, None),
+    # A slow start is not a drop
+    ([0.1, 0.2, 1.0, 1.0, 1.0, 1.0], [200] * 6, None),
+    # Failing sizes are knees whatever the throughput
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [200, 200, 200, 500, 200, 200], 8),
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [200, 200, 503, 200, 200, 200], 4),
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [200, 200, 200, 200, 413, 200], 16),
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [200, None, 200, 200, 200, 200], 2),
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [None] * 6, 1),
+    # Whichever comes first
+    ([4.0, 1.0, 4.0, 4.0, 4.0, 4.0], [200, 200, 200, 500, 200, 200], 2),
+    # Client errors other than 413 are not knees
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [200, 400, 404, 422, 200, 200], None),
+    # No knee
+    ([1.0, 2.0, 4.0, 8.0, 16.0, 32.0], [200] * 6, None),
+    ([5.0, 5.0, 5.0, 5.0, 5.0, 5.0], [201] * 6, None),
+    ([0.0, 0.0, 0.0, 0.0, 0.0, 0.0], [200] * 6, None),
+])
+def test_find_knee(throughputs, statuses, knee):
+    assert find_knee(SIZES, throughputs, statuses) == knee
+
+
+def test_find_knee_fraction():
+    throughputs = [4.0, 4.0, 3.0, 2.5, 2.5, 2.5]
+
+    assert find_knee(SIZES, throughputs, [200] * 6) is None
+    assert find_knee(SIZES, throughputs, [200] * 6, knee_fraction=0.7) == 8
+    assert find_knee(SIZES, throughputs, [200] * 6, knee_fraction=0.9) == 4
+
+
+def test_find_knee_empty_curve():
+    assert find_knee([], [], []) is None
+
+
+@pytest.mark.parametrize("min_size, max_size, growth, sizes", [
+    (1024, 8192, 2, [1024, 2048, 4096, 8192]),
+    # max_size is always the last step, even off the geometric grid
+    (1024, 10_000, 2, [1024, 2048, 4096, 8192, 10_000]),
+    (1000, 10_000, 10, [1000, 10_000]),
+    (100, 400, 1.5, [100, 150, 225, 337, 400]),
+    (4096, 4096, 2, [4096]),
+    (8192, 1024, 2, [1024]),
+])
+def test_size_steps(min_size, max_size, growth, sizes):
+    assert size_steps(min_size, max_size, growth) == sizes
+
+
+def test_default_size_steps():
+    sizes = size_steps()
+
+    assert sizes[0] == MIN_SIZE and sizes[-1] == MAX_SIZE
+    assert sizes == sorted(set(sizes))
+    # 1KB doubling up to 8MB, then 10MB
+    assert len(sizes) == 15
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from postman_stream import iter_collection_items
+
+
+def request(name):
+    return {"name": name, "request": {"method": "GET", "url": f"http://localhost/{name}"}}
+
+
+def folder(name, items, name_first):
+    """A folder object with "name" before or after its "item" array."""
+    return {"name": name, "item": items} if name_first else {"item": items, "name": name}
+
+
+def collection(name_first):
+    return {
+        "info": {"name": "Synthetic"},
+        "item": [
+            request("top"),
+            folder("F60", [
+                request("a"),
+                folder("F70", [request("b"), request("c")], name_first),
+                request("d"),
+            ], name_first),
+            folder("F80", [request("e")], not name_first),
+            request("last"),
+        ],
+    }
+
+
+def walk(items, folders=()):
+    """The in-memory walk iter_collection_items replaced."""
+    for item in items:
+        if "item" in item:
+            yield from walk(item["item"], folders + (item.get("name", ""),))
+        else:
+            yield list(folders), item
+
+
+@pytest.mark.parametrize("name_first", [True, False])
+def test_folder_names_in_either_key_order(tmp_path, name_first):
+    data = collection(name_first)
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps(data))
+
+    streamed = [(folders, item["name"]) for folders, item in iter_collection_items(str(path))]
+
+    assert streamed == [
+        ([], "top"),
+        (["F60"], "a"),
+        (["F60", "F70"], "b"),
+        (["F60", "F70"], "c"),
+        (["F60"], "d"),
+        (["F80"], "e"),
+        ([], "last"),
+    ]
+    assert streamed == [(folders, item["name"]) for folders, item in walk(data["item"])]
+
+
+def test_items_are_complete(tmp_path):
+    data = collection(False)
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps(data))
+
+    assert [item for _, item in iter_collection_items(str(path))] == [item for _, item in walk(data["item"])]
+
+
+def test_unnamed_folder(tmp_path):
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps({"item": [{"item": [request("a")]}]}))
+
+    assert [(folders, item["name"]) for folders, item in iter_collection_items(str(path))] == [([""], "a")]
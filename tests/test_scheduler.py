@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from test_case_generator import run_tests, scheduler
+
+
+@pytest.mark.parametrize("budget, seconds", [
+    ("90", 90.0),
+    ("90s", 90.0),
+    (" 5m ", 300.0),
+    ("1.5h", 5400.0),
+    ("250ms", 0.25),
+    (45, 45.0),
+])
+def test_parse_budget(budget, seconds):
+    assert scheduler.parse_budget(budget) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("budget", ["", "m", "-5m", "5 minutes", "1d", "1.5.2s", None])
+def test_parse_budget_rejects_bad_input(budget):
+    with pytest.raises(ValueError):
+        scheduler.parse_budget(budget)
+
+
+class FakeScorer:
+    def __init__(self, risk):
+        self.risk = risk
+        self.calls = []
+
+    def score(self, method, url):
+        self.calls.append((method, url))
+        return self.risk
+
+
+def key_fn(test):
+    return test["method"], test["url"]
+
+
+def risks(scheduled):
+    return {test["name"]: risk for test, risk, _ in scheduled}
+
+
+def test_risk_order_sources_in_priority_order():
+    tests = [
+        {"name": "own", "method": "POST", "url": "http://a/pay", "risk_score": 0.9},
+        {"name": "prioritized", "method": "post", "url": "http://b:8502/pay"},
+        {"name": "scored", "method": "GET", "url": "http://a/status"},
+    ]
+    risk_scores = {("POST", "/pay"): 0.1, ("GET", "/other"): 0.3}
+    scorer = FakeScorer(0.7)
+
+    scheduled = scheduler.risk_order(tests, key_fn, risk_scores, {}, scorer=scorer)
+
+    assert risks(scheduled) == {"own": 0.9, "prioritized": 0.1, "scored": 0.7}
+    # The scorer is only asked about tests neither the case nor the prioritized file scores
+    assert scorer.calls == [("GET", "http://a/status")]
+    assert [test["name"] for test, _, _ in scheduled] == ["own", "scored", "prioritized"]
+
+
+def test_risk_order_defaults_to_average_known_risk():
+    tests = [{"name": "unknown", "method": "GET", "url": "http://a/new"}]
+    risk_scores = {("POST", "/pay"): 0.1, ("GET", "/other"): 0.3}
+
+    assert risks(scheduler.risk_order(tests, key_fn, risk_scores, {})) == {"unknown": pytest.approx(0.2)}
+    assert risks(scheduler.risk_order(tests, key_fn, {}, {})) == {"unknown": 0.5}
+
+
+def test_risk_order_weighs_risk_by_latency():
+    tests = [
+        {"name": "slow", "method": "GET", "url": "http://a/slow", "risk_score": 0.9},
+        {"name": "fast", "method": "GET", "url": "http://a/fast", "risk_score": 0.3},
+        {"name": "unmeasured", "method": "GET", "url": "http://a/new", "risk_score": 0.3},
+    ]
+    latencies = {("GET", "/slow"): 900.0, ("GET", "/fast"): 100.0}
+
+    scheduled = scheduler.risk_order(tests, key_fn, {}, latencies)
+
+    # Unmeasured endpoints get the average known latency
+    assert [(test["name"], latency) for test, _, latency in scheduled] == [
+        ("fast", 100.0), ("slow", 900.0), ("unmeasured", 500.0),
+    ]
+    assert scheduler.risk_order(tests[2:], key_fn, {}, {})[0][2] == scheduler.DEFAULT_LATENCY_MS
+
+
+def test_within_budget_fills_greedily():
+    scheduled = [("a", 0.9, 400.0), ("b", 0.8, 700.0), ("c", 0.5, 200.0), ("d", 0.4, 500.0), ("e", 0.1, 400.0)]
+
+    selected = scheduler.within_budget(scheduled, 1.0)
+
+    # b and d no longer fit once earlier tests are in; c and e still do
+    assert [test for test, _, _ in selected] == ["a", "c", "e"]
+    assert sum(latency for _, _, latency in selected) <= 1000.0
+    assert scheduler.within_budget(scheduled, 0) == []
+    assert scheduler.within_budget(scheduled, 10) == scheduled
+
+
+def test_load_risk_scores_keeps_highest_per_endpoint(tmp_path):
+    path = tmp_path / "prioritized_tests.json"
+    path.write_text(json.dumps([
+        {"method": "post", "url": "http://localhost:8502/pay", "risk_score": 0.4},
+        {"method": "POST", "url": "http://other/pay", "risk_score": 0.8},
+        {"url": "http://localhost:8502/status", "risk_score": 0.2},
+    ]))
+
+    assert scheduler.load_risk_scores(str(path)) == {("POST", "/pay"): 0.8, ("GET", "/status"): 0.2}
+    assert scheduler.load_risk_scores(str(tmp_path / "missing.json")) == {}
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = "error" if status_code >= 400 else ""
+
+
+def test_run_tests_stops_at_max_failures(monkeypatch):
+    statuses = iter([200, 500, 404, 500, 200])
+    sent = []
+
+    def fake_request(method, url, json=None):
+        sent.append(url)
+        return FakeResponse(next(statuses))
+
+    monkeypatch.setattr(requests, "request", fake_request)
+    tests = [{"method": "GET", "url": f"http://localhost/{i}"} for i in range(5)]
+
+    results = run_tests.run_tests(tests, max_failures=2)
+
+    assert [r["status_code"] for r in results] == [200, 500, 404]
+    assert sent == ["http://localhost/0", "http://localhost/1", "http://localhost/2"]
+
+
+def test_run_tests_counts_only_failures(monkeypatch):
+    statuses = iter([400, 500, 201, 404])
+    monkeypatch.setattr(requests, "request", lambda method, url, json=None: FakeResponse(next(statuses)))
+    # A 400 is the expected outcome here, so only the 500 counts towards the limit
+    tests = [
+        {"method": "POST", "url": "http://localhost/a", "expected_status": 400},
+        {"method": "POST", "url": "http://localhost/b"},
+        {"method": "POST", "url": "http://localhost/c"},
+        {"method": "POST", "url": "http://localhost/d"},
+    ]
+
+    results = run_tests.run_tests(tests, max_failures=2)
+
+    assert [r["status_code"] for r in results] == [400, 500, 201, 404]